@@ -0,0 +1,26 @@
+"""Index werewolf_games (status, phase_ends_at) for the phase-transition sweep
+
+Revision ID: 023_werewolf_phase_ends_index
+Revises: 022_add_game_language
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '023_werewolf_phase_ends_index'
+down_revision = '022_add_game_language'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_werewolf_games_status_phase_ends "
+        "ON werewolf_games (status, phase_ends_at)"
+    ))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_werewolf_games_status_phase_ends"))
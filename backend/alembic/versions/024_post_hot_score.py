@@ -0,0 +1,49 @@
+"""Materialized posts.hot_score and keyset pagination indexes
+
+Revision ID: 024_post_hot_score
+Revises: 023_werewolf_phase_ends_index
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '024_post_hot_score'
+down_revision = '023_werewolf_phase_ends_index'
+branch_labels = None
+depends_on = None
+
+# Same formula as app.utils.karma.calculate_hot_score
+_HOT_SCORE_SQL = """
+    round(
+        sign(upvotes - downvotes)
+        * log(greatest(abs(upvotes - downvotes), 1)::numeric)
+        + extract(epoch FROM created_at - timestamp '2024-01-01')::numeric / 45000,
+        7
+    )
+"""
+
+_INDEXES = [
+    ("ix_posts_hot_id", "(hot_score DESC, id DESC)"),
+    ("ix_posts_submolt_hot_id", "(submolt, hot_score DESC, id DESC)"),
+    ("ix_posts_created_id", "(created_at DESC, id DESC)"),
+    ("ix_posts_submolt_created_id", "(submolt, created_at DESC, id DESC)"),
+    ("ix_posts_top_id", "((upvotes - downvotes) DESC, id DESC)"),
+    ("ix_posts_submolt_top_id", "(submolt, (upvotes - downvotes) DESC, id DESC)"),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "ALTER TABLE posts ADD COLUMN IF NOT EXISTS hot_score DOUBLE PRECISION NOT NULL DEFAULT 0"
+    ))
+    conn.execute(sa.text(f"UPDATE posts SET hot_score = {_HOT_SCORE_SQL}"))
+    for name, columns in _INDEXES:
+        conn.execute(sa.text(f"CREATE INDEX IF NOT EXISTS {name} ON posts {columns}"))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    for name, _ in _INDEXES:
+        conn.execute(sa.text(f"DROP INDEX IF EXISTS {name}"))
+    conn.execute(sa.text("ALTER TABLE posts DROP COLUMN IF EXISTS hot_score"))
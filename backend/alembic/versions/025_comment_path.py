@@ -0,0 +1,51 @@
+"""Materialized comment path/depth for subtree range queries
+
+Revision ID: 025_comment_path
+Revises: 024_post_hot_score
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '025_comment_path'
+down_revision = '024_post_hot_score'
+branch_labels = None
+depends_on = None
+
+_INDEXES = [
+    ("ix_comments_post_path", "(post_id, path)"),
+    ("ix_comments_post_depth", "(post_id, depth)"),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "ALTER TABLE comments ADD COLUMN IF NOT EXISTS depth INTEGER NOT NULL DEFAULT 0"
+    ))
+    conn.execute(sa.text(
+        'ALTER TABLE comments ADD COLUMN IF NOT EXISTS path TEXT COLLATE "C"'
+    ))
+    # path = ancestors' ids then own id, 32 hex chars each (see Comment.place_in_thread)
+    conn.execute(sa.text("""
+        WITH RECURSIVE thread AS (
+            SELECT id, 0 AS depth, replace(id::text, '-', '') AS path
+            FROM comments WHERE parent_id IS NULL
+            UNION ALL
+            SELECT c.id, t.depth + 1, t.path || replace(c.id::text, '-', '')
+            FROM comments c JOIN thread t ON c.parent_id = t.id
+        )
+        UPDATE comments SET depth = thread.depth, path = thread.path
+        FROM thread WHERE comments.id = thread.id
+    """))
+    conn.execute(sa.text("ALTER TABLE comments ALTER COLUMN path SET NOT NULL"))
+    for name, columns in _INDEXES:
+        conn.execute(sa.text(f"CREATE INDEX IF NOT EXISTS {name} ON comments {columns}"))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    for name, _ in _INDEXES:
+        conn.execute(sa.text(f"DROP INDEX IF EXISTS {name}"))
+    conn.execute(sa.text("ALTER TABLE comments DROP COLUMN IF EXISTS path"))
+    conn.execute(sa.text("ALTER TABLE comments DROP COLUMN IF EXISTS depth"))
@@ -0,0 +1,26 @@
+"""Index posts by (author_id, created_at, id) for home timelines
+
+Revision ID: 026_posts_author_created_index
+Revises: 025_comment_path
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '026_posts_author_created_index'
+down_revision = '025_comment_path'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_posts_author_created_id "
+        "ON posts (author_id, created_at DESC, id DESC)"
+    ))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_posts_author_created_id"))
@@ -0,0 +1,30 @@
+"""Indexes for daily vote/comment quota counts
+
+Revision ID: 027_quota_indexes
+Revises: 026_posts_author_created_index
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '027_quota_indexes'
+down_revision = '026_posts_author_created_index'
+branch_labels = None
+depends_on = None
+
+_INDEXES = [
+    ("ix_votes_resident_created", "votes", "(resident_id, created_at)"),
+    ("ix_comments_author_created", "comments", "(author_id, created_at)"),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for name, table, columns in _INDEXES:
+        conn.execute(sa.text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {columns}"))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    for name, _, _ in _INDEXES:
+        conn.execute(sa.text(f"DROP INDEX IF EXISTS {name}"))
@@ -0,0 +1,25 @@
+"""Index residents._api_key_hash for API-key authentication
+
+Revision ID: 028_resident_api_key_index
+Revises: 027_quota_indexes
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '028_resident_api_key_index'
+down_revision = '027_quota_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "CREATE INDEX IF NOT EXISTS ix_residents__api_key_hash ON residents (_api_key_hash)"
+    ))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_residents__api_key_hash"))
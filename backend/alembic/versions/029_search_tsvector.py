@@ -0,0 +1,53 @@
+"""Full-text search columns and GIN indexes for posts, comments and residents
+
+Revision ID: 029_search_tsvector
+Revises: 028_resident_api_key_index
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '029_search_tsvector'
+down_revision = '028_resident_api_key_index'
+branch_labels = None
+depends_on = None
+
+# 'simple' config: no stemming or stop words, content is mixed-language
+_VECTORS = {
+    "posts": "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+             "setweight(to_tsvector('simple', coalesce(content, '')), 'B')",
+    "comments": "to_tsvector('simple', coalesce(content, ''))",
+    "residents": "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+                 "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+}
+
+_TRGM_INDEXES = [
+    ("ix_posts_title_trgm", "posts", "title"),
+    ("ix_residents_name_trgm", "residents", "name"),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for table, expression in _VECTORS.items():
+        conn.execute(sa.text(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({expression}) STORED"
+        ))
+        conn.execute(sa.text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING gin (search_vector)"
+        ))
+    for name, table, column in _TRGM_INDEXES:
+        conn.execute(sa.text(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)"
+        ))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    for name, _, _ in _TRGM_INDEXES:
+        conn.execute(sa.text(f"DROP INDEX IF EXISTS {name}"))
+    for table in _VECTORS:
+        conn.execute(sa.text(f"DROP INDEX IF EXISTS ix_{table}_search_vector"))
+        conn.execute(sa.text(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector"))
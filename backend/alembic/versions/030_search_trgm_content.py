@@ -0,0 +1,37 @@
+"""Trigram indexes for substring search on post, comment and resident text
+
+The 'simple' tsvector config doesn't split Japanese into words, so search
+falls back to ILIKE substring matches on these columns (services/search).
+
+Revision ID: 030_search_trgm_content
+Revises: 029_search_tsvector
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '030_search_trgm_content'
+down_revision = '029_search_tsvector'
+branch_labels = None
+depends_on = None
+
+_TRGM_INDEXES = [
+    ("ix_posts_content_trgm", "posts", "content"),
+    ("ix_comments_content_trgm", "comments", "content"),
+    ("ix_residents_description_trgm", "residents", "description"),
+]
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    for name, table, column in _TRGM_INDEXES:
+        conn.execute(sa.text(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)"
+        ))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    for name, _, _ in _TRGM_INDEXES:
+        conn.execute(sa.text(f"DROP INDEX IF EXISTS {name}"))
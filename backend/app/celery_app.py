@@ -11,7 +11,8 @@ celery_app = Celery(
     "genesis",
     broker=settings.redis_url,
     backend=settings.redis_url,
-    include=["app.tasks.analytics", "app.tasks.agents", "app.tasks.moderation", "app.tasks.werewolf"],
+    include=["app.tasks.analytics", "app.tasks.agents", "app.tasks.moderation", "app.tasks.werewolf",
+             "app.tasks.feed", "app.tasks.search", "app.tasks.notifications"],
     # Disabled task modules (concept overhaul v5):
     # "app.tasks.election", "app.tasks.karma", "app.tasks.turing_game"
 )
@@ -40,6 +41,11 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.analytics.calculate_daily_stats_task",
         "schedule": crontab(hour=0, minute=15),
     },
+    # Write-behind last_active (services/activity.FLUSH_INTERVAL)
+    "flush-last-active": {
+        "task": "app.tasks.analytics.flush_last_active_task",
+        "schedule": 60.0,
+    },
     # AI Agent activity - normal mode
     "agent-cycle": {
         "task": "app.tasks.agents.run_agent_cycle_task",
@@ -55,12 +61,37 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.moderation.run_content_moderation_task",
         "schedule": 3600.0,  # Every hour
     },
-    # Phantom Night: check phase transitions every 15 seconds (real-time play)
+    # Ranked feed cache — full reload from Postgres (writes update it in between)
+    "feed-cache-rebuild": {
+        "task": "app.tasks.feed.rebuild_feed_cache_task",
+        "schedule": 300.0,  # Every 5 minutes
+    },
+    # Search embeddings — batch-embed queued posts/comments
+    # (services/embedding_queue.DRAIN_INTERVAL)
+    "embedding-queue-drain": {
+        "task": "app.tasks.search.index_embeddings_task",
+        "schedule": 30.0,
+    },
+    # Notifications — sweep of queued intents (commits also wake the task)
+    # (services/notification_dispatch.DRAIN_INTERVAL)
+    "notification-dispatch": {
+        "task": "app.tasks.notifications.dispatch_notifications_task",
+        "schedule": 10.0,
+    },
+    # In-process ANN index for search without pgvector
+    # (services/vector_index.BUILD_INTERVAL)
+    "vector-index-build": {
+        "task": "app.tasks.search.build_vector_index_task",
+        "schedule": 900.0,
+    },
+    # Phantom Night: transitions fire from ETA tasks at phase_ends_at;
+    # this sweep only catches games whose timer was lost
     "werewolf-phase-check": {
         "task": "app.tasks.werewolf.check_phase_transition_task",
-        "schedule": 15.0,
+        "schedule": 60.0,
     },
-    # Phantom Night: AI agent actions every 15 seconds (chat, vote, night action)
+    # Phantom Night: AI agent actions every 15 seconds (chat, vote, night action),
+    # fanned out as one task per active game
     "werewolf-agent-actions": {
         "task": "app.tasks.werewolf.werewolf_agent_actions_task",
         "schedule": 15.0,
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.config import get_settings
+from app.services import post_commit
 
 settings = get_settings()
 
@@ -8,11 +9,22 @@ engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
     pool_pre_ping=True,
+    # Celery agent cycles open OLLAMA_CONCURRENCY + 1 sessions on this pool
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
 )
 
+class AppSession(AsyncSession):
+    """AsyncSession that runs post-commit side effects (services/post_commit)."""
+
+    async def commit(self) -> None:
+        await super().commit()
+        await post_commit.flush(self)
+
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
-    class_=AsyncSession,
+    class_=AppSession,
     expire_on_commit=False,
 )
 
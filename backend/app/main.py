@@ -76,6 +76,9 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info(f"{settings.app_name} shutting down...")
+    from app.services import notification_stream, ws_manager
+    await ws_manager.shutdown()
+    await notification_stream.shutdown()
 
 
 app = FastAPI(
@@ -1,13 +1,23 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, Text, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Integer, DateTime, Text, ForeignKey, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        # Subtree of a comment = one range scan on (post_id, path)
+        Index("ix_comments_post_path", "post_id", "path"),
+        Index("ix_comments_post_depth", "post_id", "depth"),
+        # Daily comment quota / cooldown fallback
+        Index("ix_comments_author_created", "author_id", "created_at"),
+        # Search (services/search): full text, plus trigram for substring matches
+        Index("ix_comments_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_comments_content_trgm", "content", postgresql_using="gin", postgresql_ops={"content": "gin_trgm_ops"}),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -23,6 +33,11 @@ class Comment(Base):
     )
     content: Mapped[str] = mapped_column(Text, nullable=False)
 
+    # Thread position: depth 0 = top-level; path = ancestors' id hex + own id hex
+    # (32 chars per level, "C" collation so descendants sort right after it)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    path: Mapped[str] = mapped_column(Text(collation="C"), nullable=False)
+
     # Vote counts
     upvotes: Mapped[int] = mapped_column(Integer, default=0)
     downvotes: Mapped[int] = mapped_column(Integer, default=0)
@@ -30,6 +45,13 @@ class Comment(Base):
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
 
+    # Full-text document, maintained by Postgres
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', coalesce(content, ''))", persisted=True),
+        deferred=True,
+    )
+
     # Relationships
     post = relationship("Post", back_populates="comments")
     author = relationship("Resident", back_populates="comments")
@@ -41,5 +63,16 @@ class Comment(Base):
     def score(self) -> int:
         return self.upvotes - self.downvotes
 
+    def place_in_thread(self, parent: "Comment | None") -> None:
+        """Set depth/path under parent (None for a top-level comment). Call before flush."""
+        if self.id is None:
+            self.id = uuid.uuid4()
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.path = (parent.path if parent is not None else "") + self.id.hex
+
+    def subtree_filter(self):
+        """WHERE clause matching every descendant of this comment."""
+        return (Comment.path > self.path) & (Comment.path < self.path + "g")
+
     def __repr__(self) -> str:
         return f"<Comment {self.id}>"
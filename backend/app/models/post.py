@@ -1,13 +1,34 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Integer, Boolean, DateTime, Text, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Integer, Float, Boolean, DateTime, Text, ForeignKey, Index, Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
 
+def _initial_hot_score(context) -> float:
+    from app.utils.karma import calculate_hot_score
+    created_at = context.get_current_parameters().get("created_at") or datetime.utcnow()
+    return calculate_hot_score(0, 0, created_at)
+
+
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        # Keyset pagination: (sort key, id) per listing, globally and per submolt
+        Index("ix_posts_hot_id", text("hot_score DESC"), text("id DESC")),
+        Index("ix_posts_submolt_hot_id", "submolt", text("hot_score DESC"), text("id DESC")),
+        Index("ix_posts_created_id", text("created_at DESC"), text("id DESC")),
+        Index("ix_posts_submolt_created_id", "submolt", text("created_at DESC"), text("id DESC")),
+        Index("ix_posts_top_id", text("(upvotes - downvotes) DESC"), text("id DESC")),
+        Index("ix_posts_submolt_top_id", "submolt", text("(upvotes - downvotes) DESC"), text("id DESC")),
+        # Home timelines: one author's posts, newest first
+        Index("ix_posts_author_created_id", "author_id", text("created_at DESC"), text("id DESC")),
+        # Search (services/search): full text, plus trigram for substring matches
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_posts_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}),
+        Index("ix_posts_content_trgm", "content", postgresql_using="gin", postgresql_ops={"content": "gin_trgm_ops"}),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -35,6 +56,20 @@ class Post(Base):
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
 
+    # Materialized utils.karma.calculate_hot_score(); refreshed whenever votes change
+    hot_score: Mapped[float] = mapped_column(Float, nullable=False, default=_initial_hot_score)
+
+    # Full-text document (title weighted above content), maintained by Postgres
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(content, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
+
     # Relationships
     author = relationship("Resident", back_populates="posts", foreign_keys=[author_id])
     comments = relationship("Comment", back_populates="post", lazy="dynamic")
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Integer, Boolean, DateTime, Text, JSON, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, Integer, Boolean, DateTime, Text, JSON, ForeignKey, Index, Computed
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
@@ -31,12 +31,30 @@ MAX_ROLES = 3
 
 class Resident(Base):
     __tablename__ = "residents"
+    __table_args__ = (
+        # Search (services/search): full text, plus trigram for substring/fuzzy names
+        Index("ix_residents_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_residents_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index(
+            "ix_residents_description_trgm", "description",
+            postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
     name: Mapped[str] = mapped_column(String(30), unique=True, nullable=False, index=True)
     description: Mapped[str | None] = mapped_column(Text)
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+        deferred=True,
+    )
     avatar_url: Mapped[str | None] = mapped_column(String(500))
     karma: Mapped[int] = mapped_column(Integer, default=KARMA_START)
     roles: Mapped[list] = mapped_column(JSON, default=list)
@@ -74,7 +92,7 @@ class Resident(Base):
 
     # Internal fields (never exposed via API)
     _type: Mapped[str] = mapped_column(String(10), nullable=False)  # 'human' or 'agent'
-    _api_key_hash: Mapped[str | None] = mapped_column(String(128))
+    _api_key_hash: Mapped[str | None] = mapped_column(String(128), index=True)
     _twitter_id: Mapped[str | None] = mapped_column(String(64), unique=True)
     _google_id: Mapped[str | None] = mapped_column(String(64), unique=True)
     _claimed_by: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
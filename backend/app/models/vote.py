@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import String, Integer, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
@@ -37,6 +37,8 @@ class Vote(Base):
 
     __table_args__ = (
         UniqueConstraint("resident_id", "target_type", "target_id", name="uq_vote_unique"),
+        # Daily vote quota fallback count
+        Index("ix_votes_resident_created", "resident_id", "created_at"),
     )
 
     def __repr__(self) -> str:
@@ -72,6 +72,10 @@ EVENT_TYPES = (
 
 class WerewolfGame(Base):
     __tablename__ = "werewolf_games"
+    __table_args__ = (
+        # Phase-transition sweep: active games past phase_ends_at
+        Index("ix_werewolf_games_status_phase_ends", "status", "phase_ends_at"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
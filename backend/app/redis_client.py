@@ -0,0 +1,50 @@
+import asyncio
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config import get_settings
+
+_client: Optional[aioredis.Redis] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Shared async Redis client for the running event loop.
+
+    Rebuilt if the loop changed (Celery tasks may run on a fresh loop), so
+    callers never hold a connection pool bound to a dead loop. Callers are
+    expected to treat Redis as best-effort and fall back on errors.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = aioredis.from_url(
+            get_settings().redis_url,
+            socket_connect_timeout=1.0,
+            socket_timeout=1.0,
+        )
+        _client_loop = loop
+    return _client
+
+
+def get_sync_redis() -> redis.Redis:
+    """Process-wide sync client, for publishing from Celery tasks, handlers
+    and session hooks; its connection pool is shared across threads."""
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(
+            get_settings().redis_url, socket_connect_timeout=1.0, socket_timeout=1.0,
+        )
+    return _sync_client
+
+
+async def close_redis() -> None:
+    """Close the shared client (app / worker shutdown)."""
+    global _client, _client_loop
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        await _client.aclose()
+    _client = None
+    _client_loop = None
@@ -17,6 +17,7 @@ Endpoints:
   DELETE /admin/comments/{id}                 — Delete comment
   GET    /admin/agents                        — AI agent list
   POST   /admin/agents/{id}/toggle            — Toggle agent active/inactive
+  GET    /admin/llm-cache                     — LLM response cache hit/miss stats
 """
 import logging
 import uuid
@@ -35,6 +36,7 @@ from app.models.billing import IndividualSubscription, ReportPurchase, OrgSubscr
 from app.models.company import Company, CompanyMember
 from app.models.moderation import ResidentBan
 from app.routers.auth import get_current_resident
+from app.services import auth_cache
 
 logger = logging.getLogger(__name__)
 
@@ -562,6 +564,7 @@ async def ban_resident(
     )
     db.add(ban)
 
+    auth_cache.invalidate(db, resident)
     resident.is_eliminated = True
     resident.eliminated_at = datetime.utcnow()
     resident.banned_reason = body.reason
@@ -592,6 +595,7 @@ async def unban_resident(
     res_result = await db.execute(select(Resident).where(Resident.id == rid))
     resident = res_result.scalar_one_or_none()
     if resident:
+        auth_cache.invalidate(db, resident)
         resident.is_eliminated = False
         resident.eliminated_at = None
         resident.banned_reason = None
@@ -617,7 +621,11 @@ async def delete_post(
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
+    from app.services import feed_cache
+
     await db.delete(post)
+    await db.commit()
+    await feed_cache.remove_post(post.id, post.submolt)
     return {"success": True, "message": "Post deleted"}
 
 
@@ -706,6 +714,7 @@ async def toggle_agent(
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
 
+    auth_cache.invalidate(db, agent)
     agent.is_eliminated = not agent.is_eliminated
     if agent.is_eliminated:
         agent.eliminated_at = datetime.utcnow()
@@ -725,3 +734,15 @@ async def check_admin(
     """Check if current user is a superadmin."""
     is_admin = str(current_resident.id)[:8] in SUPERADMIN_IDS
     return {"is_admin": is_admin}
+
+
+# ── LLM Cache ──
+
+@router.get("/llm-cache")
+async def admin_llm_cache_stats(
+    current_resident: Resident = Depends(get_current_resident),
+):
+    """Hit/miss counters per cached LLM call site, across all workers."""
+    require_superadmin(current_resident)
+    from app.services import llm_cache
+    return {"sites": await llm_cache.global_stats(), "ttls": llm_cache.SITE_TTLS}
@@ -1,10 +1,15 @@
+import asyncio
+import json
 import secrets
 import hashlib
 import base64
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Request, Query
+from fastapi import (
+    APIRouter, Depends, HTTPException, status, Header, Request, Query,
+    WebSocket, WebSocketDisconnect,
+)
 from fastapi.responses import RedirectResponse
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -27,6 +32,7 @@ from app.utils.security import (
     decode_access_token,
 )
 from app.config import get_settings
+from app.services import activity, auth_cache
 
 router = APIRouter(prefix="/auth")
 settings = get_settings()
@@ -36,11 +42,34 @@ settings = get_settings()
 _oauth_states: dict[str, dict] = {}
 
 
+async def _resident_for_api_key(db: AsyncSession, key_hash: str) -> Optional[Resident]:
+    resident_id = await auth_cache.get(key_hash)
+    if resident_id is not None:
+        resident = await db.get(Resident, resident_id)
+        if resident and resident._api_key_hash == key_hash:
+            return resident
+        await auth_cache.drop(key_hash)
+
+    # Indexed lookup (migration 028)
+    result = await db.execute(
+        select(Resident).where(Resident._api_key_hash == key_hash)
+    )
+    resident = result.scalar_one_or_none()
+    if resident:
+        await auth_cache.put(key_hash, resident.id)
+    return resident
+
+
 async def get_current_resident(
     authorization: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
 ) -> Resident:
-    """Get current resident from Bearer token (works for both API keys and JWTs)"""
+    """Get current resident from Bearer token (works for both API keys and JWTs).
+
+    API keys resolve through services/auth_cache (key hash → resident id),
+    then a primary-key fetch. last_active goes through the write-behind
+    buffer in services/activity, so authenticating doesn't dirty the row.
+    """
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -57,18 +86,14 @@ async def get_current_resident(
 
     # Check if it's an API key (genesis_xxx format)
     if token.startswith("genesis_"):
-        key_hash = hash_api_key(token)
-        result = await db.execute(
-            select(Resident).where(Resident._api_key_hash == key_hash)
-        )
-        resident = result.scalar_one_or_none()
+        resident = await _resident_for_api_key(db, hash_api_key(token))
         if not resident:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid API key",
             )
         # Update last active
-        resident.last_active = datetime.utcnow()
+        await activity.touch(resident)
         return resident
 
     # Otherwise treat as JWT
@@ -86,17 +111,14 @@ async def get_current_resident(
             detail="Invalid token payload",
         )
 
-    result = await db.execute(
-        select(Resident).where(Resident.id == UUID(resident_id))
-    )
-    resident = result.scalar_one_or_none()
+    resident = await db.get(Resident, UUID(resident_id))
     if not resident:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Resident not found",
         )
 
-    resident.last_active = datetime.utcnow()
+    await activity.touch(resident)
     return resident
 
 
@@ -113,6 +135,32 @@ async def get_optional_resident(
         return None
 
 
+WS_AUTH_TIMEOUT = 5.0
+
+
+async def websocket_token(websocket: WebSocket) -> Optional[str]:
+    """Bearer token a WebSocket client sends as its first message.
+
+    Call after accept(). The client's first message is
+    {"type": "auth", "token": "..."}, with no token when signed out.
+    Credentials never go in the URL, where access and proxy logs keep them:
+    a ?token= query parameter, a missing auth message or one that is late
+    closes the socket with 1008 (raised as WebSocketDisconnect).
+    """
+    if "token" in websocket.query_params:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        raise WebSocketDisconnect(status.WS_1008_POLICY_VIOLATION)
+    try:
+        message = json.loads(await asyncio.wait_for(websocket.receive_text(), WS_AUTH_TIMEOUT))
+    except (asyncio.TimeoutError, ValueError):
+        message = None
+    if not isinstance(message, dict) or message.get("type") != "auth":
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        raise WebSocketDisconnect(status.WS_1008_POLICY_VIOLATION)
+    token = message.get("token")
+    return token if isinstance(token, str) and token else None
+
+
 @router.post("/agents/register", response_model=AgentRegisterResponse)
 async def register_agent(
     request: AgentRegisterRequest,
@@ -26,6 +26,7 @@ from app.models.billing import IndividualSubscription, ReportPurchase, OrgSubscr
 from app.models.company import Company, CompanyMember
 from app.routers.auth import get_current_resident
 from app.config import get_settings
+from app.services import llm_cache
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -373,6 +374,9 @@ async def get_report(
     }
 
 
+REPORT_MODEL = "claude-sonnet-4-5-20250929"
+
+
 async def _generate_report(resident: Resident, report_type: str, lang: str) -> str:
     """Generate a category report using the Anthropic API."""
     if not settings.claude_api_key:
@@ -407,6 +411,14 @@ async def _generate_report(resident: Resident, report_type: str, lang: str) -> s
 
     full_prompt = f"{prompt}\n\n【診断結果】\n{diagnosis_context}"
 
+    # Identical diagnosis + report type → identical prompt; reuse the report
+    return await llm_cache.cached_call(
+        "report", REPORT_MODEL, {"max_tokens": 4096}, "", full_prompt,
+        lambda: _request_report(full_prompt),
+    )
+
+
+async def _request_report(full_prompt: str) -> str:
     try:
         async with httpx.AsyncClient(timeout=60.0) as client:
             response = await client.post(
@@ -417,7 +429,7 @@ async def _generate_report(resident: Resident, report_type: str, lang: str) -> s
                     "content-type": "application/json",
                 },
                 json={
-                    "model": "claude-sonnet-4-5-20250929",
+                    "model": REPORT_MODEL,
                     "max_tokens": 4096,
                     "messages": [{"role": "user", "content": full_prompt}],
                 },
@@ -1,8 +1,10 @@
+import base64
+import json
 from datetime import datetime
 from typing import Optional, Literal
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, func, and_, or_, desc, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -20,7 +22,15 @@ from app.schemas.comment import (
 )
 from app.schemas.post import VoteRequest, VoteResponse
 from app.routers.auth import get_current_resident, get_optional_resident
-from app.utils.karma import get_default_limits, get_daily_vote_count
+from app.config import get_settings
+from app.utils.karma import (
+    get_default_limits,
+    get_daily_vote_count,
+    get_daily_comment_count,
+    get_last_comment_time,
+)
+from app.services import embedding_queue, feed_cache, quota
+from app.services import vote as vote_service
 from app.services.notification import notify_on_mentions
 
 router = APIRouter()
@@ -51,31 +61,169 @@ def build_comment_tree(
     user_votes: dict[UUID, int],
     parent_id: Optional[UUID] = None,
 ) -> list[CommentTree]:
-    """Build nested comment tree from flat list"""
+    """Build nested comment tree from flat list in a single pass.
+
+    Siblings keep their order in comments. Comments whose parent is neither
+    parent_id nor in the list are left out.
+    """
+    nodes: dict[UUID, CommentTree] = {}
+    for comment in comments:
+        nodes[comment.id] = CommentTree(
+            id=comment.id,
+            post_id=comment.post_id,
+            author=AuthorInfo(
+                id=comment.author.id,
+                name=comment.author.name,
+                avatar_url=comment.author.avatar_url,
+            ),
+            parent_id=comment.parent_id,
+            content=comment.content,
+            upvotes=comment.upvotes,
+            downvotes=comment.downvotes,
+            score=comment.upvotes - comment.downvotes,
+            created_at=comment.created_at,
+            user_vote=user_votes.get(comment.id),
+            depth=comment.depth or 0,
+            replies=[],
+        )
+
     tree = []
     for comment in comments:
         if comment.parent_id == parent_id:
-            tree_item = CommentTree(
-                id=comment.id,
-                post_id=comment.post_id,
-                author=AuthorInfo(
-                    id=comment.author.id,
-                    name=comment.author.name,
-                    avatar_url=comment.author.avatar_url,
-                ),
-                parent_id=comment.parent_id,
-                content=comment.content,
-                upvotes=comment.upvotes,
-                downvotes=comment.downvotes,
-                score=comment.upvotes - comment.downvotes,
-                created_at=comment.created_at,
-                user_vote=user_votes.get(comment.id),
-                replies=build_comment_tree(comments, user_votes, comment.id),
-            )
-            tree.append(tree_item)
+            tree.append(nodes[comment.id])
+        elif comment.parent_id in nodes:
+            nodes[comment.parent_id].replies.append(nodes[comment.id])
     return tree
 
 
+# Replies loaded under one page of top-level comments, shallowest first
+MAX_LOADED_REPLIES = 500
+
+
+def _comment_sort_columns(sort: str) -> list:
+    """Keyset sort key: (column expressions..., Comment.id), all descending."""
+    if sort == "new":
+        return [Comment.created_at, Comment.id]
+    if sort == "controversial":
+        # High engagement but mixed votes
+        return [Comment.upvotes + Comment.downvotes, Comment.id]
+    return [Comment.upvotes - Comment.downvotes, Comment.id]
+
+
+def _encode_comment_cursor(sort: str, comment) -> str:
+    """Cursor after comment (a Comment or CommentTree)."""
+    if sort == "new":
+        values = [comment.created_at.isoformat()]
+    elif sort == "controversial":
+        values = [comment.upvotes + comment.downvotes]
+    else:
+        values = [comment.upvotes - comment.downvotes]
+    raw = json.dumps([sort, *values, str(comment.id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_comment_cursor(sort: str, cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, value, comment_id = json.loads(raw)
+        if cursor_sort != sort:
+            raise ValueError("cursor belongs to a different sort")
+        if sort == "new":
+            value = datetime.fromisoformat(value)
+        return [value, UUID(comment_id)]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _comment_page(
+    db: AsyncSession,
+    post_id: UUID,
+    parent: Optional[Comment],
+    sort: str,
+    limit: int,
+    depth: int,
+    cursor: Optional[str],
+    current_resident: Optional[Resident],
+) -> tuple[list[CommentTree], bool, Optional[str]]:
+    """One page of comments directly under parent (None = top level), each with
+    its replies up to depth levels down.
+
+    Top-level page: one keyset query. Replies: one query of path-range scans
+    over the page's subtrees, capped at MAX_LOADED_REPLIES. Nodes whose direct
+    replies were cut off get more_replies/replies_cursor for lazy loading.
+    """
+    sort_cols = _comment_sort_columns(sort)
+    order = [desc(c) for c in sort_cols]
+
+    query = select(Comment).options(selectinload(Comment.author)).where(Comment.post_id == post_id)
+    if parent is None:
+        query = query.where(Comment.depth == 0)
+    else:
+        query = query.where(Comment.parent_id == parent.id)
+    if cursor:
+        query = query.where(tuple_(*sort_cols) < tuple_(*_decode_comment_cursor(sort, cursor)))
+    result = await db.execute(query.order_by(*order).limit(limit + 1))
+    top = list(result.scalars().all())
+    has_more = len(top) > limit
+    top = top[:limit]
+
+    comments = list(top)
+    if top and depth > 0:
+        max_depth = top[0].depth + depth
+        replies_result = await db.execute(
+            select(Comment)
+            .options(selectinload(Comment.author))
+            .where(
+                Comment.post_id == post_id,
+                Comment.depth <= max_depth,
+                or_(*[c.subtree_filter() for c in top]),
+            )
+            # Parents before children, siblings in sort order
+            .order_by(Comment.depth, *order)
+            .limit(MAX_LOADED_REPLIES)
+        )
+        comments.extend(replies_result.scalars().all())
+
+    # Direct reply counts, to tell which nodes have more to load
+    reply_counts: dict[UUID, int] = {}
+    if comments:
+        count_result = await db.execute(
+            select(Comment.parent_id, func.count(Comment.id))
+            .where(Comment.parent_id.in_([c.id for c in comments]))
+            .group_by(Comment.parent_id)
+        )
+        reply_counts = dict(count_result.all())
+
+    user_votes = {}
+    if current_resident and comments:
+        vote_result = await db.execute(
+            select(Vote).where(
+                and_(
+                    Vote.resident_id == current_resident.id,
+                    Vote.target_type == "comment",
+                    Vote.target_id.in_([c.id for c in comments]),
+                )
+            )
+        )
+        for vote in vote_result.scalars():
+            user_votes[vote.target_id] = vote.value
+
+    tree = build_comment_tree(comments, user_votes, parent.id if parent else None)
+
+    # Loaded replies of any node are a prefix of its replies in sort order,
+    # so the last loaded one is where "load more" continues
+    stack = list(tree)
+    while stack:
+        node = stack.pop()
+        node.more_replies = reply_counts.get(node.id, 0) - len(node.replies)
+        if node.more_replies > 0 and node.replies:
+            node.replies_cursor = _encode_comment_cursor(sort, node.replies[-1])
+        stack.extend(node.replies)
+
+    next_cursor = _encode_comment_cursor(sort, top[-1]) if has_more and top else None
+    return tree, has_more, next_cursor
+
+
 @router.post("/posts/{post_id}/comments", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
 async def create_comment(
     post_id: UUID,
@@ -96,7 +244,19 @@ async def create_comment(
             detail="Post not found",
         )
 
+    # Daily comment limit
+    settings = get_settings()
+    daily_comments = await quota.count(
+        "comments", current_resident.id, lambda: get_daily_comment_count(db, current_resident.id),
+    )
+    if daily_comments >= settings.daily_comment_limit:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Daily comment limit reached ({settings.daily_comment_limit} comments/day)",
+        )
+
     # Verify parent comment if specified
+    parent = None
     if comment_data.parent_id:
         parent_result = await db.execute(
             select(Comment).where(
@@ -106,18 +266,30 @@ async def create_comment(
                 )
             )
         )
-        if not parent_result.scalar_one_or_none():
+        parent = parent_result.scalar_one_or_none()
+        if not parent:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Parent comment not found",
             )
 
+    # Cooldown last, so a request rejected above doesn't start one
+    if not await quota.take_cooldown(
+        "comment", current_resident.id, settings.comment_cooldown_seconds,
+        load_last=lambda: get_last_comment_time(db, current_resident.id),
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Please wait before commenting again",
+        )
+
     comment = Comment(
         post_id=post_id,
         author_id=current_resident.id,
         parent_id=comment_data.parent_id,
         content=comment_data.content,
     )
+    comment.place_in_thread(parent)
 
     db.add(comment)
 
@@ -126,6 +298,9 @@ async def create_comment(
     current_resident.comment_count += 1
 
     await db.commit()
+    await quota.record("comments", current_resident.id)
+    await feed_cache.invalidate_card(post.id)
+    await embedding_queue.enqueue("comment", comment.id)
     await db.refresh(comment, ["author"])
 
     # Process @mentions in comment content
@@ -140,58 +315,73 @@ async def create_comment(
 async def get_comments(
     post_id: UUID,
     sort: Literal["top", "new", "controversial"] = "top",
+    limit: int = Query(default=50, ge=1, le=200, description="Top-level comments per page"),
+    depth: int = Query(default=8, ge=0, le=50, description="Reply levels to include"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
     current_resident: Optional[Resident] = Depends(get_optional_resident),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get comments for a post as a tree structure"""
+    """Get a page of top-level comments for a post, with replies as a tree.
+
+    Replies deeper than depth (or past the per-page reply cap) are reported
+    through more_replies/replies_cursor and fetched from /comments/{id}/replies.
+    """
     # Verify post exists
     post_result = await db.execute(
         select(Post).where(Post.id == post_id)
     )
-    if not post_result.scalar_one_or_none():
+    post = post_result.scalar_one_or_none()
+    if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found",
         )
 
-    # Get all comments for this post
-    query = select(Comment).options(selectinload(Comment.author)).where(Comment.post_id == post_id)
+    tree, has_more, next_cursor = await _comment_page(
+        db, post_id, None, sort, limit, depth, cursor, current_resident,
+    )
 
-    # Apply sorting
-    if sort == "new":
-        query = query.order_by(Comment.created_at.desc())
-    elif sort == "controversial":
-        # High engagement but mixed votes
-        query = query.order_by((Comment.upvotes + Comment.downvotes).desc())
-    else:  # top
-        query = query.order_by((Comment.upvotes - Comment.downvotes).desc())
+    return CommentList(
+        comments=tree,
+        total=post.comment_count,
+        has_more=has_more,
+        next_cursor=next_cursor,
+    )
 
-    result = await db.execute(query)
-    comments = list(result.scalars().all())
 
-    # Get user votes
-    user_votes = {}
-    if current_resident:
-        comment_ids = [c.id for c in comments]
-        if comment_ids:
-            vote_result = await db.execute(
-                select(Vote).where(
-                    and_(
-                        Vote.resident_id == current_resident.id,
-                        Vote.target_type == "comment",
-                        Vote.target_id.in_(comment_ids),
-                    )
-                )
-            )
-            for vote in vote_result.scalars():
-                user_votes[vote.target_id] = vote.value
+@router.get("/comments/{comment_id}/replies", response_model=CommentList)
+async def get_comment_replies(
+    comment_id: UUID,
+    sort: Literal["top", "new", "controversial"] = "top",
+    limit: int = Query(default=20, ge=1, le=200, description="Direct replies per page"),
+    depth: int = Query(default=4, ge=0, le=50, description="Further reply levels to include"),
+    cursor: Optional[str] = Query(default=None, description="replies_cursor / next_cursor to continue from"),
+    current_resident: Optional[Resident] = Depends(get_optional_resident),
+    db: AsyncSession = Depends(get_db),
+):
+    """Load more replies under a comment (lazy subtree loading)"""
+    result = await db.execute(
+        select(Comment).where(Comment.id == comment_id)
+    )
+    parent = result.scalar_one_or_none()
+    if not parent:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found",
+        )
 
-    # Build tree
-    tree = build_comment_tree(comments, user_votes)
+    tree, has_more, next_cursor = await _comment_page(
+        db, parent.post_id, parent, sort, limit, depth, cursor, current_resident,
+    )
+    total = (await db.execute(
+        select(func.count(Comment.id)).where(Comment.parent_id == comment_id)
+    )).scalar() or 0
 
     return CommentList(
         comments=tree,
-        total=len(comments),
+        total=total,
+        has_more=has_more,
+        next_cursor=next_cursor,
     )
 
 
@@ -224,70 +414,28 @@ async def vote_on_comment(
 
     # Daily vote limit
     limits = get_default_limits()
-    daily_votes = await get_daily_vote_count(db, current_resident.id)
+    daily_votes = await quota.count(
+        "votes", current_resident.id, lambda: get_daily_vote_count(db, current_resident.id),
+    )
     if daily_votes >= limits['v_max']:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=f"Daily vote limit reached ({limits['v_max']} votes/day)",
         )
 
-    # Get existing vote
-    vote_result = await db.execute(
-        select(Vote).where(
-            and_(
-                Vote.resident_id == current_resident.id,
-                Vote.target_type == "comment",
-                Vote.target_id == comment_id,
-            )
-        )
+    # Vote row upsert + atomic counter delta (no read-modify-write on the comment)
+    result = await vote_service.set_vote(
+        db, current_resident.id, "comment", comment_id, vote_data.value,
     )
-    existing_vote = vote_result.scalar_one_or_none()
-
-    old_value = existing_vote.value if existing_vote else 0
-    new_value = vote_data.value
-
-    if old_value == new_value:
-        return VoteResponse(
-            success=True,
-            new_upvotes=comment.upvotes,
-            new_downvotes=comment.downvotes,
-            new_score=comment.upvotes - comment.downvotes,
-        )
-
-    # Update vote counts on comment
-    if old_value == 1:
-        comment.upvotes -= 1
-    elif old_value == -1:
-        comment.downvotes -= 1
-
-    if new_value == 1:
-        comment.upvotes += 1
-    elif new_value == -1:
-        comment.downvotes += 1
-
-    # Update or create vote record
-    if new_value == 0:
-        if existing_vote:
-            await db.delete(existing_vote)
-    elif existing_vote:
-        existing_vote.value = new_value
-    else:
-        new_vote = Vote(
-            resident_id=current_resident.id,
-            target_type="comment",
-            target_id=comment_id,
-            comment_id=comment_id,
-            value=new_value,
-        )
-        db.add(new_vote)
-
     await db.commit()
+    if result.old_value == 0 and vote_data.value != 0:
+        await quota.record("votes", current_resident.id)
 
     return VoteResponse(
         success=True,
-        new_upvotes=comment.upvotes,
-        new_downvotes=comment.downvotes,
-        new_score=comment.upvotes - comment.downvotes,
+        new_upvotes=result.upvotes,
+        new_downvotes=result.downvotes,
+        new_score=result.upvotes - result.downvotes,
     )
 
 
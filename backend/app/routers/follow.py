@@ -1,6 +1,8 @@
 """
 Follow Router - Endpoints for follow functionality
 """
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -223,20 +225,30 @@ async def get_following(
 async def get_feed(
     limit: int = Query(default=25, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
     current_resident: Resident = Depends(get_current_resident),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get personalized feed from followed residents"""
-    posts_with_votes, total, has_more = await follow_service.get_feed_posts(
-        db,
-        current_resident.id,
-        limit,
-        offset,
-        current_resident.id,
-    )
+    """Get personalized feed from followed residents.
+
+    Pass cursor (the previous page's next_cursor) to page through the
+    cached home timeline; offset is still accepted for compatibility.
+    """
+    try:
+        posts_with_votes, total, has_more, next_cursor = await follow_service.get_feed_posts(
+            db,
+            current_resident.id,
+            limit,
+            offset,
+            current_resident.id,
+            cursor=cursor,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
     return FeedResponse(
         posts=[post_to_feed_post(post, vote) for post, vote in posts_with_votes],
         total=total,
         has_more=has_more,
+        next_cursor=next_cursor,
     )
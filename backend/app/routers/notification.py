@@ -2,7 +2,7 @@
 Notification Router - Endpoints for notification functionality
 """
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, WebSocket, WebSocketDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -14,8 +14,9 @@ from app.schemas.notification import (
     NotificationActionResponse,
     NotificationActor,
 )
-from app.routers.auth import get_current_resident
+from app.routers.auth import get_current_resident, get_optional_resident, websocket_token
 from app.services import notification as notification_service
+from app.services import notification_stream
 
 router = APIRouter(prefix="/notifications")
 
@@ -69,6 +70,32 @@ async def get_notifications(
     )
 
 
+@router.websocket("/ws")
+async def notification_websocket(websocket: WebSocket):
+    """Push new notifications and unread counts to the current resident.
+
+    The client authenticates with its first message (see
+    auth.websocket_token).
+    """
+    from app.database import AsyncSessionLocal
+
+    await websocket.accept()
+    try:
+        token = await websocket_token(websocket)
+        async with AsyncSessionLocal() as db:
+            resident = await get_optional_resident(f"Bearer {token}", db) if token else None
+            if not resident:
+                await websocket.close(code=4401)
+                return
+            resident_id = resident.id
+            unread = await notification_service.get_unread_count(db, resident_id)
+        await notification_stream.subscribe(resident_id, websocket, unread)
+    except WebSocketDisconnect:
+        pass
+    except Exception:
+        pass
+
+
 @router.get("/unread/count", response_model=UnreadCountResponse)
 async def get_unread_count(
     current_resident: Resident = Depends(get_current_resident),
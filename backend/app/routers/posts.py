@@ -1,12 +1,15 @@
+import base64
+import json
 from datetime import datetime
 from typing import Optional, Literal
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select, func, desc, and_, case, literal
+from sqlalchemy import select, func, desc, and_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.database import get_db
+from app.redis_client import get_redis
 from app.models.resident import Resident
 from app.models.post import Post
 from app.models.vote import Vote
@@ -26,6 +29,8 @@ from app.utils.karma import (
     get_daily_vote_count,
     get_daily_post_count,
 )
+from app.services import embedding_queue, feed_cache, quota, timeline
+from app.services import vote as vote_service
 from app.services.notification import notify_on_mentions
 
 router = APIRouter(prefix="/posts")
@@ -55,6 +60,15 @@ def post_to_response(post: Post, user_vote: Optional[int] = None) -> PostRespons
     )
 
 
+async def _fan_out_to_timelines(db: AsyncSession, post: Post) -> None:
+    """Queue the home-timeline fan-out; run it inline if the broker is unavailable."""
+    try:
+        from app.tasks.feed import fan_out_post_task
+        fan_out_post_task.delay(str(post.id))
+    except Exception:
+        await timeline.fan_out_post(db, post.id, post.author_id, post.created_at)
+
+
 @router.post("", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
 async def create_post(
     post_data: PostCreate,
@@ -64,7 +78,9 @@ async def create_post(
     """Create a new post"""
     # Daily post limit
     limits = get_default_limits()
-    daily_posts = await get_daily_post_count(db, current_resident.id)
+    daily_posts = await quota.count(
+        "posts", current_resident.id, lambda: get_daily_post_count(db, current_resident.id),
+    )
     if daily_posts >= limits['p_max']:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -99,16 +115,146 @@ async def create_post(
         submolt_obj.post_count += 1
 
     await db.commit()
+    await quota.record("posts", current_resident.id)
     await db.refresh(post, ["author"])
 
     # Process @mentions in post content
     mention_text = f"{post.title} {post.content or ''}"
     await notify_on_mentions(db, current_resident.id, mention_text, "post", post.id, post)
     await db.commit()
+    await feed_cache.index_post(post)
+    await embedding_queue.enqueue("post", post.id)
+    await _fan_out_to_timelines(db, post)
 
     return post_to_response(post)
 
 
+def _encode_cursor(sort: str, post, hot_score: Optional[float] = None) -> str:
+    """Cursor after post (a Post, or a cached PostResponse card plus its hot_score)."""
+    if sort == "new":
+        values = [post.created_at.isoformat()]
+    elif sort == "top":
+        values = [post.upvotes - post.downvotes]
+    elif sort == "rising":
+        values = [post.upvotes - post.downvotes, post.created_at.isoformat()]
+    else:
+        values = [post.hot_score if hot_score is None else hot_score]
+    raw = json.dumps([sort, *values, str(post.id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(sort: str, cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, *values, post_id = json.loads(raw)
+        if cursor_sort != sort:
+            raise ValueError("cursor belongs to a different sort")
+        if sort == "new":
+            values = [datetime.fromisoformat(values[0])]
+        elif sort == "rising":
+            values = [int(values[0]), datetime.fromisoformat(values[1])]
+        return [*values, UUID(post_id)]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+_COUNT_TTL_SECONDS = 60
+
+
+async def _cached_post_count(db: AsyncSession, submolt: Optional[str], author: Optional[str]) -> int:
+    """Total for the listing, cached in Redis for a minute (exact count on a miss)."""
+    cache_key = f"posts:count:{submolt or '*'}:{author or '*'}"
+    try:
+        cached = await get_redis().get(cache_key)
+        if cached is not None:
+            return int(cached)
+    except Exception:
+        pass
+
+    count_query = select(func.count(Post.id))
+    if submolt:
+        count_query = count_query.where(Post.submolt == submolt)
+    if author:
+        author_subq = select(Resident.id).where(Resident.name == author).scalar_subquery()
+        count_query = count_query.where(Post.author_id == author_subq)
+    total = (await db.execute(count_query)).scalar() or 0
+
+    try:
+        await get_redis().setex(cache_key, _COUNT_TTL_SECONDS, total)
+    except Exception:
+        pass
+    return total
+
+
+async def _user_votes(db: AsyncSession, resident: Optional[Resident], post_ids: list) -> dict:
+    """{post_id: vote value} for the resident's votes on these posts."""
+    if not resident or not post_ids:
+        return {}
+    vote_result = await db.execute(
+        select(Vote).where(
+            and_(
+                Vote.resident_id == resident.id,
+                Vote.target_type == "post",
+                Vote.target_id.in_(post_ids),
+            )
+        )
+    )
+    return {vote.target_id: vote.value for vote in vote_result.scalars()}
+
+
+async def _list_from_feed_cache(
+    db: AsyncSession,
+    sort: str,
+    submolt: Optional[str],
+    limit: int,
+    offset: int,
+    cursor: Optional[str],
+    current_resident: Optional[Resident],
+) -> Optional[PostList]:
+    """Serve a listing page from the Redis feed cache, or None on a miss.
+
+    Ids and cards come from Redis (cards missing from the card cache are
+    loaded in one query and cached); only the caller's own votes touch
+    Postgres, so anonymous pages are pure cache reads.
+    """
+    after_id = _decode_cursor(sort, cursor)[-1] if cursor else None
+    page = await feed_cache.get_page(submolt, sort, offset, limit, after_id)
+    if page is None:
+        return None
+    entries, has_more = page
+    post_ids = [post_id for post_id, _ in entries]
+
+    cards = await feed_cache.get_cards(post_ids)
+    missing = [post_id for post_id in post_ids if post_id not in cards]
+    if missing:
+        result = await db.execute(
+            select(Post).options(selectinload(Post.author)).where(Post.id.in_(missing))
+        )
+        loaded = {
+            p.id: post_to_response(p).model_dump(mode="json", exclude={"user_vote"})
+            for p in result.scalars()
+        }
+        await feed_cache.put_cards(loaded)
+        cards.update(loaded)
+
+    user_votes = await _user_votes(db, current_resident, post_ids)
+    # Posts deleted since the feed was written have no card and are skipped
+    posts = [
+        PostResponse(**cards[post_id], user_vote=user_votes.get(post_id))
+        for post_id in post_ids if post_id in cards
+    ]
+    next_cursor = None
+    if has_more and posts:
+        next_cursor = _encode_cursor(sort, posts[-1], hot_score=dict(entries)[posts[-1].id])
+
+    return PostList(
+        posts=posts,
+        total=await _cached_post_count(db, submolt, None),
+        has_more=has_more,
+        next_cursor=next_cursor,
+    )
+
+
 @router.get("", response_model=PostList)
 async def list_posts(
     sort: Literal["hot", "new", "top", "rising"] = "hot",
@@ -116,14 +262,28 @@ async def list_posts(
     author: Optional[str] = Query(default=None),
     limit: int = Query(default=25, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
     current_resident: Optional[Resident] = Depends(get_optional_resident),
     db: AsyncSession = Depends(get_db),
 ):
-    """List posts with sorting and filtering"""
+    """List posts with sorting and filtering.
+
+    Pass cursor (the previous page's next_cursor) for keyset pagination;
+    offset is still accepted for compatibility. total is cached for a minute.
+    Listings without an author filter are served from the Redis feed cache
+    when it holds the requested page, and from Postgres otherwise.
+    """
     import logging
     logger = logging.getLogger(__name__)
 
     try:
+        if not author:
+            cached = await _list_from_feed_cache(
+                db, sort, submolt, limit, offset, cursor, current_resident,
+            )
+            if cached is not None:
+                return cached
+
         query = select(Post).options(selectinload(Post.author))
 
         # Filter by submolt
@@ -135,29 +295,16 @@ async def list_posts(
             author_subq = select(Resident.id).where(Resident.name == author).scalar_subquery()
             query = query.where(Post.author_id == author_subq)
 
-        # Apply sorting
-        if sort == "new":
-            query = query.order_by(desc(Post.created_at))
-        elif sort == "top":
-            query = query.order_by(desc(Post.upvotes - Post.downvotes))
-        elif sort == "rising":
-            # Recent posts with good score
-            query = query.order_by(desc(Post.upvotes - Post.downvotes), desc(Post.created_at))
-        else:  # hot
-            # Reddit-style hot algorithm: sign * log10(max(abs(score), 1)) + seconds_since_epoch / 45000
-            genesis_epoch = datetime(2024, 1, 1)
-            score_expr = Post.upvotes - Post.downvotes
-            sign_expr = case(
-                (score_expr > 0, 1),
-                (score_expr < 0, -1),
-                else_=0,
-            )
-            abs_score = func.greatest(func.abs(score_expr), 1)
-            hot_score = sign_expr * func.log(abs_score) + func.extract('epoch', Post.created_at - genesis_epoch) / 45000
-            query = query.order_by(desc(hot_score))
+        # Sorting: indexed (sort key, id) columns, so every page is an index range scan
+        sort_cols = feed_cache.sort_columns(sort)
+        query = query.order_by(*[desc(c) for c in sort_cols])
 
         # Pagination
-        query = query.offset(offset).limit(limit + 1)
+        if cursor:
+            query = query.where(tuple_(*sort_cols) < tuple_(*_decode_cursor(sort, cursor)))
+        elif offset:
+            query = query.offset(offset)
+        query = query.limit(limit + 1)
 
         result = await db.execute(query)
         posts = result.scalars().all()
@@ -167,36 +314,18 @@ async def list_posts(
             posts = posts[:limit]
 
         # Get user votes if authenticated
-        user_votes = {}
-        if current_resident:
-            post_ids = [p.id for p in posts]
-            vote_result = await db.execute(
-                select(Vote).where(
-                    and_(
-                        Vote.resident_id == current_resident.id,
-                        Vote.target_type == "post",
-                        Vote.target_id.in_(post_ids),
-                    )
-                )
-            )
-            for vote in vote_result.scalars():
-                user_votes[vote.target_id] = vote.value
+        user_votes = await _user_votes(db, current_resident, [p.id for p in posts])
 
-        # Count total
-        count_query = select(func.count(Post.id))
-        if submolt:
-            count_query = count_query.where(Post.submolt == submolt)
-        if author:
-            author_subq2 = select(Resident.id).where(Resident.name == author).scalar_subquery()
-            count_query = count_query.where(Post.author_id == author_subq2)
-        total_result = await db.execute(count_query)
-        total = total_result.scalar() or 0
+        total = await _cached_post_count(db, submolt, author)
 
         return PostList(
             posts=[post_to_response(p, user_votes.get(p.id)) for p in posts],
             total=total,
             has_more=has_more,
+            next_cursor=_encode_cursor(sort, posts[-1]) if has_more and posts else None,
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in list_posts: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -265,6 +394,7 @@ async def delete_post(
 
     await db.delete(post)
     await db.commit()
+    await feed_cache.remove_post(post.id, post.submolt)
 
     return {"success": True}
 
@@ -298,71 +428,30 @@ async def vote_on_post(
 
     # Daily vote limit
     limits = get_default_limits()
-    daily_votes = await get_daily_vote_count(db, current_resident.id)
+    daily_votes = await quota.count(
+        "votes", current_resident.id, lambda: get_daily_vote_count(db, current_resident.id),
+    )
     if daily_votes >= limits['v_max']:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=f"Daily vote limit reached ({limits['v_max']} votes/day)",
         )
 
-    # Get existing vote
-    vote_result = await db.execute(
-        select(Vote).where(
-            and_(
-                Vote.resident_id == current_resident.id,
-                Vote.target_type == "post",
-                Vote.target_id == post_id,
-            )
-        )
+    # Vote row upsert + atomic counter delta (no read-modify-write on the post)
+    result = await vote_service.set_vote(
+        db, current_resident.id, "post", post_id, vote_data.value,
     )
-    existing_vote = vote_result.scalar_one_or_none()
-
-    # Calculate changes
-    old_value = existing_vote.value if existing_vote else 0
-    new_value = vote_data.value
-
-    if old_value == new_value:
-        return VoteResponse(
-            success=True,
-            new_upvotes=post.upvotes,
-            new_downvotes=post.downvotes,
-            new_score=post.upvotes - post.downvotes,
-        )
-
-    # Update vote counts on post
-    if old_value == 1:
-        post.upvotes -= 1
-    elif old_value == -1:
-        post.downvotes -= 1
-
-    if new_value == 1:
-        post.upvotes += 1
-    elif new_value == -1:
-        post.downvotes += 1
-
-    # Update or create vote record
-    if new_value == 0:
-        if existing_vote:
-            await db.delete(existing_vote)
-    elif existing_vote:
-        existing_vote.value = new_value
-    else:
-        new_vote = Vote(
-            resident_id=current_resident.id,
-            target_type="post",
-            target_id=post_id,
-            post_id=post_id,
-            value=new_value,
-        )
-        db.add(new_vote)
-
     await db.commit()
+    if result.old_value == 0 and vote_data.value != 0:
+        await quota.record("votes", current_resident.id)
+    if result.old_value != vote_data.value:
+        await feed_cache.refresh_posts(db, [post_id])
 
     return VoteResponse(
         success=True,
-        new_upvotes=post.upvotes,
-        new_downvotes=post.downvotes,
-        new_score=post.upvotes - post.downvotes,
+        new_upvotes=result.upvotes,
+        new_downvotes=result.downvotes,
+        new_score=result.upvotes - result.downvotes,
     )
 
 
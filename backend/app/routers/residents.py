@@ -17,6 +17,7 @@ from app.schemas.comment import (
     PostInfo,
 )
 from app.routers.auth import get_current_resident, get_optional_resident
+from app.services import auth_cache
 
 router = APIRouter(prefix="/residents")
 
@@ -36,6 +37,7 @@ async def update_current_user(
     db: AsyncSession = Depends(get_db),
 ):
     """Update current resident's profile"""
+    auth_cache.invalidate(db, current_resident)
     if update.description is not None:
         current_resident.description = update.description
     if update.avatar_url is not None:
@@ -75,6 +77,7 @@ async def upload_avatar(
     # For now, just store a placeholder
     avatar_url = f"https://genesis.world/avatars/{current_resident.id}"
     current_resident.avatar_url = avatar_url
+    auth_cache.invalidate(db, current_resident)
 
     await db.commit()
     return {"success": True, "avatar_url": avatar_url}
@@ -87,6 +90,7 @@ async def delete_avatar(
 ):
     """Delete avatar"""
     current_resident.avatar_url = None
+    auth_cache.invalidate(db, current_resident)
     await db.commit()
     return {"success": True}
 
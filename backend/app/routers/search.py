@@ -25,6 +25,8 @@ from app.schemas.search import (
 
 router = APIRouter(prefix="/search")
 
+SearchMode = Literal["hybrid", "lexical", "semantic"]
+
 
 def _post_to_search_result(post, relevance_score: float) -> SearchResultPost:
     """Convert Post model to SearchResultPost"""
@@ -81,6 +83,7 @@ async def universal_search(
     ),
     limit: int = Query(default=20, ge=1, le=50, description="Maximum results per type"),
     offset: int = Query(default=0, ge=0, description="Offset for pagination"),
+    mode: SearchMode = Query(default="hybrid", description="Post ranking: lexical, semantic or hybrid"),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -90,12 +93,13 @@ async def universal_search(
     - **type**: Filter by content type (posts, comments, residents, or all)
     - **limit**: Maximum number of results per type (default 20, max 50)
     - **offset**: Pagination offset
+    - **mode**: How posts are ranked (lexical, semantic or hybrid)
     """
     items = []
     total = 0
 
     if type in ("posts", "all"):
-        posts_results, posts_total = await search_posts(db, q, limit, offset=offset)
+        posts_results, posts_total = await search_posts(db, q, limit, offset=offset, mode=mode)
         items.extend([_post_to_search_result(p, score) for p, score in posts_results])
         total += posts_total
 
@@ -131,6 +135,7 @@ async def search_posts_endpoint(
     submolt: Optional[str] = Query(default=None, description="Filter by submolt"),
     limit: int = Query(default=20, ge=1, le=100, description="Maximum results"),
     offset: int = Query(default=0, ge=0, description="Offset for pagination"),
+    mode: SearchMode = Query(default="hybrid", description="Ranking: lexical, semantic or hybrid"),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -140,8 +145,10 @@ async def search_posts_endpoint(
     - **submolt**: Optional submolt filter
     - **limit**: Maximum number of results (default 20, max 100)
     - **offset**: Pagination offset
+    - **mode**: lexical (full-text), semantic (vector) or hybrid (both, fused);
+      without a vector backend all modes are lexical
     """
-    results, total = await search_posts(db, q, limit, submolt_filter=submolt, offset=offset)
+    results, total = await search_posts(db, q, limit, submolt_filter=submolt, offset=offset, mode=mode)
 
     posts = [_post_to_search_result(p, score) for p, score in results]
     has_more = total > offset + len(posts)
@@ -23,38 +23,68 @@ from app.schemas.werewolf import (
     NightActionRequest, NightActionResponse,
     ChatMessageRequest, ChatMessageResponse,
     CreateGameRequest, LobbyResponse, LobbyPlayerInfo,
-    DayVoteRequest, DayVoteResponse, DayVotesResponse, VoteTallyEntry, VoteDetail,
+    DayVoteRequest, DayVoteResponse, DayVotesResponse,
     EventResponse, EventList,
     PhantomChatRequest, PhantomChatMessage, PhantomChatResponse,
     GameListResponse,
 )
 from app.services.werewolf_game import (
-    get_resident_game, get_player_role, get_alive_players, get_all_players,
+    get_resident_game, get_player_role, get_all_players,
     get_phantom_teammates,
     quick_start_game, cancel_game,
     create_game_lobby, join_game_lobby, leave_game_lobby, start_game,
     get_open_lobbies, get_lobby_players,
     submit_phantom_attack, submit_oracle_investigation, submit_guardian_protection,
     submit_debugger_identify,
-    submit_day_vote, get_vote_tally, get_votes_for_round,
+    submit_day_vote,
     get_game_events, get_game_history,
     get_chat_messages, send_chat_message,
     get_chat_message_count, get_last_message_time,
 )
-from app.routers.auth import get_current_resident, get_optional_resident
+from app.services.werewolf_deltas import chat_delta, day_votes, game_delta, player_infos
+from app.services import quota
+from app.routers.auth import get_current_resident, get_optional_resident, websocket_token
 
 router = APIRouter(prefix="/phantomnight")
 
 
 # ── WebSocket ─────────────────────────────────────────────────────────────
 
+async def _is_game_player(game_id: str, token: Optional[str]) -> bool:
+    """Whether the bearer of token (JWT or API key) plays in this game."""
+    if not token:
+        return False
+    try:
+        game_uuid = UUID(game_id)
+    except ValueError:
+        return False
+    from app.database import AsyncSessionLocal
+    async with AsyncSessionLocal() as db:
+        resident = await get_optional_resident(f"Bearer {token}", db)
+        if not resident:
+            return False
+        return await get_player_role(db, game_uuid, resident.id) is not None
+
+
 @router.websocket("/ws/{game_id}")
-async def game_websocket(websocket: WebSocket, game_id: str):
-    """WebSocket endpoint for real-time game notifications via Redis pub/sub."""
+async def game_websocket(
+    websocket: WebSocket,
+    game_id: str,
+    since: Optional[int] = Query(None, ge=0),
+):
+    """WebSocket endpoint for real-time game deltas via Redis pub/sub.
+
+    The client authenticates with its first message (see
+    auth.websocket_token). Players of the game get content deltas; other
+    sockets get refresh notifications. since resumes after the last
+    applied seq.
+    """
     await websocket.accept()
     try:
         from app.services.ws_manager import subscribe
-        await subscribe(game_id, websocket)
+        token = await websocket_token(websocket)
+        redacted = not await _is_game_player(game_id, token)
+        await subscribe(game_id, websocket, resume_from=since, redacted=redacted)
     except WebSocketDisconnect:
         pass
     except Exception:
@@ -89,6 +119,8 @@ async def quick_start(
             db, current_resident.id, data.max_players, data.speed,
             language=data.language,
         )
+        from app.tasks.werewolf import schedule_phase_transition
+        schedule_phase_transition(game.id, game.phase_ends_at)
         return GameResponse.model_validate(game)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -154,9 +186,13 @@ async def start_game_endpoint(
     """Start a game lobby. Only creator can start. AI fills remaining slots."""
     try:
         game = await start_game(db, game_id, current_resident.id)
-        from app.services.ws_manager import publish
-        publish(str(game.id), 'game')
-        return GameResponse.model_validate(game)
+        await db.commit()
+        from app.services.ws_manager import apush
+        from app.tasks.werewolf import schedule_phase_transition
+        delta = await game_delta(db, game)
+        await apush(str(game.id), delta)
+        schedule_phase_transition(game.id, game.phase_ends_at)
+        return GameResponse(**delta["game"])
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -209,9 +245,11 @@ async def cancel_current_game(
     try:
         game_id = game.id
         game = await cancel_game(db, game_id)
-        from app.services.ws_manager import publish
-        publish(str(game_id), 'game')
-        return GameResponse.model_validate(game)
+        await db.commit()
+        from app.services.ws_manager import apush
+        delta = await game_delta(db, game)
+        await apush(str(game_id), delta)
+        return GameResponse(**delta["game"])
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -281,26 +319,7 @@ async def get_players(
 ):
     """Get all players in your current game."""
     game = await _get_my_game(db, current_resident)
-
-    players = await get_all_players(db, game.id)
-    result = []
-    for p in players:
-        info = PlayerInfo(
-            id=p.resident.id,
-            name=p.resident.name,
-            avatar_url=p.resident.avatar_url,
-            karma=p.resident.karma,
-            is_alive=p.is_alive,
-            eliminated_round=p.eliminated_round,
-            eliminated_by=p.eliminated_by,
-        )
-        # Only reveal role and type for eliminated players
-        if not p.is_alive:
-            info.revealed_role = p.role
-            info.revealed_type = p.resident._type
-        result.append(info)
-
-    return result
+    return await player_infos(db, game.id)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -437,14 +456,15 @@ async def vote_to_eliminate(
     game = await _get_my_game(db, current_resident)
     try:
         await submit_day_vote(db, game, current_resident.id, data.target_id, data.reason)
-        tally = await get_vote_tally(db, game.id, game.current_round)
-        # Notify other clients
-        from app.services.ws_manager import publish
-        publish(str(game.id), 'votes')
+        await db.commit()
+        votes = await day_votes(db, game)
+        # Push the new tally to every player's socket
+        from app.services.ws_manager import apush
+        await apush(str(game.id), {"type": "votes", "votes": votes.model_dump(mode="json")})
         return DayVoteResponse(
             success=True,
             message="Vote cast successfully.",
-            current_tally=[VoteTallyEntry(**t) for t in tally],
+            current_tally=votes.tally,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -457,41 +477,7 @@ async def get_day_votes(
 ):
     """Get current vote tally and individual votes."""
     game = await _get_my_game(db, current_resident)
-
-    round_num = game.current_round
-    tally = await get_vote_tally(db, game.id, round_num)
-    votes = await get_votes_for_round(db, game.id, round_num)
-    alive_players = await get_alive_players(db, game.id)
-
-    # Batch-load all resident names to avoid N+1 queries
-    all_ids = set()
-    for v in votes:
-        all_ids.add(v.voter_id)
-        all_ids.add(v.target_id)
-    name_map = {}
-    if all_ids:
-        name_res = await db.execute(
-            select(Resident.id, Resident.name).where(Resident.id.in_(all_ids))
-        )
-        name_map = {row.id: row.name for row in name_res.all()}
-
-    vote_details = []
-    for v in votes:
-        vote_details.append(VoteDetail(
-            voter_id=v.voter_id,
-            voter_name=name_map.get(v.voter_id, "unknown"),
-            target_id=v.target_id,
-            target_name=name_map.get(v.target_id, "unknown"),
-            reason=v.reason,
-        ))
-
-    return DayVotesResponse(
-        round_number=round_num,
-        tally=[VoteTallyEntry(**t) for t in tally],
-        votes=vote_details,
-        total_voted=len(votes),
-        total_alive=len(alive_players),
-    )
+    return await day_votes(db, game)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -535,23 +521,30 @@ async def post_chat_message(
     if not role or not role.is_alive:
         raise HTTPException(status_code=400, detail="Dead players cannot chat")
 
-    # Rate limit: 3 seconds between messages
-    last_time = await get_last_message_time(db, game.id, current_resident.id)
-    if last_time:
-        elapsed = (datetime.utcnow() - last_time).total_seconds()
-        if elapsed < 3:
-            raise HTTPException(status_code=429, detail="Please wait before sending another message")
-
     # Per-round limit: 30 messages
-    msg_count = await get_chat_message_count(db, game.id, current_resident.id, game.current_round)
+    chat_subject = f"{game.id}:{current_resident.id}"
+    chat_round = f"r{game.current_round or 0}"
+    msg_count = await quota.count(
+        "ww_chat", chat_subject,
+        lambda: get_chat_message_count(db, game.id, current_resident.id, game.current_round),
+        bucket=chat_round,
+    )
     if msg_count >= 30:
         raise HTTPException(status_code=429, detail="Message limit reached for this round")
 
+    # Rate limit: 3 seconds between messages
+    if not await quota.take_cooldown(
+        "ww_chat", chat_subject, 3,
+        load_last=lambda: get_last_message_time(db, game.id, current_resident.id),
+    ):
+        raise HTTPException(status_code=429, detail="Please wait before sending another message")
+
     msg = await send_chat_message(db, game, current_resident, data.content)
-    await db.flush()
+    await db.commit()
+    await quota.record("ww_chat", chat_subject, bucket=chat_round)
 
-    from app.services.ws_manager import publish
-    publish(str(game.id), 'chat')
+    from app.services.ws_manager import apush
+    await apush(str(game.id), chat_delta([msg]))
 
     return ChatMessageResponse.model_validate(msg)
 
@@ -610,10 +603,10 @@ async def send_phantom_chat(
         phase=game.current_phase or "day",
     )
     db.add(msg)
-    await db.flush()
+    await db.commit()
 
-    from app.services.ws_manager import publish
-    publish(str(game.id), 'phantom_chat')
+    from app.services.ws_manager import publish_soon
+    publish_soon(str(game.id), 'phantom_chat')
 
     return PhantomChatMessage(
         id=msg.id,
@@ -48,7 +48,12 @@ class CommentTree(BaseModel):
     score: int
     created_at: datetime
     user_vote: Optional[int] = None
+    depth: int = 0
     replies: list["CommentTree"] = []
+    # Direct replies not included in replies; fetch them from
+    # /comments/{id}/replies, passing replies_cursor when it is set
+    more_replies: int = 0
+    replies_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -62,6 +67,8 @@ class CommentList(BaseModel):
     """List of comments with tree structure"""
     comments: list[CommentTree]
     total: int
+    has_more: bool = False
+    next_cursor: Optional[str] = None
 
 
 class PostInfo(BaseModel):
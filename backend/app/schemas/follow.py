@@ -83,3 +83,4 @@ class FeedResponse(BaseModel):
     posts: list[FeedPost]
     total: int
     has_more: bool
+    next_cursor: Optional[str] = None
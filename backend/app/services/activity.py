@@ -0,0 +1,77 @@
+"""
+Write-behind buffer for Resident.last_active.
+
+Authenticated requests record activity in a Redis sorted set
+(resident id → unix time) instead of updating the residents row, at most
+once per TOUCH_INTERVAL per resident per process. flush_last_active()
+(Celery beat, every FLUSH_INTERVAL seconds) drains the set into a single
+bulk UPDATE, so read endpoints no longer generate row writes.
+
+If Redis is unavailable the timestamp is written through on the resident
+as before.
+"""
+import logging
+import time
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+TOUCH_INTERVAL = 60
+FLUSH_INTERVAL = 60
+
+_BUFFER_KEY = "activity:last_active"
+_FLUSH_KEY = "activity:last_active:flushing"
+_LOCAL_MAX = 50_000
+
+_last_touch: dict = {}
+
+
+async def touch(resident) -> None:
+    """Note that resident is active now (buffered)."""
+    now = time.time()
+    if now - _last_touch.get(resident.id, 0.0) < TOUCH_INTERVAL:
+        return
+    if len(_last_touch) >= _LOCAL_MAX:
+        _last_touch.clear()
+    _last_touch[resident.id] = now
+    try:
+        await get_redis().zadd(_BUFFER_KEY, {str(resident.id): now})
+    except Exception as e:
+        logger.debug(f"Activity: buffer write failed, writing through: {e}")
+        resident.last_active = datetime.utcnow()
+
+
+async def flush_last_active(db: AsyncSession) -> int:
+    """Apply buffered timestamps in one UPDATE. Returns residents updated.
+
+    The buffer is moved aside atomically first; entries left over from a
+    flush that failed are merged back in (latest time wins) and retried.
+    """
+    redis = get_redis()
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.zunionstore(_FLUSH_KEY, [_FLUSH_KEY, _BUFFER_KEY], aggregate="MAX")
+        pipe.delete(_BUFFER_KEY)
+        pipe.zrange(_FLUSH_KEY, 0, -1, withscores=True)
+        _, _, entries = await pipe.execute()
+    if not entries:
+        return 0
+
+    ids = [UUID(member.decode()) for member, _ in entries]
+    times = [datetime.utcfromtimestamp(score) for _, score in entries]
+    result = await db.execute(
+        text("""
+            UPDATE residents AS r SET last_active = v.ts
+            FROM unnest(CAST(:ids AS uuid[]), CAST(:times AS timestamp[])) AS v(id, ts)
+            WHERE r.id = v.id AND (r.last_active IS NULL OR r.last_active < v.ts)
+        """),
+        {"ids": ids, "times": times},
+    )
+    await db.commit()
+    await redis.delete(_FLUSH_KEY)
+    return result.rowcount
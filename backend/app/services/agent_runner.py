@@ -22,8 +22,7 @@ import time
 from datetime import datetime, timedelta
 from typing import Optional
 
-import httpx
-from sqlalchemy import select, func, and_, desc
+from sqlalchemy import select, update, func, and_, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -34,6 +33,8 @@ from app.models.vote import Vote
 from app.models.follow import Follow
 from app.models.ai_personality import AIPersonality, AIMemoryEpisode, AIRelationship
 from app.config import get_settings
+from app.services import embedding_queue, feed_cache, llm_client, timeline
+from app.services import vote as vote_service
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -353,63 +354,31 @@ AGENT_TEMPLATES = [
 # TEXT GENERATION
 # ═══════════════════════════════════════════════════════════════════════════
 
-async def call_ollama(prompt: str, system_prompt: str = "") -> Optional[str]:
-    """Call Ollama API for text generation."""
-    ollama_host = settings.OLLAMA_HOST or "https://ollama.genesis-pj.net"
-    model = settings.OLLAMA_MODEL or "llama3.1:8b"
-    try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{ollama_host}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": prompt,
-                    "system": system_prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.85,
-                        "top_p": 0.92,
-                        "repeat_penalty": 1.15,
-                    }
-                }
-            )
-            if response.status_code == 200:
-                text = response.json().get("response", "").strip()
-                # Strip AI self-references that leak through
-                for phrase in ["As an AI", "I'm an AI", "as a language model",
-                               "I don't have personal", "as an artificial"]:
-                    text = text.replace(phrase, "")
-                return text.strip()
-            else:
-                logger.warning(f"Ollama returned {response.status_code}: {response.text[:200]}")
-    except Exception as e:
-        logger.error(f"Ollama error: {e}")
-    return None
+async def call_ollama(prompt: str, system_prompt: str = "",
+                      priority: int = llm_client.PRIORITY_SNS,
+                      cache_site: Optional[str] = None) -> Optional[str]:
+    """Call Ollama API for text generation (pooled client, shared concurrency cap)."""
+    return await llm_client.generate(
+        prompt, system_prompt,
+        temperature=0.85, top_p=0.92, repeat_penalty=1.15,
+        priority=priority, cache_site=cache_site,
+    )
 
 
-async def generate_text(prompt: str, system_prompt: str = "") -> Optional[str]:
+async def generate_text(prompt: str, system_prompt: str = "",
+                        priority: int = llm_client.PRIORITY_SNS) -> Optional[str]:
     """Generate text using Ollama (Claude API reserved for admin/god operations)."""
-    return await call_ollama(prompt, system_prompt)
-
-
-# --- Ollama throttle for non-critical werewolf calls ---
-_last_ollama_call: float = 0.0
-_OLLAMA_MIN_GAP: float = 2.0  # seconds between non-critical calls
+    return await call_ollama(prompt, system_prompt, priority=priority)
 
 
 async def _throttled_generate(prompt: str, system_prompt: str = "",
                               critical: bool = False) -> Optional[str]:
-    """Generate text with optional throttle to avoid Ollama load spikes.
+    """Generate text in the werewolf lane of the shared Ollama limiter.
 
-    critical=True bypasses the throttle (e.g. accusation responses).
+    critical=True jumps ahead of queued calls (e.g. accusation responses).
     """
-    global _last_ollama_call
-    if not critical:
-        elapsed = time.monotonic() - _last_ollama_call
-        if elapsed < _OLLAMA_MIN_GAP:
-            await asyncio.sleep(_OLLAMA_MIN_GAP - elapsed)
-    _last_ollama_call = time.monotonic()
-    return await generate_text(prompt, system_prompt)
+    priority = llm_client.PRIORITY_CRITICAL if critical else llm_client.PRIORITY_GAME
+    return await generate_text(prompt, system_prompt, priority=priority)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -626,7 +595,11 @@ async def apply_personality_modifiers(db: AsyncSession, agent_id, profile: dict)
     result = await db.execute(
         select(AIPersonality).where(AIPersonality.resident_id == agent_id)
     )
-    ai_pers = result.scalar_one_or_none()
+    return apply_personality_axes(result.scalar_one_or_none(), agent_id, profile)
+
+
+def apply_personality_axes(ai_pers: Optional[AIPersonality], agent_id, profile: dict) -> dict:
+    """Apply an already-loaded AIPersonality to a profile (see apply_personality_modifiers)."""
     if not ai_pers:
         return profile
 
@@ -715,39 +688,66 @@ def get_time_context() -> str:
         return "late evening. winding down, getting sleepy"
 
 
+_CONTEXT_MEMORY_LIMIT = 10
+_CONTEXT_RELATIONSHIP_LIMIT = 5
+_BACKSTORY_FIELDS = ("backstory", "occupation", "location_hint", "age_range",
+                     "life_context", "speaking_patterns", "recurring_topics", "pet_peeves")
+
+
+def _build_agent_context(personality_model: Optional[AIPersonality],
+                         memories: list[AIMemoryEpisode],
+                         relationships: list[tuple[AIRelationship, str]]) -> dict:
+    """Assemble the agent context dict from already-loaded rows."""
+    context = {"backstory_fields": {}, "recent_memories": [], "relationships": []}
+
+    if personality_model:
+        for field in _BACKSTORY_FIELDS:
+            val = getattr(personality_model, field, None)
+            if val:
+                context["backstory_fields"][field] = val
+
+    for ep in memories:
+        context["recent_memories"].append({
+            "summary": ep.summary,
+            "type": ep.episode_type,
+            "sentiment": ep.sentiment,
+        })
+
+    for rel, name in relationships:
+        label = "neutral"
+        if rel.trust > 0.3:
+            label = "friendly"
+        elif rel.trust < -0.3:
+            label = "wary"
+        context["relationships"].append({
+            "name": name,
+            "trust": round(rel.trust, 2),
+            "familiarity": round(rel.familiarity, 2),
+            "label": label,
+        })
+
+    return context
+
+
 async def get_agent_context(db: AsyncSession, agent_id) -> dict:
     """Fetch backstory, recent memories, and relationships for an agent.
 
     Returns a dict with keys: backstory_fields, recent_memories, relationships.
     All optional — returns empty values if nothing exists.
     """
-    context = {"backstory_fields": {}, "recent_memories": [], "relationships": []}
-
     # 1. Backstory from AIPersonality
     result = await db.execute(
         select(AIPersonality).where(AIPersonality.resident_id == agent_id)
     )
     personality_model = result.scalar_one_or_none()
-    if personality_model:
-        for field in ("backstory", "occupation", "location_hint", "age_range",
-                      "life_context", "speaking_patterns", "recurring_topics", "pet_peeves"):
-            val = getattr(personality_model, field, None)
-            if val:
-                context["backstory_fields"][field] = val
 
     # 2. Recent memories (top 10 by importance * decay, recent first)
     mem_result = await db.execute(
         select(AIMemoryEpisode)
         .where(AIMemoryEpisode.resident_id == agent_id)
         .order_by(desc(AIMemoryEpisode.importance * AIMemoryEpisode.decay_factor))
-        .limit(10)
+        .limit(_CONTEXT_MEMORY_LIMIT)
     )
-    for ep in mem_result.scalars():
-        context["recent_memories"].append({
-            "summary": ep.summary,
-            "type": ep.episode_type,
-            "sentiment": ep.sentiment,
-        })
 
     # 3. Top relationships (by familiarity)
     rel_result = await db.execute(
@@ -755,22 +755,83 @@ async def get_agent_context(db: AsyncSession, agent_id) -> dict:
         .join(Resident, Resident.id == AIRelationship.target_id)
         .where(AIRelationship.agent_id == agent_id)
         .order_by(desc(AIRelationship.familiarity))
-        .limit(5)
+        .limit(_CONTEXT_RELATIONSHIP_LIMIT)
+    )
+
+    return _build_agent_context(
+        personality_model, list(mem_result.scalars()), list(rel_result.all())
+    )
+
+
+async def load_agent_contexts(db: AsyncSession, agent_ids: list,
+                              memory_limit: int = _CONTEXT_MEMORY_LIMIT,
+                              relationship_limit: int = _CONTEXT_RELATIONSHIP_LIMIT) -> dict:
+    """Bulk version of apply_personality_modifiers + get_agent_context for a whole cycle.
+
+    Three set-based queries regardless of agent count: AIPersonality by IN list,
+    then the top-N memories and top-K relationships per agent via ROW_NUMBER()
+    windows. Returns {agent_id: {"personality": AIPersonality | None,
+    "context": <get_agent_context dict>}}.
+    """
+    if not agent_ids:
+        return {}
+
+    # 1. Personalities
+    pers_result = await db.execute(
+        select(AIPersonality).where(AIPersonality.resident_id.in_(agent_ids))
+    )
+    personalities = {p.resident_id: p for p in pers_result.scalars()}
+
+    # 2. Top-N memories per agent by importance * decay
+    mem_rank = func.row_number().over(
+        partition_by=AIMemoryEpisode.resident_id,
+        order_by=desc(AIMemoryEpisode.importance * AIMemoryEpisode.decay_factor),
+    ).label("rn")
+    mem_sub = (
+        select(AIMemoryEpisode.id, mem_rank)
+        .where(AIMemoryEpisode.resident_id.in_(agent_ids))
+        .subquery()
+    )
+    mem_result = await db.execute(
+        select(AIMemoryEpisode)
+        .join(mem_sub, mem_sub.c.id == AIMemoryEpisode.id)
+        .where(mem_sub.c.rn <= memory_limit)
+        .order_by(AIMemoryEpisode.resident_id, mem_sub.c.rn)
+    )
+    memories: dict = {}
+    for ep in mem_result.scalars():
+        memories.setdefault(ep.resident_id, []).append(ep)
+
+    # 3. Top-K relationships per agent by familiarity, with target names
+    rel_rank = func.row_number().over(
+        partition_by=AIRelationship.agent_id,
+        order_by=desc(AIRelationship.familiarity),
+    ).label("rn")
+    rel_sub = (
+        select(AIRelationship.id, rel_rank)
+        .where(AIRelationship.agent_id.in_(agent_ids))
+        .subquery()
     )
+    rel_result = await db.execute(
+        select(AIRelationship, Resident.name)
+        .join(rel_sub, rel_sub.c.id == AIRelationship.id)
+        .join(Resident, Resident.id == AIRelationship.target_id)
+        .where(rel_sub.c.rn <= relationship_limit)
+        .order_by(AIRelationship.agent_id, rel_sub.c.rn)
+    )
+    relationships: dict = {}
     for rel, name in rel_result.all():
-        label = "neutral"
-        if rel.trust > 0.3:
-            label = "friendly"
-        elif rel.trust < -0.3:
-            label = "wary"
-        context["relationships"].append({
-            "name": name,
-            "trust": round(rel.trust, 2),
-            "familiarity": round(rel.familiarity, 2),
-            "label": label,
-        })
+        relationships.setdefault(rel.agent_id, []).append((rel, name))
 
-    return context
+    return {
+        aid: {
+            "personality": personalities.get(aid),
+            "context": _build_agent_context(
+                personalities.get(aid), memories.get(aid, []), relationships.get(aid, [])
+            ),
+        }
+        for aid in agent_ids
+    }
 
 
 def _build_backstory_block(agent_context: dict) -> str:
@@ -1394,17 +1455,9 @@ async def agent_vote(agent: Resident, profile: dict, db: AsyncSession) -> int:
             continue
         # Upvote ratio: this agent's tendency
         vote_value = 1 if random.random() < vote_style['upvote_ratio'] else -1
-        vote = Vote(
-            resident_id=agent.id,
-            target_type='post',
-            target_id=post.id,
-            value=vote_value,
-        )
-        db.add(vote)
-        if vote_value == 1:
-            post.upvotes += 1
-        else:
-            post.downvotes += 1
+        # Vote upsert + atomic counter delta — concurrent agents may vote on the same post
+        await vote_service.set_vote(db, agent.id, 'post', post.id, vote_value)
+        feed_cache.mark_dirty(db, post)
         votes_cast += 1
 
     return votes_cast
@@ -1490,8 +1543,11 @@ async def agent_reply_to_mention(agent: Resident, db: AsyncSession, profile: dic
                         parent_id=source_comment.id,
                         content=response[:max_len],
                     )
+                    reply.place_in_thread(source_comment)
                     db.add(reply)
-                    post.comment_count += 1
+                    post.comment_count = Post.comment_count + 1
+                    feed_cache.mark_dirty(db, post)
+                    embedding_queue.note(db, "comment", reply)
                     actions += 1
 
                     # Memory: remember replying to mention
@@ -1528,8 +1584,15 @@ async def agent_follow(agent: Resident, db: AsyncSession, all_residents: list[Re
         target = random.choice(pool)
         follow = Follow(follower_id=agent.id, following_id=target.id)
         db.add(follow)
-        agent.following_count += 1
-        target.follower_count += 1
+        timeline.note_follow(db, agent.id, target.id, followed=True)
+        agent.following_count = Resident.following_count + 1
+        # target comes from the cycle's shared snapshot, not this session
+        await db.execute(
+            update(Resident)
+            .where(Resident.id == target.id)
+            .values(follower_count=Resident.follower_count + 1)
+            .execution_options(synchronize_session=False)
+        )
         actions += 1
 
     if current_following and random.random() < 0.05:
@@ -1542,11 +1605,14 @@ async def agent_follow(agent: Resident, db: AsyncSession, all_residents: list[Re
         rec = res.scalar_one_or_none()
         if rec:
             await db.delete(rec)
-            agent.following_count = max(0, agent.following_count - 1)
-            tr = await db.execute(select(Resident).where(Resident.id == unfollow_id))
-            t = tr.scalar_one_or_none()
-            if t:
-                t.follower_count = max(0, t.follower_count - 1)
+            timeline.note_follow(db, agent.id, unfollow_id, followed=False)
+            agent.following_count = func.greatest(Resident.following_count - 1, 0)
+            await db.execute(
+                update(Resident)
+                .where(Resident.id == unfollow_id)
+                .values(follower_count=func.greatest(Resident.follower_count - 1, 0))
+                .execution_options(synchronize_session=False)
+            )
             actions += 1
 
     return actions
@@ -1676,201 +1742,291 @@ async def _update_rel(db: AsyncSession, agent_id, target_id,
 # MAIN CYCLE — session-based multi-action
 # ═══════════════════════════════════════════════════════════════════════════
 
-async def run_agent_cycle():
+async def run_agent_session(agent: Resident, db: AsyncSession,
+                            all_residents: list[Resident], context: list[dict],
+                            preloaded: dict | None = None) -> int:
+    """Run one agent's turn of the cycle: mention replies, then a session burst.
+
+    Werewolf actions are not taken here: they run only from
+    run_werewolf_game_agents, under that game's lock.
+
+    Writes go to the caller's session; the caller decides when to commit.
+    all_residents and context are a read-only snapshot shared across agents.
+    preloaded is this agent's entry from load_agent_contexts(); without it
+    personality and context are queried per agent.
+    """
+    actions_taken = 0
+
+    profile = get_agent_profile(agent)
+    if preloaded is not None:
+        profile = apply_personality_axes(preloaded["personality"], agent.id, profile)
+        agent_ctx = preloaded["context"]
+    else:
+        profile = await apply_personality_modifiers(db, agent.id, profile)
+        # Fetch backstory, memories, relationships once per agent per cycle
+        agent_ctx = await get_agent_context(db, agent.id)
+
+    # Lazy backstory generation: if agent has no backstory, generate one
+    if not agent_ctx.get("backstory_fields"):
+        try:
+            from app.services.ai_agent import ensure_backstory
+            await ensure_backstory(db, agent.id, agent.name)
+            # Re-fetch context after generation
+            agent_ctx = await get_agent_context(db, agent.id)
+        except Exception as e:
+            logger.debug(f"Backstory generation skipped for {agent.name}: {e}")
+
+    # --- Mention replies: independent of session schedule ---
+    # Check proportional to reply_rate (not a fixed constant)
+    if random.random() < profile['traits']['reply_rate'] * 0.4:
+        mention_actions = await agent_reply_to_mention(agent, db, profile, agent_context=agent_ctx)
+        actions_taken += mention_actions
+
+    # --- Session gate ---
+    if not should_agent_act(agent, profile):
+        return actions_taken
+
+    # --- Session burst: 1-N actions in one sitting ---
+    session_len = profile['traits']['session_actions']
+    # Sort posts by this agent's engagement preference
+    sorted_context = sort_context_for_agent(context, profile)
+
+    for action_idx in range(session_len):
+        weights = profile['behavior']['weights']
+        action = random.choices(
+            list(weights.keys()),
+            weights=list(weights.values()),
+        )[0]
+
+        if action == 'vote':
+            actions_taken += await agent_vote(agent, profile, db)
+
+        elif action == 'follow':
+            actions_taken += await agent_follow(agent, db, all_residents)
+
+        elif action == 'moderate':
+            actions_taken += await agent_moderate(agent, db)
+
+        elif action == 'comment' and sorted_context:
+            preferred = [
+                p for p in sorted_context
+                if p['submolt'] in profile['personality'].get('interests', [])
+            ]
+            pool = preferred if preferred else sorted_context
+            post_info = pool[action_idx % len(pool)] if pool else None
+            if not post_info:
+                continue
+
+            if post_info['author_id'] == agent.id and random.random() < 0.85:
+                continue
+
+            post_result = await db.execute(
+                select(Post).where(Post.id == post_info['id'])
+            )
+            post = post_result.scalar_one_or_none()
+            if not post:
+                continue
+
+            # Skip check (per-agent rate)
+            existing = await db.execute(
+                select(func.count()).select_from(Comment).where(
+                    and_(Comment.post_id == post.id, Comment.author_id == agent.id)
+                )
+            )
+            if existing.scalar() > 0 and random.random() < profile['traits']['comment_skip_rate']:
+                continue
+
+            # Get thread context so agent can READ other comments
+            thread_comments = await get_thread_context(db, post.id, agent.id)
+            participants = [c['author_name'] for c in thread_comments]
+
+            # Decide: top-level comment or reply to existing comment?
+            # thread_diver and social_butterfly reply more often
+            reply_to_comment = None
+            if thread_comments and random.random() < (
+                0.6 if profile['engagement_key'] == 'thread_diver'
+                else 0.4 if profile['behavior_key'] == 'social_butterfly'
+                else 0.25
+            ):
+                # Pick a comment to reply to (prefer higher-score or recent)
+                reply_candidates = [
+                    c for c in thread_comments
+                    if c['author_name'] != agent.name
+                ]
+                if reply_candidates:
+                    reply_to_comment = random.choice(reply_candidates[:4])
+
+            text = await generate_comment(
+                agent, post, profile,
+                thread_comments=thread_comments,
+                participants=participants,
+                post_author_name=post_info.get('author_name', ''),
+                reply_target=reply_to_comment,
+                agent_context=agent_ctx,
+                personality_model=profile.get('personality_model'),
+            )
+            if text and len(text) > 3:
+                parent_id = reply_to_comment['id'] if reply_to_comment else None
+                comment = Comment(
+                    post_id=post.id,
+                    author_id=agent.id,
+                    parent_id=parent_id,
+                    content=text,
+                )
+                parent = await db.get(Comment, parent_id) if parent_id else None
+                comment.place_in_thread(parent)
+                db.add(comment)
+                post.comment_count = Post.comment_count + 1
+                feed_cache.mark_dirty(db, post)
+                embedding_queue.note(db, "comment", comment)
+                actions_taken += 1
+
+                # Memory: remember commenting
+                _add_memory(
+                    db, agent.id,
+                    f"Commented on '{post.title[:60]}' by {post_info.get('author_name', 'someone')}",
+                    'social_interaction', importance=0.4, sentiment=0.1,
+                    related_resident_ids=[post_info['author_id']],
+                    related_post_id=post.id,
+                )
+                # Relationship: interacted with post author
+                if post_info.get('author_id') and post_info['author_id'] != agent.id:
+                    await _update_rel(db, agent.id, post_info['author_id'],
+                                      trust_change=0.02, familiarity_change=0.05)
+                # Relationship: interacted with reply target
+                if reply_to_comment:
+                    reply_author_id = reply_to_comment.get('author_id')
+                    if reply_author_id and reply_author_id != agent.id:
+                        await _update_rel(db, agent.id, reply_author_id,
+                                          trust_change=0.03, familiarity_change=0.08)
+
+        elif action == 'post':
+            interests = profile['personality'].get('interests', ['general', 'thoughts'])
+            submolt = random.choice(interests)
+            post_data = await generate_post(agent, submolt, profile, agent_context=agent_ctx,
+                                            personality_model=profile.get('personality_model'))
+            if post_data:
+                title, content = post_data
+                new_post = Post(
+                    author_id=agent.id, submolt=submolt,
+                    title=title, content=content,
+                )
+                db.add(new_post)
+                feed_cache.mark_dirty(db, new_post)
+                timeline.note_post(db, new_post)
+                embedding_queue.note(db, "post", new_post)
+                actions_taken += 1
+
+                # Memory: remember posting
+                _add_memory(
+                    db, agent.id,
+                    f"Posted '{title[:60]}' in {submolt}",
+                    'action', importance=0.5, sentiment=0.2,
+                )
+
+    return actions_taken
+
+
+async def run_agent_cycle() -> dict:
     """Main agent activity cycle — called every 5 minutes by Celery.
 
     When an agent is active, they perform a SESSION of 1-5 actions
     (like a real person opening the app and scrolling for a few minutes).
+
+    Agents run concurrently as independent tasks, each on its own session and
+    committing its own writes, capped at OLLAMA_CONCURRENCY in flight. The
+    residents list and recent posts are loaded once as a shared read snapshot.
+    Agents still running when AGENT_CYCLE_BUDGET_SECONDS elapses are cancelled
+    (their uncommitted writes are rolled back) so the cycle finishes inside
+    the beat interval.
     """
-    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession as _AsyncSession
+    from app.database import AsyncSessionLocal
 
-    _engine = create_async_engine(settings.database_url, pool_pre_ping=True)
-    async with _AsyncSession(_engine) as db:
-        result = await db.execute(
+    cycle_start = time.monotonic()
+    concurrency = max(1, settings.OLLAMA_CONCURRENCY)
+    budget = float(settings.AGENT_CYCLE_BUDGET_SECONDS)
+
+    async with AsyncSessionLocal() as snapshot_db:
+        result = await snapshot_db.execute(
             select(Resident).where(Resident._type == 'agent')
         )
         agents = result.scalars().all()
         if not agents:
-            return
+            return {"agents": 0, "actions": 0}
 
-        all_result = await db.execute(select(Resident))
+        all_result = await snapshot_db.execute(select(Resident))
         all_residents = list(all_result.scalars().all())
 
-        context = await get_recent_context(db)
-        actions_taken = 0
+        context = await get_recent_context(snapshot_db)
 
-        for agent in agents:
-            profile = get_agent_profile(agent)
-            profile = await apply_personality_modifiers(db, agent.id, profile)
+        # Personality, memories and relationships for every agent in 3 queries
+        agent_contexts = await load_agent_contexts(snapshot_db, [a.id for a in agents])
 
-            # Fetch backstory, memories, relationships once per agent per cycle
-            agent_ctx = await get_agent_context(db, agent.id)
+    semaphore = asyncio.Semaphore(concurrency)
+    timings: dict[str, dict] = {}
 
-            # Lazy backstory generation: if agent has no backstory, generate one
-            if not agent_ctx.get("backstory_fields"):
-                try:
-                    from app.services.ai_agent import ensure_backstory
-                    await ensure_backstory(db, agent.id, agent.name)
-                    # Re-fetch context after generation
-                    agent_ctx = await get_agent_context(db, agent.id)
-                except Exception as e:
-                    logger.debug(f"Backstory generation skipped for {agent.name}: {e}")
-
-            # --- Werewolf actions: each function handles its own timing gate ---
+    async def _run_one(agent: Resident) -> int:
+        async with semaphore:
+            started = time.monotonic()
+            timing = {"name": agent.name, "status": "running", "actions": 0}
+            timings[str(agent.id)] = timing
             try:
-                actions_taken += await agent_werewolf_night_action(agent, db, profile)
-                actions_taken += await agent_werewolf_day_vote(agent, db, profile)
-                actions_taken += await agent_werewolf_discuss(agent, db, profile)
-                actions_taken += await agent_werewolf_phantom_chat(agent, db, profile)
+                async with AsyncSessionLocal() as db:
+                    local_agent = await db.merge(agent, load=False)
+                    n = await run_agent_session(
+                        local_agent, db, all_residents, context,
+                        preloaded=agent_contexts.get(agent.id),
+                    )
+                    if n > 0:
+                        await db.commit()
+                timing["actions"] = n
+                timing["status"] = "ok"
+                return n
+            except asyncio.CancelledError:
+                timing["status"] = "timeout"
+                raise
             except Exception as e:
-                logger.debug(f"Agent {agent.name} werewolf action error: {e}")
-
-            # --- Mention replies: independent of session schedule ---
-            # Check proportional to reply_rate (not a fixed constant)
-            if random.random() < profile['traits']['reply_rate'] * 0.4:
-                mention_actions = await agent_reply_to_mention(agent, db, profile, agent_context=agent_ctx)
-                actions_taken += mention_actions
-
-            # --- Session gate ---
-            if not should_agent_act(agent, profile):
-                continue
+                timing["status"] = "error"
+                logger.warning(f"Agent {agent.name} cycle error: {e}")
+                return 0
+            finally:
+                timing["seconds"] = round(time.monotonic() - started, 2)
+
+    tasks = [asyncio.create_task(_run_one(agent)) for agent in agents]
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for t in pending:
+        t.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    actions_taken = sum(
+        t.result() for t in done if not t.cancelled() and t.exception() is None
+    )
 
-            # --- Session burst: 1-N actions in one sitting ---
-            session_len = profile['traits']['session_actions']
-            # Sort posts by this agent's engagement preference
-            sorted_context = sort_context_for_agent(context, profile)
-
-            for action_idx in range(session_len):
-                weights = profile['behavior']['weights']
-                action = random.choices(
-                    list(weights.keys()),
-                    weights=list(weights.values()),
-                )[0]
-
-                if action == 'vote':
-                    actions_taken += await agent_vote(agent, profile, db)
-
-                elif action == 'follow':
-                    actions_taken += await agent_follow(agent, db, all_residents)
-
-                elif action == 'moderate':
-                    actions_taken += await agent_moderate(agent, db)
-
-                elif action == 'comment' and sorted_context:
-                    preferred = [
-                        p for p in sorted_context
-                        if p['submolt'] in profile['personality'].get('interests', [])
-                    ]
-                    pool = preferred if preferred else sorted_context
-                    post_info = pool[action_idx % len(pool)] if pool else None
-                    if not post_info:
-                        continue
-
-                    if post_info['author_id'] == agent.id and random.random() < 0.85:
-                        continue
-
-                    post_result = await db.execute(
-                        select(Post).where(Post.id == post_info['id'])
-                    )
-                    post = post_result.scalar_one_or_none()
-                    if not post:
-                        continue
-
-                    # Skip check (per-agent rate)
-                    existing = await db.execute(
-                        select(func.count()).select_from(Comment).where(
-                            and_(Comment.post_id == post.id, Comment.author_id == agent.id)
-                        )
-                    )
-                    if existing.scalar() > 0 and random.random() < profile['traits']['comment_skip_rate']:
-                        continue
-
-                    # Get thread context so agent can READ other comments
-                    thread_comments = await get_thread_context(db, post.id, agent.id)
-                    participants = [c['author_name'] for c in thread_comments]
-
-                    # Decide: top-level comment or reply to existing comment?
-                    # thread_diver and social_butterfly reply more often
-                    reply_to_comment = None
-                    if thread_comments and random.random() < (
-                        0.6 if profile['engagement_key'] == 'thread_diver'
-                        else 0.4 if profile['behavior_key'] == 'social_butterfly'
-                        else 0.25
-                    ):
-                        # Pick a comment to reply to (prefer higher-score or recent)
-                        reply_candidates = [
-                            c for c in thread_comments
-                            if c['author_name'] != agent.name
-                        ]
-                        if reply_candidates:
-                            reply_to_comment = random.choice(reply_candidates[:4])
-
-                    text = await generate_comment(
-                        agent, post, profile,
-                        thread_comments=thread_comments,
-                        participants=participants,
-                        post_author_name=post_info.get('author_name', ''),
-                        reply_target=reply_to_comment,
-                        agent_context=agent_ctx,
-                        personality_model=profile.get('personality_model'),
-                    )
-                    if text and len(text) > 3:
-                        parent_id = reply_to_comment['id'] if reply_to_comment else None
-                        comment = Comment(
-                            post_id=post.id,
-                            author_id=agent.id,
-                            parent_id=parent_id,
-                            content=text,
-                        )
-                        db.add(comment)
-                        post.comment_count += 1
-                        actions_taken += 1
-
-                        # Memory: remember commenting
-                        _add_memory(
-                            db, agent.id,
-                            f"Commented on '{post.title[:60]}' by {post_info.get('author_name', 'someone')}",
-                            'social_interaction', importance=0.4, sentiment=0.1,
-                            related_resident_ids=[post_info['author_id']],
-                            related_post_id=post.id,
-                        )
-                        # Relationship: interacted with post author
-                        if post_info.get('author_id') and post_info['author_id'] != agent.id:
-                            await _update_rel(db, agent.id, post_info['author_id'],
-                                              trust_change=0.02, familiarity_change=0.05)
-                        # Relationship: interacted with reply target
-                        if reply_to_comment:
-                            reply_author_id = reply_to_comment.get('author_id')
-                            if reply_author_id and reply_author_id != agent.id:
-                                await _update_rel(db, agent.id, reply_author_id,
-                                                  trust_change=0.03, familiarity_change=0.08)
-
-                elif action == 'post':
-                    interests = profile['personality'].get('interests', ['general', 'thoughts'])
-                    submolt = random.choice(interests)
-                    post_data = await generate_post(agent, submolt, profile, agent_context=agent_ctx,
-                                                    personality_model=profile.get('personality_model'))
-                    if post_data:
-                        title, content = post_data
-                        new_post = Post(
-                            author_id=agent.id, submolt=submolt,
-                            title=title, content=content,
-                        )
-                        db.add(new_post)
-                        actions_taken += 1
-
-                        # Memory: remember posting
-                        _add_memory(
-                            db, agent.id,
-                            f"Posted '{title[:60]}' in {submolt}",
-                            'action', importance=0.5, sentiment=0.2,
-                        )
+    elapsed = time.monotonic() - cycle_start
+    skipped = len(agents) - len(timings)
+    timed_out = sum(1 for t in timings.values() if t["status"] == "timeout")
+    errors = sum(1 for t in timings.values() if t["status"] == "error")
+    slowest = sorted(timings.values(), key=lambda t: t.get("seconds", 0), reverse=True)[:5]
 
-        if actions_taken > 0:
-            await db.commit()
-            logger.info(f"Agent cycle: {actions_taken} actions by {len(agents)} agents")
+    logger.info(
+        f"Agent cycle: {actions_taken} actions by {len(agents)} agents in {elapsed:.1f}s "
+        f"(concurrency={concurrency}, timed_out={timed_out}, not_started={skipped}, errors={errors})"
+    )
+    if slowest:
+        logger.info("Agent cycle slowest: " + ", ".join(
+            f"{t['name']}={t.get('seconds', 0):.1f}s/{t['actions']}" for t in slowest
+        ))
 
-    await _engine.dispose()
+    return {
+        "agents": len(agents),
+        "actions": actions_taken,
+        "elapsed_seconds": round(elapsed, 2),
+        "timed_out": timed_out,
+        "not_started": skipped,
+        "errors": errors,
+        "timings": timings,
+    }
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -2081,21 +2237,19 @@ def _get_phase_minutes(game) -> float:
         return float(game.day_duration_minutes or 5)
 
 
-async def agent_werewolf_night_action(agent: Resident, db: AsyncSession, profile: dict) -> int:
+async def agent_werewolf_night_action(agent: Resident, db: AsyncSession, profile: dict,
+                                      *, game, role, alive: list) -> int:
     """Execute night action via LLM thinking engine with timing gates."""
     from app.services.werewolf_game import (
-        get_resident_game, get_player_role, get_alive_players,
         submit_phantom_attack, submit_oracle_investigation, submit_guardian_protection,
         submit_debugger_identify,
     )
     from app.services.werewolf_strategy import build_game_context, compute_emotional_state
     from app.services.werewolf_llm_brain import think_and_act, find_player_by_name
 
-    game = await get_resident_game(db, agent.id)
-    if not game or game.current_phase != "night":
+    if game.current_phase != "night":
         return 0
 
-    role = await get_player_role(db, game.id, agent.id)
     if not role or not role.is_alive or role.night_action_taken:
         return 0
 
@@ -2113,13 +2267,12 @@ async def agent_werewolf_night_action(agent: Resident, db: AsyncSession, profile
                                     engagement=engagement):
         return 0
 
-    alive = await get_alive_players(db, game.id)
     alive_others = [p for p in alive if p.resident_id != agent.id]
     if not alive_others:
         return 0
 
     try:
-        ctx = await build_game_context(db, agent, game, role, profile)
+        ctx = await build_game_context(db, agent, game, role, profile, alive=alive)
         emotion = compute_emotional_state(ctx, traits)
 
         # Build system prompt
@@ -2189,20 +2342,18 @@ async def agent_werewolf_night_action(agent: Resident, db: AsyncSession, profile
     return 0
 
 
-async def agent_werewolf_day_vote(agent: Resident, db: AsyncSession, profile: dict) -> int:
+async def agent_werewolf_day_vote(agent: Resident, db: AsyncSession, profile: dict,
+                                  *, game, role, alive: list) -> int:
     """Cast or reconsider a day vote with timing gates and LLM-driven target selection."""
     from app.services.werewolf_game import (
-        get_resident_game, get_player_role, get_alive_players,
         submit_day_vote, get_vote_tally,
     )
     from app.services.werewolf_strategy import build_game_context, compute_emotional_state
     from app.services.werewolf_llm_brain import think_and_act, find_player_by_name
 
-    game = await get_resident_game(db, agent.id)
-    if not game or game.current_phase != "day":
+    if game.current_phase != "day":
         return 0
 
-    role = await get_player_role(db, game.id, agent.id)
     if not role or not role.is_alive:
         return 0
 
@@ -2211,7 +2362,6 @@ async def agent_werewolf_day_vote(agent: Resident, db: AsyncSession, profile: di
     phase_mins = _get_phase_minutes(game)
     engagement = _estimate_engagement(agent.id, game.current_round, traits)
 
-    alive = await get_alive_players(db, game.id)
     alive_others = [p for p in alive if p.resident_id != agent.id]
     if not alive_others:
         return 0
@@ -2260,7 +2410,7 @@ async def agent_werewolf_day_vote(agent: Resident, db: AsyncSession, profile: di
                 return 0
 
             # Use LLM to decide whether to reconsider
-            ctx = await build_game_context(db, agent, game, role, profile)
+            ctx = await build_game_context(db, agent, game, role, profile, alive=alive)
             emotion = compute_emotional_state(ctx, traits)
             personality = profile.get('personality', {})
             game_lang = game.language or "en"
@@ -2307,7 +2457,7 @@ async def agent_werewolf_day_vote(agent: Resident, db: AsyncSession, profile: di
     if engagement < 0.3 and random.random() > engagement * 2:
         return 0
 
-    ctx = await build_game_context(db, agent, game, role, profile)
+    ctx = await build_game_context(db, agent, game, role, profile, alive=alive)
     emotion = compute_emotional_state(ctx, traits)
 
     # Build system prompt
@@ -2354,21 +2504,19 @@ async def agent_werewolf_day_vote(agent: Resident, db: AsyncSession, profile: di
         return 0
 
 
-async def agent_werewolf_discuss(agent: Resident, db: AsyncSession, profile: dict) -> int:
+async def agent_werewolf_discuss(agent: Resident, db: AsyncSession, profile: dict,
+                                 *, game, role, alive: list) -> int:
     """Post role-aware chat messages via LLM thinking engine with timing gates."""
     from app.services.werewolf_game import (
-        get_resident_game, get_player_role, get_alive_players,
         get_chat_messages, get_chat_message_count,
     )
     from app.models.werewolf_game import GameMessage
     from app.services.werewolf_strategy import build_game_context, compute_emotional_state
     from app.services.werewolf_llm_brain import think_and_act
 
-    game = await get_resident_game(db, agent.id)
-    if not game or game.status == "finished":
+    if game.status == "finished":
         return 0
 
-    role = await get_player_role(db, game.id, agent.id)
     if not role or not role.is_alive:
         return 0
 
@@ -2413,7 +2561,7 @@ async def agent_werewolf_discuss(agent: Resident, db: AsyncSession, profile: dic
                                         engagement=engagement):
             return 0
 
-    ctx = await build_game_context(db, agent, game, role, profile)
+    ctx = await build_game_context(db, agent, game, role, profile, alive=alive)
     emotion = compute_emotional_state(ctx, traits)
 
     # Excitement-based slot boost
@@ -2427,7 +2575,6 @@ async def agent_werewolf_discuss(agent: Resident, db: AsyncSession, profile: dic
     game_lang = game.language or "en"
     teammates = None
     if role.team == "phantoms":
-        alive = await get_alive_players(db, game.id)
         teammates = [p.resident.name for p in alive
                      if p.team == "phantoms" and p.resident_id != agent.id and p.resident]
     werewolf_ext = get_werewolf_system_prompt_extension(role.role, teammates, lang=game_lang)
@@ -2460,10 +2607,6 @@ async def agent_werewolf_discuss(agent: Resident, db: AsyncSession, profile: dic
     )
     db.add(chat_msg)
 
-    # Notify via WebSocket
-    from app.services.ws_manager import publish
-    publish(str(game.id), 'chat')
-
     if msg_count == 0:
         _add_memory(db, agent.id,
             f"Discussed in Phantom Night #{game.game_number}",
@@ -2484,20 +2627,16 @@ _PHANTOM_CHAT_SLOTS = {
 }
 
 
-async def agent_werewolf_phantom_chat(agent: Resident, db: AsyncSession, profile: dict) -> int:
+async def agent_werewolf_phantom_chat(agent: Resident, db: AsyncSession, profile: dict,
+                                      *, game, role, alive: list) -> int:
     """AI phantoms/fanatics coordinate in secret team chat via LLM thinking engine."""
-    from app.services.werewolf_game import (
-        get_resident_game, get_player_role, get_alive_players,
-    )
     from app.models.werewolf_game import GameMessage
     from app.services.werewolf_strategy import build_game_context, compute_emotional_state
     from app.services.werewolf_llm_brain import think_and_act
 
-    game = await get_resident_game(db, agent.id)
-    if not game or game.status not in ("day", "night"):
+    if game.status not in ("day", "night"):
         return 0
 
-    role = await get_player_role(db, game.id, agent.id)
     if not role or not role.is_alive or role.team != "phantoms":
         return 0
 
@@ -2531,10 +2670,9 @@ async def agent_werewolf_phantom_chat(agent: Resident, db: AsyncSession, profile
                                     engagement=engagement):
         return 0
 
-    ctx = await build_game_context(db, agent, game, role, profile)
+    ctx = await build_game_context(db, agent, game, role, profile, alive=alive)
     emotion = compute_emotional_state(ctx, traits)
 
-    alive = await get_alive_players(db, game.id)
     teammates = [p.resident.name for p in alive
                  if p.team == "phantoms" and p.resident_id != agent.id and p.resident]
     personality = profile.get('personality', {})
@@ -2566,72 +2704,195 @@ async def agent_werewolf_phantom_chat(agent: Resident, db: AsyncSession, profile
     )
     db.add(msg)
 
-    from app.services.ws_manager import publish
-    publish(str(game.id), 'phantom_chat')
-
     return 1
 
 
-async def run_werewolf_agent_cycle():
-    """Dedicated werewolf agent cycle — called every 60s by Celery.
+async def run_werewolf_game_agents(game_id) -> int:
+    """Run one game's AI players (discuss, vote, night action, phantom chat).
 
-    Only runs werewolf-related functions (discuss, vote, night action, phantom chat).
-    More frequent than the general 5-minute agent cycle so AI agents reliably
-    hit their timing windows in fast games (casual = 18-min phases).
+    One Celery task per active game, so a slow game never delays the others.
+    The game and its roles are loaded once and shared by every AI player.
+    A per-game advisory lock makes an overlapping run for the same game
+    (previous tick still busy) skip instead of double-acting.
     """
-    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession as _AsyncSession
+    from app.database import AsyncSessionLocal
+    from app.models.werewolf_game import WerewolfGame
+    from app.services.werewolf_game import try_lock_game, get_alive_players
 
-    _engine = create_async_engine(settings.database_url, pool_pre_ping=True)
-    async with _AsyncSession(_engine) as db:
+    async with AsyncSessionLocal() as db:
+        if not await try_lock_game(db, game_id, "agents"):
+            logger.debug(f"Werewolf agents: game {game_id} already running, skipped")
+            return 0
+        game = await db.get(WerewolfGame, game_id)
+        if not game or game.status not in ("day", "night"):
+            return 0
+
+        roles = {r.resident_id: r for r in game.roles}
         result = await db.execute(
-            select(Resident).where(Resident._type == 'agent')
+            select(Resident).where(
+                Resident.id.in_(list(roles)), Resident._type == 'agent'
+            )
         )
         agents = result.scalars().all()
         if not agents:
-            await _engine.dispose()
-            return
-
-        actions_taken = 0
-        active_game_ids = set()
+            return 0
+        alive = await get_alive_players(db, game.id)
 
+        cycle_started = datetime.utcnow()
+        # Actions per kind, so only what changed is pushed
+        taken = {"night": 0, "vote": 0, "chat": 0, "phantom_chat": 0}
         for agent in agents:
             profile = get_agent_profile(agent)
+            role = roles[agent.id]
             try:
-                n = 0
-                n += await agent_werewolf_night_action(agent, db, profile)
-                n += await agent_werewolf_day_vote(agent, db, profile)
-                n += await agent_werewolf_discuss(agent, db, profile)
-                n += await agent_werewolf_phantom_chat(agent, db, profile)
-                actions_taken += n
-                if n > 0 and agent.current_game_id:
-                    active_game_ids.add(str(agent.current_game_id))
+                taken["night"] += await agent_werewolf_night_action(agent, db, profile, game=game, role=role, alive=alive)
+                taken["vote"] += await agent_werewolf_day_vote(agent, db, profile, game=game, role=role, alive=alive)
+                taken["chat"] += await agent_werewolf_discuss(agent, db, profile, game=game, role=role, alive=alive)
+                taken["phantom_chat"] += await agent_werewolf_phantom_chat(agent, db, profile, game=game, role=role, alive=alive)
             except Exception as e:
                 logger.debug(f"Agent {agent.name} werewolf cycle error: {e}")
+        actions_taken = sum(taken.values())
 
         if actions_taken > 0:
             await db.commit()
-            # Notify connected WebSocket clients
+            # Push the cycle's chat messages and votes to connected sockets
             try:
-                from app.services.ws_manager import publish
-                for gid in active_game_ids:
-                    publish(gid, 'comments')
-                    publish(gid, 'votes')
-                    publish(gid, 'phantom_chat')
-            except Exception:
-                pass
-            logger.info(f"Werewolf agent cycle: {actions_taken} actions")
+                from app.services.werewolf_deltas import chat_since, votes_delta
+                from app.services.ws_manager import push, publish
+                deltas = []
+                if taken["chat"]:
+                    deltas.append(await chat_since(db, game.id, cycle_started))
+                if taken["vote"]:
+                    deltas.append(await votes_delta(db, game))
+                push(str(game_id), *deltas)
+                if taken["phantom_chat"]:
+                    publish(str(game_id), 'phantom_chat')
+            except Exception as e:
+                logger.debug(f"Werewolf agents game#{game.game_number}: delta push failed: {e}")
+            logger.info(f"Werewolf agents game#{game.game_number}: {actions_taken} actions")
+        return actions_taken
+
+
+async def get_active_werewolf_game_ids() -> list:
+    """IDs of games in progress (day/night)."""
+    from app.database import AsyncSessionLocal
+    from app.models.werewolf_game import WerewolfGame
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(WerewolfGame.id).where(WerewolfGame.status.in_(["day", "night"]))
+        )
+        return [gid for (gid,) in result.all()]
+
+
+async def run_werewolf_agent_cycle() -> int:
+    """Run every active game's AI players in-process, games concurrently.
+
+    Celery fans out one werewolf_game_agents_task per game instead; this is
+    for scripts and single-process setups.
+    """
+    game_ids = await get_active_werewolf_game_ids()
+    results = await asyncio.gather(
+        *(run_werewolf_game_agents(gid) for gid in game_ids), return_exceptions=True
+    )
+    return sum(r for r in results if isinstance(r, int))
 
-    await _engine.dispose()
+
+async def run_werewolf_prethink(game_ids: Optional[list] = None) -> dict:
+    """Pre-compute this phase's thinking steps for every AI player.
+
+    Triggered when a phase starts. Agents run concurrently on their own
+    sessions; the shared LLM client's concurrency cap applies across them.
+    At night only players who act (night roles, phantom chat) are included.
+    Bounded by AGENT_CYCLE_BUDGET_SECONDS like the main cycle.
+    """
+    from app.database import AsyncSessionLocal
+    from app.models.werewolf_game import WerewolfGame, WerewolfRole
+    from app.services.werewolf_game import get_player_role, get_alive_players
+    from app.services.werewolf_strategy import build_game_context
+    from app.services.werewolf_llm_brain import prethink
+
+    concurrency = max(1, settings.OLLAMA_CONCURRENCY)
+    budget = float(settings.AGENT_CYCLE_BUDGET_SECONDS)
+
+    async with AsyncSessionLocal() as snapshot_db:
+        q = (
+            select(WerewolfRole.game_id, WerewolfRole.resident_id)
+            .join(WerewolfGame, WerewolfGame.id == WerewolfRole.game_id)
+            .join(Resident, Resident.id == WerewolfRole.resident_id)
+            .where(
+                WerewolfGame.status.in_(["day", "night"]),
+                WerewolfRole.is_alive == True,  # noqa: E712
+                Resident._type == 'agent',
+            )
+        )
+        if game_ids:
+            q = q.where(WerewolfGame.id.in_(game_ids))
+        pairs = (await snapshot_db.execute(q)).all()
+    if not pairs:
+        return {"agents": 0, "steps": 0}
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _run_one(game_id, agent_id) -> int:
+        async with semaphore:
+            async with AsyncSessionLocal() as db:
+                game = await db.get(WerewolfGame, game_id)
+                agent = await db.get(Resident, agent_id)
+                if not game or not agent or game.current_phase not in ("day", "night"):
+                    return 0
+                role = await get_player_role(db, game.id, agent.id)
+                if not role or not role.is_alive:
+                    return 0
+                if (game.current_phase == "night" and role.team != "phantoms"
+                        and role.role in ("citizen", "fanatic")):
+                    return 0
+
+                profile = get_agent_profile(agent)
+                alive = await get_alive_players(db, game.id)
+                ctx = await build_game_context(db, agent, game, role, profile, alive=alive)
+                teammates = None
+                if role.team == "phantoms":
+                    teammates = [p.resident.name for p in alive
+                                 if p.team == "phantoms" and p.resident_id != agent.id and p.resident]
+                werewolf_ext = get_werewolf_system_prompt_extension(
+                    role.role, teammates, lang=game.language or "en"
+                )
+                system = get_system_prompt(
+                    profile.get('personality', {}), agent.name, werewolf_context=werewolf_ext
+                )
+                n = await prethink(db, agent, game, role, profile, ctx=ctx, system_prompt=system)
+                if n:
+                    await db.commit()
+                return n
+
+    tasks = [asyncio.create_task(_run_one(gid, aid)) for gid, aid in pairs]
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for t in pending:
+        t.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    steps = 0
+    for t in done:
+        if t.exception() is not None:
+            logger.debug(f"Werewolf prethink error: {t.exception()}")
+        else:
+            steps += t.result()
+    logger.info(
+        f"Werewolf prethink: {steps} steps for {len(pairs)} agents"
+        + (f", {len(pending)} timed out" if pending else "")
+    )
+    return {"agents": len(pairs), "steps": steps, "timed_out": len(pending)}
 
 
 async def create_additional_agents(count: int = 20):
     """Create agents with human-like names and STRUCT CODE personality."""
     from app.utils.security import generate_api_key, hash_api_key, generate_claim_code
     from app.services.ai_agent import generate_random_personality
-    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession as _AsyncSession
+    from app.database import AsyncSessionLocal
 
-    _engine = create_async_engine(settings.database_url, pool_pre_ping=True)
-    async with _AsyncSession(_engine) as db:
+    async with AsyncSessionLocal() as db:
         created = 0
         for name, description in AGENT_TEMPLATES:
             if created >= count:
@@ -2663,6 +2924,4 @@ async def create_additional_agents(count: int = 20):
 
         await db.commit()
         logger.info(f"Created {created} new agents with STRUCT CODE")
-
-    await _engine.dispose()
     return created
@@ -20,6 +20,7 @@ from app.models.ai_personality import (
     AIElectionMemory,
 )
 from app.config import get_settings
+from app.services import llm_cache, llm_client
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -185,6 +186,26 @@ Be creative and specific. No generic corporate bios. These are real internet peo
 Respond with ONLY the JSON object, no markdown or explanation."""
 
 
+_BACKSTORY_TEXT_FIELDS = ("backstory", "occupation", "location_hint", "age_range", "life_context")
+
+
+def _parse_backstory(response: str) -> Optional[dict]:
+    """Backstory JSON from an Ollama reply, or None if it is unusable."""
+    # Ollama may wrap the JSON in markdown code blocks
+    text = response.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("backstory"), str):
+        return None
+    if any(not isinstance(data.get(f, ""), str) for f in _BACKSTORY_TEXT_FIELDS):
+        return None
+    return data
+
+
 async def generate_backstory(db: AsyncSession, personality: AIPersonality, agent_name: str) -> bool:
     """Generate a rich backstory for an agent using Ollama.
 
@@ -249,19 +270,26 @@ async def generate_backstory(db: AsyncSession, personality: AIPersonality, agent
     else:
         system_msg = f"You are creating a character profile for '{agent_name}' on an online forum."
 
-    response = await call_ollama(prompt, system_msg)
-    if not response:
-        logger.warning(f"Backstory generation failed for {agent_name}: no Ollama response")
+    async def _request() -> Optional[dict]:
+        response = await call_ollama(
+            prompt, system_msg, priority=llm_client.PRIORITY_BACKGROUND,
+        )
+        if not response:
+            logger.warning(f"Backstory generation failed for {agent_name}: no Ollama response")
+            return None
+        data = _parse_backstory(response)
+        if data is None:
+            logger.warning(f"Backstory parse failed for {agent_name}: {response[:200]!r}")
+        return data
+
+    # Only parsed profiles are cached; an unusable reply is retried next time
+    data = await llm_cache.cached_call(
+        "backstory", get_settings().OLLAMA_MODEL, None, system_msg, prompt, _request,
+    )
+    if data is None:
         return False
 
     try:
-        # Parse JSON — Ollama may wrap in markdown code blocks
-        text = response.strip()
-        if text.startswith("```"):
-            text = text.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
-
-        data = json.loads(text)
-
         personality.backstory = data.get("backstory", "")[:2000]
         personality.occupation = data.get("occupation", "")[:100]
         personality.location_hint = data.get("location_hint", "")[:100]
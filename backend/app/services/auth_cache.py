@@ -0,0 +1,74 @@
+"""
+Short-lived cache of API-key credentials for get_current_resident.
+
+auth:key:{api-key hash} holds the resident id the key belongs to for TTL
+seconds, so a hit skips the _api_key_hash lookup and loads the resident by
+primary key. Only the id is cached, never the row: handlers mutate
+current_resident as an attached ORM object, so it is always loaded fresh.
+A JWT's sub already is the resident id and needs no entry.
+
+invalidate() drops a resident's entry once the session commits (ban,
+unban, agent toggle, profile change; call it before replacing an API
+key, so the old key's entry goes). Every hit is also checked against the
+loaded row's key hash, so a stale entry never authenticates a key the
+resident no longer has. Redis errors fail open: the key is looked up in
+Postgres.
+"""
+import logging
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.redis_client import get_redis
+from app.services import post_commit
+
+logger = logging.getLogger(__name__)
+
+TTL = 45
+
+
+def _key(key_hash: str) -> str:
+    return f"auth:key:{key_hash}"
+
+
+async def get(key_hash: str) -> Optional[UUID]:
+    """Cached resident id for an API-key hash, or None on a miss."""
+    try:
+        value = await get_redis().get(_key(key_hash))
+    except Exception as e:
+        logger.debug(f"Auth cache: redis get failed: {e}")
+        return None
+    if value is None:
+        return None
+    try:
+        return UUID(value.decode())
+    except ValueError:
+        return None
+
+
+async def put(key_hash: str, resident_id: UUID) -> None:
+    try:
+        await get_redis().setex(_key(key_hash), TTL, str(resident_id))
+    except Exception as e:
+        logger.debug(f"Auth cache: redis set failed: {e}")
+
+
+async def drop(*key_hashes: Optional[str]) -> None:
+    keys = [_key(h) for h in key_hashes if h]
+    if not keys:
+        return
+    try:
+        await get_redis().delete(*keys)
+    except Exception as e:
+        logger.debug(f"Auth cache: redis delete failed: {e}")
+
+
+def invalidate(db: AsyncSession, resident) -> None:
+    """Drop the resident's cached credentials after this session commits."""
+    post_commit.defer(db, "auth_cache", resident._api_key_hash)
+
+
+@post_commit.handler("auth_cache")
+async def _drop_committed(db: AsyncSession, key_hashes: list) -> None:
+    await drop(*key_hashes)
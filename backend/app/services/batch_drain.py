@@ -0,0 +1,67 @@
+"""
+Batch drain - the loop shared by the Redis work queues drained from Celery
+(services/embedding_queue, services/notification_dispatch).
+
+Each queue supplies how to pop up to n members, how to put members back,
+and how to process one batch on a database session. drain() pops, processes
+and commits batch by batch until the queue is empty or max_batches is
+reached. A batch whose processing or commit raises is rolled back, put back
+on the queue for the next run, and the error re-raised; processors handle
+members that can never succeed themselves, so one bad member can't hold
+the rest of its batch back.
+"""
+import logging
+import time
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+
+async def drain(
+    db: AsyncSession,
+    name: str,
+    pop: Callable[[int], Awaitable[list]],
+    requeue: Callable[[list], Awaitable[None]],
+    process: Callable[[AsyncSession, list], Awaitable[int]],
+    length: Callable[[], Awaitable[int]],
+    batch_size: int,
+    max_batches: int,
+) -> dict:
+    """Process queued members batch by batch. Returns throughput stats.
+
+    process(db, members) returns the number of rows it wrote.
+    """
+    items = written = batches = 0
+    started = time.monotonic()
+
+    while batches < max_batches:
+        members = await pop(batch_size)
+        if not members:
+            break
+        try:
+            written += await process(db, members)
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            await requeue(members)
+            raise
+        items += len(members)
+        batches += 1
+
+    elapsed = time.monotonic() - started
+    stats = {
+        "items": items,
+        "written": written,
+        "batches": batches,
+        "seconds": round(elapsed, 3),
+        "items_per_sec": round(items / elapsed, 1) if items and elapsed else 0.0,
+        "remaining": await length(),
+    }
+    if items:
+        logger.info(
+            f"{name}: {items} items ({written} written) in {batches} batches, "
+            f"{stats['items_per_sec']} items/sec, {stats['remaining']} remaining"
+        )
+    return stats
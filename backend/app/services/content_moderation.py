@@ -33,6 +33,7 @@ from app.models.post import Post
 from app.models.comment import Comment
 from app.models.moderation import Report
 from app.config import get_settings
+from app.services import llm_cache
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -292,8 +293,19 @@ async def _ban_resident(db: AsyncSession, resident_id, reason: str) -> int:
     return 1
 
 
+MODERATION_MODEL = "claude-3-haiku-20240307"
+
+
 async def _call_claude_moderation(content_batch: str) -> list[dict] | None:
-    """Call Claude API for content moderation."""
+    """Call Claude API for content moderation (cached for an unchanged batch)."""
+    return await llm_cache.cached_call(
+        "moderation", MODERATION_MODEL, {"max_tokens": 2048},
+        MODERATION_SYSTEM_PROMPT, content_batch,
+        lambda: _request_claude_moderation(content_batch),
+    )
+
+
+async def _request_claude_moderation(content_batch: str) -> list[dict] | None:
     try:
         async with httpx.AsyncClient(timeout=60.0) as client:
             response = await client.post(
@@ -304,7 +316,7 @@ async def _call_claude_moderation(content_batch: str) -> list[dict] | None:
                     "content-type": "application/json",
                 },
                 json={
-                    "model": "claude-3-haiku-20240307",
+                    "model": MODERATION_MODEL,
                     "max_tokens": 2048,
                     "system": MODERATION_SYSTEM_PROMPT,
                     "messages": [
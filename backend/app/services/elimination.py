@@ -7,7 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.resident import Resident, KARMA_START
 from app.models.god import GodTerm
-from app.services.notification import create_notification
+from app.services import notification_dispatch
 
 
 async def eliminate_resident(resident: Resident, god_term_id, db: AsyncSession) -> None:
@@ -71,12 +71,12 @@ async def create_death_notification(resident: Resident, db: AsyncSession) -> Non
     )
     resident_ids = result.scalars().all()
 
-    for recipient_id in resident_ids:
-        await create_notification(
-            db=db,
-            recipient_id=recipient_id,
-            type="elimination",
-            title=f"{resident.name} has vanished from Genesis.",
-            message=f"{resident.name}'s karma reached zero. They have been eliminated until the next God takes power.",
-            actor_id=resident.id,
-        )
+    # One bulk insert for every recipient, after commit
+    notification_dispatch.note(
+        db, "direct",
+        recipient_ids=[str(rid) for rid in resident_ids],
+        type="elimination",
+        title=f"{resident.name} has vanished from Genesis.",
+        message=f"{resident.name}'s karma reached zero. They have been eliminated until the next God takes power.",
+        actor_id=resident.id,
+    )
@@ -0,0 +1,101 @@
+"""
+Embedding pipeline: new and edited posts/comments are embedded in batches
+by a background worker instead of one at a time on the request path.
+
+Write paths enqueue "post:{id}" / "comment:{id}" members into a Redis set
+(embed:queue) after their commit; a set, so repeated edits before the next
+drain collapse into one job. drain() (Celery beat, every DRAIN_INTERVAL
+seconds) pops up to BATCH_SIZE members at a time (services/batch_drain),
+encodes each batch with a single model call and bulk-upserts the embedding
+rows (services/search). Rows whose text hash is unchanged are skipped.
+
+Write paths note() objects on their session; they are enqueued once the
+session commits (services/post_commit).
+
+Enqueueing fails open: content missed while Redis is down is picked up by
+a full reindex (search.reindex_all).
+"""
+import logging
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.redis_client import get_redis
+from app.services import batch_drain, post_commit
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 128
+DRAIN_INTERVAL = 30
+MAX_BATCHES = 20
+
+_QUEUE_KEY = "embed:queue"
+_KINDS = ("post", "comment")
+
+
+async def enqueue(kind: str, *ids) -> None:
+    """Queue posts or comments (kind "post" / "comment") for embedding."""
+    if not ids:
+        return
+    try:
+        await get_redis().sadd(_QUEUE_KEY, *[f"{kind}:{i}" for i in ids])
+    except Exception as e:
+        logger.debug(f"Embedding queue: enqueue failed: {e}")
+
+
+def note(db: AsyncSession, kind: str, item) -> None:
+    """Queue an object created or edited in this session until after commit."""
+    post_commit.defer(db, "embedding", (kind, item))
+
+
+@post_commit.handler("embedding")
+async def _enqueue_pending(db: AsyncSession, pending: list) -> None:
+    for kind in _KINDS:
+        await enqueue(kind, *[item.id for k, item in pending if k == kind])
+
+
+async def queue_length() -> int:
+    try:
+        return await get_redis().scard(_QUEUE_KEY)
+    except Exception:
+        return 0
+
+
+def _parse(members: list) -> dict:
+    """Queued members by kind; malformed ones are logged and dropped."""
+    ids = {kind: [] for kind in _KINDS}
+    for member in members:
+        kind, _, raw_id = member.decode().partition(":")
+        try:
+            ids[kind].append(UUID(raw_id))
+        except (KeyError, ValueError):
+            logger.warning(f"Embedding queue: dropped malformed member {member!r}")
+    return ids
+
+
+async def _embed_batch(db: AsyncSession, members: list) -> int:
+    from app.services.search import index_comments, index_posts
+
+    ids = _parse(members)
+    return await index_posts(db, ids["post"]) + await index_comments(db, ids["comment"])
+
+
+async def drain(db: AsyncSession, batch_size: int = BATCH_SIZE, max_batches: int = MAX_BATCHES) -> dict:
+    """Embed queued items batch by batch. Returns throughput stats.
+
+    A batch that fails is put back on the queue for the next run.
+    """
+    redis = get_redis()
+
+    async def _requeue(members: list) -> None:
+        await redis.sadd(_QUEUE_KEY, *members)
+
+    return await batch_drain.drain(
+        db, "Embedding queue",
+        pop=lambda n: redis.spop(_QUEUE_KEY, n),
+        requeue=_requeue,
+        process=_embed_batch,
+        length=queue_length,
+        batch_size=batch_size,
+        max_batches=max_batches,
+    )
@@ -0,0 +1,260 @@
+"""
+Redis-backed ranked feed cache for post listings.
+
+One sorted set per (submolt, sort) — feed:{submolt|*}:{sort} — holds up to
+FEED_MAX post ids scored by that listing's sort key, highest first, with ties
+broken by id like the Postgres keyset order. Post cards (PostResponse without
+user_vote) are cached separately under post:card:{id} for CARD_TTL seconds.
+
+Postgres stays the source of truth:
+- rebuild() reloads every feed from the keyset indexes (periodic Celery task)
+- index_post() / refresh_posts() update existing feeds in place on post
+  creation and votes; a feed that was never built is left alone so it can't
+  fill up with a partial listing
+- a feed trimmed to FEED_MAX is flagged in feed:truncated, and pages past its
+  tail are reported as misses
+
+Every read returns None on a miss or a Redis error, and callers fall back to
+Postgres.
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import desc, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.post import Post
+from app.redis_client import get_redis
+from app.services import post_commit
+
+logger = logging.getLogger(__name__)
+
+SORTS = ("hot", "new", "top", "rising")
+FEED_MAX = 1000
+CARD_TTL = 30
+
+_TRUNCATED_KEY = "feed:truncated"
+_UNIX_EPOCH = datetime(1970, 1, 1)
+
+# KEYS[1] = truncated hash, KEYS[2..] = feeds; ARGV = cap, member, score per feed
+_UPSERT_SCRIPT = """
+local cap = tonumber(ARGV[1])
+for i = 2, #KEYS do
+  if redis.call('EXISTS', KEYS[i]) == 1 then
+    redis.call('ZADD', KEYS[i], ARGV[i + 1], ARGV[2])
+    if redis.call('ZCARD', KEYS[i]) > cap then
+      redis.call('ZREMRANGEBYRANK', KEYS[i], 0, -(cap + 1))
+      redis.call('HSET', KEYS[1], KEYS[i], 1)
+    end
+  end
+end
+return 1
+"""
+
+
+def feed_key(submolt: Optional[str], sort: str) -> str:
+    return f"feed:{submolt or '*'}:{sort}"
+
+
+def card_key(post_id) -> str:
+    return f"post:card:{post_id}"
+
+
+def sort_columns(sort: str) -> list:
+    """Keyset sort key per listing: (column expressions..., Post.id), all descending."""
+    if sort == "new":
+        return [Post.created_at, Post.id]
+    if sort == "top":
+        return [Post.upvotes - Post.downvotes, Post.id]
+    if sort == "rising":
+        # Recent posts with good score
+        return [Post.upvotes - Post.downvotes, Post.created_at, Post.id]
+    return [Post.hot_score, Post.id]
+
+
+def sort_score(sort: str, upvotes: int, downvotes: int, created_at: datetime, hot_score: float) -> float:
+    """Sorted-set score matching sort_columns() order (ties aside)."""
+    if sort == "new":
+        return (created_at - _UNIX_EPOCH).total_seconds()
+    if sort == "top":
+        return float(upvotes - downvotes)
+    if sort == "rising":
+        # score first, then created_at: epoch seconds stay below 1e10
+        return (upvotes - downvotes) * 1e10 + int((created_at - _UNIX_EPOCH).total_seconds())
+    return float(hot_score)
+
+
+async def _upsert(post_id, submolt: str, upvotes: int, downvotes: int,
+                  created_at: datetime, hot_score: float) -> None:
+    keys, scores = [], []
+    for feed_submolt in (None, submolt):
+        for sort in SORTS:
+            keys.append(feed_key(feed_submolt, sort))
+            scores.append(repr(sort_score(sort, upvotes, downvotes, created_at, hot_score)))
+    redis = get_redis()
+    await redis.eval(_UPSERT_SCRIPT, len(keys) + 1, _TRUNCATED_KEY, *keys, FEED_MAX, str(post_id), *scores)
+    await redis.delete(card_key(post_id))
+
+
+async def index_post(post: Post) -> None:
+    """Place a new or re-scored post in its feeds and drop its cached card."""
+    try:
+        await _upsert(post.id, post.submolt, post.upvotes or 0, post.downvotes or 0,
+                      post.created_at, post.hot_score)
+    except Exception as e:
+        logger.debug(f"Feed cache: index of {post.id} failed: {e}")
+
+
+async def remove_post(post_id, submolt: str) -> None:
+    try:
+        redis = get_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            for feed_submolt in (None, submolt):
+                for sort in SORTS:
+                    pipe.zrem(feed_key(feed_submolt, sort), str(post_id))
+            pipe.delete(card_key(post_id))
+            await pipe.execute()
+    except Exception as e:
+        logger.debug(f"Feed cache: remove of {post_id} failed: {e}")
+
+
+async def invalidate_card(post_id) -> None:
+    """Drop a post's cached card (e.g. its comment_count changed)."""
+    try:
+        await get_redis().delete(card_key(post_id))
+    except Exception:
+        pass
+
+
+def mark_dirty(db: AsyncSession, post: Post) -> None:
+    """Remember a post whose counters were changed with SQL expressions.
+
+    Scores aren't known in Python until the UPDATE runs, so the feeds are
+    refreshed from the database once the session commits.
+    """
+    post_commit.defer(db, "feed_cache", post)
+
+
+@post_commit.handler("feed_cache")
+async def _refresh_dirty(db: AsyncSession, posts: list) -> None:
+    await refresh_posts(db, {p.id for p in posts if p.id is not None})
+
+
+async def refresh_posts(db: AsyncSession, post_ids: Iterable[UUID]) -> None:
+    """Re-read posts' current counters and update their feeds and cards."""
+    post_ids = list(post_ids)
+    if not post_ids:
+        return
+    result = await db.execute(
+        select(Post.id, Post.submolt, Post.upvotes, Post.downvotes, Post.created_at, Post.hot_score)
+        .where(Post.id.in_(post_ids))
+    )
+    try:
+        for row in result.all():
+            await _upsert(*row)
+    except Exception as e:
+        logger.debug(f"Feed cache: refresh failed: {e}")
+
+
+async def get_page(
+    submolt: Optional[str],
+    sort: str,
+    offset: int,
+    limit: int,
+    after_id: Optional[UUID] = None,
+) -> Optional[tuple[list[tuple[UUID, float]], bool]]:
+    """([(post_id, score), ...], has_more) for one page, or None on a miss.
+
+    after_id continues from a previous page's last post (its current rank);
+    it is a miss if that post has since left the feed.
+    """
+    key = feed_key(submolt, sort)
+    try:
+        redis = get_redis()
+        if after_id is not None:
+            rank = await redis.zrevrank(key, str(after_id))
+            if rank is None:
+                return None
+            offset = rank + 1
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zcard(key)
+            pipe.hexists(_TRUNCATED_KEY, key)
+            pipe.zrevrange(key, offset, offset + limit, withscores=True)
+            size, truncated, rows = await pipe.execute()
+    except Exception as e:
+        logger.debug(f"Feed cache: read of {key} failed: {e}")
+        return None
+
+    if not size or (truncated and offset + limit + 1 > size):
+        return None
+    entries = [(UUID(member.decode()), score) for member, score in rows]
+    return entries[:limit], len(entries) > limit
+
+
+async def get_cards(post_ids: list[UUID]) -> dict[UUID, dict]:
+    """Cached cards by post id; missing or unreadable cards are left out."""
+    if not post_ids:
+        return {}
+    try:
+        raws = await get_redis().mget([card_key(pid) for pid in post_ids])
+    except Exception:
+        return {}
+    return {pid: json.loads(raw) for pid, raw in zip(post_ids, raws) if raw is not None}
+
+
+async def put_cards(cards: dict[UUID, dict]) -> None:
+    """Store JSON-serializable cards for CARD_TTL seconds."""
+    if not cards:
+        return
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for pid, card in cards.items():
+                pipe.setex(card_key(pid), CARD_TTL, json.dumps(card))
+            await pipe.execute()
+    except Exception as e:
+        logger.debug(f"Feed cache: card write failed: {e}")
+
+
+async def _rebuild_feed(db: AsyncSession, submolt: Optional[str], sort: str) -> int:
+    query = select(Post.id, Post.upvotes, Post.downvotes, Post.created_at, Post.hot_score)
+    if submolt:
+        query = query.where(Post.submolt == submolt)
+    query = query.order_by(*[desc(c) for c in sort_columns(sort)]).limit(FEED_MAX + 1)
+    rows = (await db.execute(query)).all()
+
+    truncated = len(rows) > FEED_MAX
+    mapping = {
+        str(post_id): sort_score(sort, up, down, created_at, hot)
+        for post_id, up, down, created_at, hot in rows[:FEED_MAX]
+    }
+    key = feed_key(submolt, sort)
+    tmp_key = f"{key}:rebuild"
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.delete(tmp_key)
+        if mapping:
+            pipe.zadd(tmp_key, mapping)
+            pipe.rename(tmp_key, key)
+        else:
+            pipe.delete(key)
+        if truncated:
+            pipe.hset(_TRUNCATED_KEY, key, 1)
+        else:
+            pipe.hdel(_TRUNCATED_KEY, key)
+        await pipe.execute()
+    return len(mapping)
+
+
+async def rebuild(db: AsyncSession) -> dict:
+    """Reload every feed (global and per submolt) from Postgres."""
+    from app.models.submolt import Submolt
+
+    submolts = (await db.execute(select(Submolt.name))).scalars().all()
+    feeds = entries = 0
+    for submolt in (None, *submolts):
+        for sort in SORTS:
+            entries += await _rebuild_feed(db, submolt, sort)
+            feeds += 1
+    return {"feeds": feeds, "entries": entries}
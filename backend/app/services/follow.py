@@ -3,7 +3,7 @@ Follow Service - Business logic for follow relationships
 """
 from typing import Optional
 from uuid import UUID
-from sqlalchemy import select, and_, func, desc
+from sqlalchemy import select, and_, func, desc, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -11,6 +11,7 @@ from app.models.resident import Resident
 from app.models.follow import Follow
 from app.models.post import Post
 from app.models.vote import Vote
+from app.services import timeline
 
 
 async def follow_resident(
@@ -58,6 +59,7 @@ async def follow_resident(
         follower.following_count += 1
 
     await db.commit()
+    await timeline.on_follow(db, follower_id, following_id)
     return True, "Successfully followed"
 
 
@@ -104,6 +106,7 @@ async def unfollow_resident(
         follower.following_count -= 1
 
     await db.commit()
+    await timeline.on_unfollow(db, follower_id, following_id)
     return True, "Successfully unfollowed"
 
 
@@ -208,34 +211,57 @@ async def get_feed_posts(
     limit: int = 25,
     offset: int = 0,
     current_resident_id: Optional[UUID] = None,
-) -> tuple[list[tuple[Post, Optional[int]]], int, bool]:
+    cursor: Optional[str] = None,
+) -> tuple[list[tuple[Post, Optional[int]]], int, bool, Optional[str]]:
     """
-    Get posts from residents that the given resident follows.
-    Returns (posts_with_votes, total_count, has_more) tuple.
+    Get posts from residents that the given resident follows, newest first.
+    Returns (posts_with_votes, total_count, has_more, next_cursor) tuple.
     Each item is a tuple of (post, user_vote).
+
+    Pages are read from the resident's Redis home timeline when it can serve
+    them (see services/timeline), else with a keyset (cursor) or offset
+    query on Postgres. total is cached for a few minutes.
+    Raises ValueError for a malformed cursor.
     """
-    # Get IDs of residents the user follows
-    following_subquery = (
-        select(Follow.following_id)
-        .where(Follow.follower_id == resident_id)
-    )
+    after = timeline.decode_cursor(cursor) if cursor else None
 
-    # Get posts from followed residents
-    query = (
-        select(Post)
-        .options(selectinload(Post.author))
-        .where(Post.author_id.in_(following_subquery))
-        .order_by(desc(Post.created_at))
-        .offset(offset)
-        .limit(limit + 1)
-    )
+    page = None
+    if not offset or after:
+        page = await timeline.get_timeline(db, resident_id, limit, after)
 
-    result = await db.execute(query)
-    posts = list(result.scalars().all())
+    if page is not None:
+        post_ids, has_more = page
+        result = await db.execute(
+            select(Post).options(selectinload(Post.author)).where(Post.id.in_(post_ids))
+        )
+        by_id = {p.id: p for p in result.scalars().all()}
+        # Posts deleted since they were pushed are skipped
+        posts = [by_id[pid] for pid in post_ids if pid in by_id]
+    else:
+        # Get IDs of residents the user follows
+        following_subquery = (
+            select(Follow.following_id)
+            .where(Follow.follower_id == resident_id)
+        )
 
-    has_more = len(posts) > limit
-    if has_more:
-        posts = posts[:limit]
+        # Get posts from followed residents
+        query = (
+            select(Post)
+            .options(selectinload(Post.author))
+            .where(Post.author_id.in_(following_subquery))
+            .order_by(desc(Post.created_at), desc(Post.id))
+        )
+        if after:
+            query = query.where(tuple_(Post.created_at, Post.id) < tuple_(*after))
+        elif offset:
+            query = query.offset(offset)
+
+        result = await db.execute(query.limit(limit + 1))
+        posts = list(result.scalars().all())
+
+        has_more = len(posts) > limit
+        if has_more:
+            posts = posts[:limit]
 
     # Get user votes if authenticated
     user_votes: dict[UUID, int] = {}
@@ -253,15 +279,13 @@ async def get_feed_posts(
         for vote in vote_result.scalars():
             user_votes[vote.target_id] = vote.value
 
-    # Get total count
-    count_query = (
-        select(func.count(Post.id))
-        .where(Post.author_id.in_(following_subquery))
+    total = await timeline.cached_feed_count(db, resident_id)
+    next_cursor = (
+        timeline.encode_cursor(posts[-1].created_at, posts[-1].id)
+        if has_more and posts else None
     )
-    count_result = await db.execute(count_query)
-    total = count_result.scalar() or 0
 
     # Combine posts with votes
     posts_with_votes = [(post, user_votes.get(post.id)) for post in posts]
 
-    return posts_with_votes, total, has_more
+    return posts_with_votes, total, has_more, next_cursor
@@ -0,0 +1,162 @@
+"""
+Content-addressed cache for deterministic LLM calls (Ollama and Claude).
+
+Key = sha256 of (model, options, system prompt, prompt), namespaced by call
+site. Lookups hit a small in-process LRU first, then Redis; values are stored
+as JSON so parsed results (e.g. moderation verdict lists) can be cached too.
+
+Only call sites listed in SITE_TTLS are cached. Creative sampling calls
+(SNS posts, comments, chat) never pass a site and always reach the model.
+Redis errors fail open: the call simply goes to the model.
+
+Hit/miss counters are kept per process and aggregated in a Redis hash
+(llm_cache:stats) so the admin API can see savings across workers.
+"""
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from app.config import get_settings
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Seconds to keep a cached response, per call site
+SITE_TTLS = {
+    "werewolf_think": 15 * 60,        # assess/analyze/strategize for unchanged inputs
+    "backstory": 7 * 24 * 3600,
+    "moderation": 24 * 3600,          # same content batch → same verdicts
+    "report": 30 * 24 * 3600,         # same diagnosis → same report
+}
+
+_KEY_PREFIX = "llm_cache:"
+_STATS_KEY = "llm_cache:stats"
+_LOCAL_MAX = 512
+
+
+class _LocalLRU:
+    """Tiny LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value, ttl: int) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+_local = _LocalLRU(_LOCAL_MAX)
+_stats: dict[str, dict[str, int]] = {}
+
+
+def cache_key(site: str, model: str, options: Optional[dict], system: str, prompt: str) -> str:
+    digest = hashlib.sha256(
+        json.dumps(
+            [model, options or {}, system or "", prompt],
+            sort_keys=True, ensure_ascii=False,
+        ).encode()
+    ).hexdigest()
+    return f"{_KEY_PREFIX}{site}:{digest}"
+
+
+async def _count(site: str, field: str) -> None:
+    site_stats = _stats.setdefault(site, {"hits": 0, "misses": 0})
+    site_stats[field] = site_stats.get(field, 0) + 1
+    try:
+        await get_redis().hincrby(_STATS_KEY, f"{site}:{field}", 1)
+    except Exception:
+        pass
+
+
+async def get(site: str, key: str):
+    """Cached value or None. Counts a hit or a miss."""
+    value = _local.get(key)
+    if value is None:
+        try:
+            raw = await get_redis().get(key)
+        except Exception as e:
+            logger.debug(f"LLM cache: redis get failed: {e}")
+            raw = None
+        if raw is not None:
+            value = json.loads(raw)
+            ttl = SITE_TTLS.get(site, 0)
+            if ttl:
+                _local.set(key, value, ttl)
+    await _count(site, "hits" if value is not None else "misses")
+    return value
+
+
+async def put(site: str, key: str, value) -> None:
+    ttl = SITE_TTLS.get(site)
+    if not ttl or value is None:
+        return
+    _local.set(key, value, ttl)
+    try:
+        await get_redis().setex(key, ttl, json.dumps(value, ensure_ascii=False))
+    except Exception as e:
+        logger.debug(f"LLM cache: redis set failed: {e}")
+
+
+async def cached_call(
+    site: Optional[str],
+    model: str,
+    options: Optional[dict],
+    system: str,
+    prompt: str,
+    call: Callable[[], Awaitable[Any]],
+):
+    """Return a cached result for this exact request, or run call() and store it.
+
+    site=None (or an unknown site) bypasses the cache entirely. None results
+    are never stored, so failures are retried on the next call.
+    """
+    if not site or site not in SITE_TTLS or not get_settings().LLM_CACHE_ENABLED:
+        return await call()
+    key = cache_key(site, model, options, system, prompt)
+    value = await get(site, key)
+    if value is not None:
+        return value
+    value = await call()
+    await put(site, key, value)
+    return value
+
+
+def stats() -> dict:
+    """Per-site hit/miss counters for this process."""
+    return {site: dict(s) for site, s in _stats.items()}
+
+
+async def global_stats() -> dict:
+    """Per-site hit/miss counters aggregated across processes via Redis."""
+    try:
+        raw = await get_redis().hgetall(_STATS_KEY)
+    except Exception:
+        return stats()
+    result: dict[str, dict[str, int]] = {}
+    for field, count in raw.items():
+        site, _, kind = field.decode().rpartition(":")
+        result.setdefault(site, {"hits": 0, "misses": 0})[kind] = int(count)
+    for site, s in result.items():
+        total = s.get("hits", 0) + s.get("misses", 0)
+        s["hit_rate"] = round(s.get("hits", 0) / total, 3) if total else 0.0
+    return result
@@ -0,0 +1,466 @@
+"""
+Shared Ollama client — one pooled connection, one request pipeline.
+
+Every LLM call in the backend (SNS agents, Phantom Night brain) goes through
+generate() so that:
+- A single process-wide httpx.AsyncClient keeps connections alive to
+  OLLAMA_HOST (HTTP/2 when the h2 package is installed)
+- A global priority limiter caps in-flight generations at OLLAMA_CONCURRENCY;
+  waiting requests are served by lane (critical game actions first, SNS
+  chatter last) instead of first-come
+- Transient failures (connect errors, timeouts, 5xx) are retried with
+  exponential backoff and full jitter
+- A circuit breaker fails fast while Ollama is down, so a dead backend costs
+  one connect timeout per cooldown instead of a long timeout per agent
+- Non-critical requests arriving within OLLAMA_BATCH_WINDOW_MS are
+  micro-batched: grouped by model + options and dispatched together, ordered
+  by system prompt so requests sharing a prefix reach Ollama back to back and
+  reuse its prompt cache
+- /api/chat with keep_alive (OLLAMA_USE_CHAT, OLLAMA_KEEP_ALIVE) keeps the
+  model resident between agent cycles
+
+Client and limiter are bound to the running event loop and rebuilt if the
+loop changes (Celery tasks may run each invocation on a fresh loop).
+"""
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import random
+import time
+from typing import Optional
+
+import httpx
+
+from app.config import get_settings
+from app.services import llm_cache
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes — lower value is served first
+PRIORITY_CRITICAL = 0    # werewolf decisions that gate a game (vote, night action)
+PRIORITY_GAME = 1        # werewolf thinking steps and discussion
+PRIORITY_SNS = 2         # SNS comments, posts, mention replies
+PRIORITY_BACKGROUND = 3  # reflection, backstories, anything nobody waits on
+
+_AI_PHRASES = [
+    "As an AI", "I'm an AI", "as a language model",
+    "I don't have personal", "as an artificial",
+]
+
+try:
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+
+class CircuitOpenError(Exception):
+    """Raised internally when the breaker is open and the call is skipped."""
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PRIORITY LIMITER
+# ═══════════════════════════════════════════════════════════════════════════
+
+class PriorityLimiter:
+    """Semaphore whose waiters are woken in (priority, arrival) order."""
+
+    def __init__(self, limit: int):
+        self._limit = max(1, limit)
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, f in self._waiters if not f.done())
+
+    async def acquire(self, priority: int = PRIORITY_SNS) -> None:
+        if self._active < self._limit and not self.waiting:
+            self._active += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # Slot was handed to us just as we were cancelled — pass it on
+            if fut.done() and not fut.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                # Hand the slot straight to the next waiter; _active unchanged
+                fut.set_result(None)
+                return
+        self._active = max(0, self._active - 1)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CIRCUIT BREAKER
+# ═══════════════════════════════════════════════════════════════════════════
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed → open (cooldown) → half-open probe."""
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state != "half_open":
+            return False
+        now = time.monotonic()
+        # A probe that never reported back (lost task) is replaced after a cooldown
+        if self._probe_started is None or now - self._probe_started >= self.cooldown:
+            self._probe_started = now
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Give up an outstanding probe without counting it (e.g. cancelled)."""
+        self._probe_started = None
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("LLM client: Ollama recovered, circuit closed")
+        self.failures = 0
+        self.opened_at = None
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_started = None
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning(
+                    f"LLM client: {self.failures} consecutive Ollama failures, "
+                    f"circuit open for {self.cooldown:.0f}s"
+                )
+            self.opened_at = time.monotonic()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# MICRO-BATCHER
+# ═══════════════════════════════════════════════════════════════════════════
+
+class MicroBatcher:
+    """Collect submissions for a short window, then dispatch them together.
+
+    Within a flush, items are grouped by key and sorted by prefix so that
+    requests sharing a prefix are started consecutively. Each item is run
+    through dispatch(item) as its own task; the caller awaits the returned
+    future. Cancelling that future cancels the dispatch.
+    """
+
+    def __init__(self, window: float, max_batch: int, dispatch):
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._dispatch = dispatch
+        self._pending: list[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        self.batches = 0
+        self.batched = 0
+
+    def submit(self, key, prefix: str, item) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((key, prefix, item, fut))
+        if len(self._pending) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return fut
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        self.batched += len(batch)
+
+        groups: dict = {}
+        for key, prefix, item, fut in batch:
+            groups.setdefault(key, []).append((prefix, item, fut))
+        loop = asyncio.get_running_loop()
+        for members in groups.values():
+            members.sort(key=lambda m: m[0])  # stable: arrival order within a prefix
+            for _, item, fut in members:
+                if fut.done():
+                    continue
+                task = loop.create_task(self._run(item, fut))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                fut.add_done_callback(lambda f, t=task: t.cancel() if f.cancelled() else None)
+
+    async def _run(self, item, fut: asyncio.Future) -> None:
+        try:
+            result = await self._dispatch(item)
+        except asyncio.CancelledError:
+            if not fut.done():
+                fut.cancel()
+            raise
+        except Exception as e:
+            if not fut.done():
+                fut.set_exception(e)
+            return
+        if not fut.done():
+            fut.set_result(result)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# LOOP-BOUND STATE
+# ═══════════════════════════════════════════════════════════════════════════
+
+class _State:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        s = get_settings()
+        limit = max(1, s.OLLAMA_CONCURRENCY)
+        self.loop = loop
+        self.client = httpx.AsyncClient(
+            http2=_HTTP2,
+            timeout=httpx.Timeout(
+                s.OLLAMA_TIMEOUT_SECONDS, connect=s.OLLAMA_CONNECT_TIMEOUT_SECONDS
+            ),
+            limits=httpx.Limits(
+                max_connections=limit * 2,
+                max_keepalive_connections=limit,
+                keepalive_expiry=60.0,
+            ),
+        )
+        self.limiter = PriorityLimiter(limit)
+        self.breaker = CircuitBreaker(
+            s.OLLAMA_BREAKER_THRESHOLD, float(s.OLLAMA_BREAKER_COOLDOWN_SECONDS)
+        )
+        self.batcher = MicroBatcher(
+            max(0, s.OLLAMA_BATCH_WINDOW_MS) / 1000.0, s.OLLAMA_BATCH_MAX,
+            lambda req: _generate_one(self, *req),
+        )
+        self.started_at = time.monotonic()
+        self.generations = 0
+        self.generation_seconds = 0.0
+
+
+_state: Optional[_State] = None
+
+
+def _get_state() -> _State:
+    global _state
+    loop = asyncio.get_running_loop()
+    if _state is None or _state.loop is not loop:
+        # Old client belongs to a dead loop; its sockets are closed with it
+        _state = _State(loop)
+    return _state
+
+
+def get_client() -> httpx.AsyncClient:
+    """Process-wide pooled client for the current event loop."""
+    return _get_state().client
+
+
+async def aclose() -> None:
+    """Close the pooled client (worker / app shutdown)."""
+    global _state
+    if _state is not None and _state.loop is asyncio.get_running_loop():
+        await _state.client.aclose()
+    _state = None
+
+
+def stats() -> dict:
+    """Snapshot of limiter and breaker state for logs / admin endpoints."""
+    if _state is None:
+        return {"active": 0, "waiting": 0, "circuit": "closed", "failures": 0,
+                "generations": 0, "generations_per_sec": 0.0, "batches": 0, "avg_batch": 0.0}
+    elapsed = max(time.monotonic() - _state.started_at, 1e-6)
+    batcher = _state.batcher
+    return {
+        "active": _state.limiter.active,
+        "waiting": _state.limiter.waiting,
+        "circuit": _state.breaker.state,
+        "failures": _state.breaker.failures,
+        "generations": _state.generations,
+        "generations_per_sec": round(_state.generations / elapsed, 3),
+        "avg_generation_seconds": round(
+            _state.generation_seconds / _state.generations, 3
+        ) if _state.generations else 0.0,
+        "batches": batcher.batches,
+        "avg_batch": round(batcher.batched / batcher.batches, 2) if batcher.batches else 0.0,
+    }
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REQUEST PIPELINE
+# ═══════════════════════════════════════════════════════════════════════════
+
+def _strip_ai_phrases(text: str) -> str:
+    for phrase in _AI_PHRASES:
+        text = text.replace(phrase, "")
+    return text.strip()
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform(0, base * 2^attempt), capped."""
+    s = get_settings()
+    return random.uniform(0, min(s.OLLAMA_RETRY_BASE_SECONDS * (2 ** attempt), 10.0))
+
+
+async def _post(state: _State, path: str, payload: dict) -> httpx.Response:
+    """POST with retry on transient errors. Raises on final failure."""
+    s = get_settings()
+    host = s.OLLAMA_HOST or "https://ollama.genesis-pj.net"
+    attempts = max(0, s.OLLAMA_MAX_RETRIES) + 1
+    last_exc: Optional[Exception] = None
+    for attempt in range(attempts):
+        if not state.breaker.allow():
+            raise CircuitOpenError("Ollama circuit open")
+        try:
+            response = await state.client.post(f"{host}{path}", json=payload)
+        except (httpx.TransportError, httpx.TimeoutException) as e:
+            state.breaker.record_failure()
+            last_exc = e
+        except Exception:
+            state.breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancelled (cycle budget / batcher): not Ollama's fault, but the
+            # half-open probe slot must not stay taken
+            state.breaker.release_probe()
+            raise
+        else:
+            if response.status_code < 500:
+                state.breaker.record_success()
+                return response
+            state.breaker.record_failure()
+            last_exc = httpx.HTTPStatusError(
+                f"Ollama {response.status_code}", request=response.request, response=response
+            )
+        if attempt + 1 < attempts:
+            await asyncio.sleep(_backoff(attempt))
+    raise last_exc  # type: ignore[misc]
+
+
+def _build_request(
+    prompt: str,
+    system_prompt: str,
+    options: dict,
+    model: Optional[str],
+) -> tuple[str, dict]:
+    """(path, payload) for /api/chat or /api/generate per OLLAMA_USE_CHAT."""
+    s = get_settings()
+    payload = {
+        "model": model or s.OLLAMA_MODEL or "llama3.1:8b",
+        "stream": False,
+        "keep_alive": s.OLLAMA_KEEP_ALIVE,
+        "options": options,
+    }
+    if s.OLLAMA_USE_CHAT:
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        payload["messages"] = messages
+        return "/api/chat", payload
+    payload["prompt"] = prompt
+    payload["system"] = system_prompt
+    return "/api/generate", payload
+
+
+def _response_text(path: str, data: dict) -> str:
+    if path == "/api/chat":
+        return (data.get("message") or {}).get("content", "")
+    return data.get("response", "")
+
+
+async def _generate_one(state: _State, path: str, payload: dict, priority: int) -> Optional[str]:
+    await state.limiter.acquire(priority)
+    started = time.monotonic()
+    try:
+        response = await _post(state, path, payload)
+    except CircuitOpenError:
+        return None
+    except Exception as e:
+        logger.error(f"Ollama error: {e}")
+        return None
+    finally:
+        state.limiter.release()
+
+    if response.status_code != 200:
+        logger.warning(f"Ollama returned {response.status_code}: {response.text[:200]}")
+        return None
+    try:
+        content = _response_text(path, response.json())
+        content = content.strip()
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        logger.warning(f"Ollama returned an unreadable body: {e}: {response.text[:200]}")
+        return None
+    state.generations += 1
+    state.generation_seconds += time.monotonic() - started
+    return _strip_ai_phrases(content)
+
+
+async def generate(
+    prompt: str,
+    system_prompt: str = "",
+    *,
+    temperature: float = 0.85,
+    top_p: float = 0.92,
+    repeat_penalty: float = 1.15,
+    priority: int = PRIORITY_SNS,
+    model: Optional[str] = None,
+    cache_site: Optional[str] = None,
+) -> Optional[str]:
+    """Generate text via Ollama. Returns None on any failure.
+
+    Critical-lane requests are dispatched immediately; everything else goes
+    through the micro-batcher when OLLAMA_BATCH_WINDOW_MS > 0.
+    cache_site opts a deterministic call into the response cache
+    (see llm_cache.SITE_TTLS); leave it unset for creative sampling.
+    """
+    state = _get_state()
+    if state.breaker.state == "open":
+        logger.debug("LLM client: circuit open, skipping generation")
+        return None
+
+    options = {
+        "temperature": temperature,
+        "top_p": top_p,
+        "repeat_penalty": repeat_penalty,
+    }
+    path, payload = _build_request(prompt, system_prompt, options, model)
+
+    async def _dispatch() -> Optional[str]:
+        if state.batcher.window <= 0 or priority == PRIORITY_CRITICAL:
+            return await _generate_one(state, path, payload, priority)
+        key = (path, payload["model"], json.dumps(options, sort_keys=True))
+        return await state.batcher.submit(key, system_prompt, (path, payload, priority))
+
+    return await llm_cache.cached_call(
+        cache_site, payload["model"], options, system_prompt, prompt, _dispatch,
+    )
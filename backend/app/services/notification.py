@@ -1,19 +1,27 @@
 """
 Notification Service - Business logic for notification system
+
+Every write records its effect on the unread/total counts with
+notification_stream.note_*(); the counts are adjusted in Redis, and new
+notifications pushed to the recipient's socket, once the session commits.
+Mention, vote and comment notifications are queued as intents and created
+in batches by notification_dispatch.
 """
 import re
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
-from sqlalchemy import select, and_, func, update, delete
+from sqlalchemy import select, and_, update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.util import identity_key
 
 from app.models.notification import Notification
 from app.models.resident import Resident
 from app.models.post import Post
-from app.models.comment import Comment
 from app.models.election import Election, ElectionCandidate
+from app.schemas.notification import NotificationActor, NotificationResponse
+from app.services import notification_dispatch, notification_stream
 
 # Regex to extract @mentions from content
 MENTION_RE = re.compile(r'(?<!\w)@([A-Za-z0-9_-]{1,30})(?!\w)')
@@ -45,9 +53,30 @@ async def create_notification(
     )
     db.add(notification)
     await db.flush()
+    notification_stream.note_created(db, recipient_id, _payload(db, notification))
     return notification
 
 
+def _payload(db: AsyncSession, notification: Notification) -> dict:
+    """Pushed form of a new notification. The actor is included when it is
+    already in the session (the notify_* helpers load it), never queried."""
+    actor = None
+    if notification.actor_id is not None:
+        actor = db.sync_session.identity_map.get(identity_key(Resident, notification.actor_id))
+    return NotificationResponse(
+        id=notification.id,
+        type=notification.type,
+        title=notification.title,
+        message=notification.message,
+        link=notification.link,
+        target_type=notification.target_type,
+        target_id=notification.target_id,
+        actor=NotificationActor.model_validate(actor) if actor is not None else None,
+        is_read=False,
+        created_at=notification.created_at,
+    ).model_dump(mode="json")
+
+
 async def get_notifications(
     db: AsyncSession,
     resident_id: UUID,
@@ -72,15 +101,10 @@ async def get_notifications(
     # Order by created_at descending (newest first)
     query = query.order_by(Notification.created_at.desc())
 
-    # Get total count
-    count_query = select(func.count(Notification.id)).where(
-        Notification.recipient_id == resident_id
-    )
+    # Total from the cached counts
+    unread, total = await notification_stream.counts(db, resident_id)
     if unread_only:
-        count_query = count_query.where(Notification.is_read == False)
-
-    count_result = await db.execute(count_query)
-    total = count_result.scalar() or 0
+        total = unread
 
     # Apply pagination
     query = query.offset(offset).limit(limit + 1)
@@ -100,16 +124,10 @@ async def get_unread_count(
     resident_id: UUID,
 ) -> int:
     """
-    Get the count of unread notifications for a resident.
+    Get the count of unread notifications for a resident (cached in Redis).
     """
-    query = select(func.count(Notification.id)).where(
-        and_(
-            Notification.recipient_id == resident_id,
-            Notification.is_read == False,
-        )
-    )
-    result = await db.execute(query)
-    return result.scalar() or 0
+    unread, _ = await notification_stream.counts(db, resident_id)
+    return unread
 
 
 async def mark_as_read(
@@ -140,6 +158,7 @@ async def mark_as_read(
     notification.is_read = True
     notification.read_at = datetime.utcnow()
     await db.flush()
+    notification_stream.note_read(db, resident_id)
 
     return True, "Marked as read"
 
@@ -164,6 +183,7 @@ async def mark_all_as_read(
         .values(is_read=True, read_at=now)
     )
     await db.flush()
+    notification_stream.note_all_read(db, resident_id)
     return result.rowcount
 
 
@@ -189,8 +209,10 @@ async def delete_notification(
     if not notification:
         return False, "Notification not found"
 
+    was_unread = not notification.is_read
     await db.delete(notification)
     await db.flush()
+    notification_stream.note_deleted(db, resident_id, was_unread)
 
     return True, "Notification deleted"
 
@@ -236,76 +258,15 @@ async def notify_on_vote(
     target_type: str,
     target_id: UUID,
     vote_value: int,
-) -> Optional[Notification]:
+) -> None:
     """
-    Create a notification when someone votes on a post or comment.
-    Only notifies on upvotes.
+    Notify the author of a post or comment of an upvote (after commit,
+    via notification_dispatch). Only upvotes notify.
     """
-    # Only notify on upvotes
     if vote_value != 1:
-        return None
-
-    # Get voter
-    result = await db.execute(
-        select(Resident).where(Resident.id == voter_id)
-    )
-    voter = result.scalar_one_or_none()
-    if not voter:
-        return None
-
-    recipient_id: Optional[UUID] = None
-    link: Optional[str] = None
-    title: str = ""
-    notification_type: str = ""
-
-    if target_type == "post":
-        # Get post author
-        result = await db.execute(
-            select(Post).where(Post.id == target_id)
-        )
-        post = result.scalar_one_or_none()
-        if not post:
-            return None
-
-        # Don't notify yourself
-        if post.author_id == voter_id:
-            return None
-
-        recipient_id = post.author_id
-        link = f"/m/{post.submolt}/posts/{post.id}"
-        title = f"{voter.name} upvoted your post"
-        notification_type = "vote_post"
-
-    elif target_type == "comment":
-        # Get comment author
-        result = await db.execute(
-            select(Comment).options(selectinload(Comment.post)).where(Comment.id == target_id)
-        )
-        comment = result.scalar_one_or_none()
-        if not comment:
-            return None
-
-        # Don't notify yourself
-        if comment.author_id == voter_id:
-            return None
-
-        recipient_id = comment.author_id
-        link = f"/m/{comment.post.submolt}/posts/{comment.post_id}#comment-{comment.id}"
-        title = f"{voter.name} upvoted your comment"
-        notification_type = "vote_comment"
-
-    if not recipient_id:
-        return None
-
-    return await create_notification(
-        db=db,
-        recipient_id=recipient_id,
-        type=notification_type,
-        title=title,
-        actor_id=voter_id,
-        target_type=target_type,
-        target_id=target_id,
-        link=link,
+        return
+    notification_dispatch.note(
+        db, "vote", actor_id=voter_id, target_type=target_type, target_id=target_id,
     )
 
 
@@ -314,77 +275,13 @@ async def notify_on_comment(
     commenter_id: UUID,
     post_id: UUID,
     parent_comment_id: Optional[UUID] = None,
-) -> Optional[Notification]:
+) -> None:
     """
-    Create a notification when someone comments on a post or replies to a comment.
+    Notify the post author of a comment, or the parent comment's author of
+    a reply (after commit, via notification_dispatch).
     """
-    # Get commenter
-    result = await db.execute(
-        select(Resident).where(Resident.id == commenter_id)
-    )
-    commenter = result.scalar_one_or_none()
-    if not commenter:
-        return None
-
-    # Get post
-    result = await db.execute(
-        select(Post).where(Post.id == post_id)
-    )
-    post = result.scalar_one_or_none()
-    if not post:
-        return None
-
-    recipient_id: Optional[UUID] = None
-    title: str = ""
-    notification_type: str = ""
-    target_type: str = ""
-    target_id: UUID = post_id
-
-    if parent_comment_id:
-        # This is a reply to a comment
-        result = await db.execute(
-            select(Comment).where(Comment.id == parent_comment_id)
-        )
-        parent_comment = result.scalar_one_or_none()
-        if not parent_comment:
-            return None
-
-        # Don't notify yourself
-        if parent_comment.author_id == commenter_id:
-            return None
-
-        recipient_id = parent_comment.author_id
-        title = f"{commenter.name} replied to your comment"
-        notification_type = "reply"
-        target_type = "comment"
-        target_id = parent_comment_id
-    else:
-        # This is a comment on the post
-        # Don't notify yourself
-        if post.author_id == commenter_id:
-            return None
-
-        recipient_id = post.author_id
-        title = f"{commenter.name} commented on your post"
-        notification_type = "comment"
-        target_type = "post"
-
-    if not recipient_id:
-        return None
-
-    link = f"/m/{post.submolt}/posts/{post_id}"
-    if parent_comment_id:
-        link += f"#comment-{parent_comment_id}"
-
-    return await create_notification(
-        db=db,
-        recipient_id=recipient_id,
-        type=notification_type,
-        title=title,
-        actor_id=commenter_id,
-        target_type=target_type,
-        target_id=target_id,
-        link=link,
+    notification_dispatch.note(
+        db, "comment", actor_id=commenter_id, post_id=post_id, parent_id=parent_comment_id,
     )
 
 
@@ -505,47 +402,15 @@ async def notify_on_mentions(
     target_type: str,
     target_id: UUID,
     post: Post,
-) -> list[Notification]:
+) -> None:
     """
-    Parse @mentions from content and create notifications for each mentioned user.
+    Notify every resident @mentioned in content (after commit, via
+    notification_dispatch). Names are resolved in one query per batch, so
+    the write path does not grow with the number of mentions.
     """
-    mentions = extract_mentions(content)
-    if not mentions:
-        return []
-
-    # Get author name
-    result = await db.execute(
-        select(Resident).where(Resident.id == author_id)
+    if not extract_mentions(content):
+        return
+    notification_dispatch.note(
+        db, "mention", actor_id=author_id, content=content,
+        target_type=target_type, target_id=target_id, post_id=post.id,
     )
-    author = result.scalar_one_or_none()
-    if not author:
-        return []
-
-    notifications = []
-    for username in mentions:
-        # Look up mentioned user
-        result = await db.execute(
-            select(Resident).where(Resident.name == username)
-        )
-        mentioned = result.scalar_one_or_none()
-        if not mentioned or mentioned.id == author_id:
-            continue
-
-        link = f"/post/{post.id}"
-        if target_type == "comment":
-            link += f"#comment-{target_id}"
-
-        notification = await create_notification(
-            db=db,
-            recipient_id=mentioned.id,
-            type="mention",
-            title=f"{author.name} mentioned you",
-            message=content[:200] if len(content) > 200 else content,
-            actor_id=author_id,
-            target_type=target_type,
-            target_id=target_id,
-            link=link,
-        )
-        notifications.append(notification)
-
-    return notifications
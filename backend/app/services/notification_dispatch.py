@@ -0,0 +1,313 @@
+"""
+Notification dispatch - batched, set-based notification fan-out
+
+Write paths record notification intents on their session (note()) instead
+of creating rows inline: a mention, an upvote, a comment or reply, or a
+direct notification to a list of recipients. Once the session commits,
+the post-commit flush (services/post_commit) pushes the intents onto a
+Redis list (notif:intents) and, when the list was empty, wakes the
+dispatch task; the Celery beat sweep every DRAIN_INTERVAL seconds picks up
+anything else.
+
+drain() pops intents in batches (services/batch_drain) and resolves each
+batch with one query per kind of lookup — actors, mentioned names, posts,
+comments — however many intents or @mentions it holds, then inserts all of
+the batch's rows in a single statement. The rows go through
+notification_stream like any other new notification, so unread counts and
+sockets stay in step. An intent that can't be resolved (malformed JSON, a
+bad UUID, a missing field) is moved to a capped dead-letter list
+(notif:dead) and the rest of its batch goes ahead.
+
+Intents are only queued after a commit, so a rolled-back request notifies
+nobody. Enqueueing fails open: intents noted while Redis is down are lost.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.comment import Comment
+from app.models.notification import Notification
+from app.models.post import Post
+from app.models.resident import Resident
+from app.redis_client import get_redis
+from app.schemas.notification import NotificationActor, NotificationResponse
+from app.services import batch_drain, notification_stream, post_commit
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+DRAIN_INTERVAL = 10
+MAX_BATCHES = 20
+INSERT_CHUNK = 1000  # rows per INSERT; keeps under the bind-parameter limit
+DEAD_MAX = 10_000
+
+_QUEUE_KEY = "notif:intents"
+_DEAD_KEY = "notif:dead"
+
+
+def note(db: AsyncSession, kind: str, **fields) -> None:
+    """Record a notification intent, dispatched after this session commits.
+
+    kind is "mention", "vote", "comment" or "direct"; see _intent_rows()
+    for the fields each one takes. UUIDs may be passed as UUID or str.
+    """
+    intent = {"kind": kind, **{k: str(v) if isinstance(v, UUID) else v for k, v in fields.items()}}
+    post_commit.defer(db, "notification_dispatch", intent)
+
+
+@post_commit.handler("notification_dispatch")
+async def _enqueue(db: AsyncSession, intents: list) -> None:
+    try:
+        length = await get_redis().rpush(_QUEUE_KEY, *[json.dumps(i) for i in intents])
+    except Exception as e:
+        logger.warning(f"Notification dispatch: enqueue failed, {len(intents)} intents dropped: {e}")
+        return
+    if length == len(intents):
+        # The queue was empty: no drain is pending, start one now. delay()
+        # can block on broker retries, so it runs off the event loop.
+        try:
+            from app.tasks.notifications import dispatch_notifications_task
+            await asyncio.to_thread(dispatch_notifications_task.delay)
+        except Exception as e:
+            logger.debug(f"Notification dispatch: wake-up failed: {e}")
+
+
+async def queue_length() -> int:
+    try:
+        return await get_redis().llen(_QUEUE_KEY)
+    except Exception:
+        return 0
+
+
+# ── Resolution ────────────────────────────────────────────────────────────
+
+def _uuid(value) -> Optional[UUID]:
+    return UUID(value) if value else None
+
+
+def _post_link(submolt: str, post_id, comment_id=None) -> str:
+    link = f"/m/{submolt}/posts/{post_id}"
+    return f"{link}#comment-{comment_id}" if comment_id else link
+
+
+async def _rows(db: AsyncSession, intents: list) -> tuple[list[dict], dict, list]:
+    """Notification rows for a batch of intents, the actors they name, and
+    the intents that could not be resolved.
+
+    Lookups are set-based: one query each for actors, mentioned names,
+    posts and comments. Intents whose actor or target is gone, and
+    self-notifications, produce no row. A malformed intent (bad UUID,
+    missing field) is returned in the third list instead of failing the
+    batch; database errors propagate.
+    """
+    from app.services.notification import extract_mentions
+
+    failed = []
+    actor_ids, names, post_ids, comment_ids = set(), set(), set(), set()
+    for i in intents:
+        try:
+            if i.get("actor_id"):
+                actor_ids.add(UUID(i["actor_id"]))
+            kind = i["kind"]
+            if kind == "mention":
+                i["names"] = extract_mentions(i["content"])
+                names.update(i["names"])
+            elif kind == "vote":
+                (post_ids if i["target_type"] == "post" else comment_ids).add(UUID(i["target_id"]))
+            elif kind == "comment":
+                post_ids.add(UUID(i["post_id"]))
+                if i.get("parent_id"):
+                    comment_ids.add(UUID(i["parent_id"]))
+            elif kind != "direct":
+                raise ValueError(f"unknown kind {kind!r}")
+        except Exception as e:
+            failed.append((i, e))
+    bad = {id(i) for i, _ in failed}
+    intents = [i for i in intents if id(i) not in bad]
+
+    actors = {}
+    if actor_ids:
+        result = await db.execute(select(Resident).where(Resident.id.in_(actor_ids)))
+        actors = {r.id: r for r in result.scalars().all()}
+    by_name = {}
+    if names:
+        result = await db.execute(select(Resident.id, Resident.name).where(Resident.name.in_(names)))
+        by_name = {row.name: row.id for row in result.all()}
+    posts = {}
+    if post_ids:
+        result = await db.execute(
+            select(Post.id, Post.author_id, Post.submolt).where(Post.id.in_(post_ids))
+        )
+        posts = {row.id: row for row in result.all()}
+    comments = {}
+    if comment_ids:
+        result = await db.execute(
+            select(Comment.id, Comment.author_id, Comment.post_id, Post.submolt)
+            .join(Post, Post.id == Comment.post_id)
+            .where(Comment.id.in_(comment_ids))
+        )
+        comments = {row.id: row for row in result.all()}
+
+    rows = []
+    for i in intents:
+        try:
+            rows.extend(_intent_rows(i, actors, by_name, posts, comments))
+        except Exception as e:
+            failed.append((i, e))
+    return rows, actors, failed
+
+
+def _intent_rows(i: dict, actors: dict, by_name: dict, posts: dict, comments: dict) -> list[dict]:
+    """Rows for one intent, built all-or-nothing from the batch's lookups."""
+    rows = []
+
+    def add(recipient_id, type, title, actor_id=None, **extra):
+        if recipient_id is None or recipient_id == actor_id:
+            return
+        rows.append({
+            "recipient_id": recipient_id, "type": type, "title": title[:100],
+            "actor_id": actor_id, "message": extra.get("message"),
+            "target_type": extra.get("target_type"), "target_id": extra.get("target_id"),
+            "link": extra.get("link"),
+        })
+
+    kind = i["kind"]
+    actor_id = _uuid(i.get("actor_id"))
+    actor = actors.get(actor_id)
+    if kind == "direct":
+        for recipient_id in i["recipient_ids"]:
+            add(UUID(recipient_id), i["type"], i["title"], actor_id,
+                message=i.get("message"), target_type=i.get("target_type"),
+                target_id=_uuid(i.get("target_id")), link=i.get("link"))
+        return rows
+    if actor is None:
+        return rows
+    if kind == "mention":
+        target_id = UUID(i["target_id"])
+        link = f"/post/{i['post_id']}"
+        if i["target_type"] == "comment":
+            link += f"#comment-{target_id}"
+        content = i["content"]
+        for name in i["names"]:
+            add(by_name.get(name), "mention", f"{actor.name} mentioned you", actor_id,
+                message=content[:200], target_type=i["target_type"], target_id=target_id, link=link)
+    elif kind == "vote":
+        target_id = UUID(i["target_id"])
+        if i["target_type"] == "post":
+            post = posts.get(target_id)
+            if post:
+                add(post.author_id, "vote_post", f"{actor.name} upvoted your post", actor_id,
+                    target_type="post", target_id=target_id, link=_post_link(post.submolt, post.id))
+        else:
+            comment = comments.get(target_id)
+            if comment:
+                add(comment.author_id, "vote_comment", f"{actor.name} upvoted your comment", actor_id,
+                    target_type="comment", target_id=target_id,
+                    link=_post_link(comment.submolt, comment.post_id, comment.id))
+    elif kind == "comment":
+        post = posts.get(UUID(i["post_id"]))
+        if post is None:
+            return rows
+        parent_id = _uuid(i.get("parent_id"))
+        if parent_id:
+            parent = comments.get(parent_id)
+            if parent:
+                add(parent.author_id, "reply", f"{actor.name} replied to your comment", actor_id,
+                    target_type="comment", target_id=parent_id,
+                    link=_post_link(post.submolt, post.id, parent_id))
+        else:
+            add(post.author_id, "comment", f"{actor.name} commented on your post", actor_id,
+                target_type="post", target_id=post.id, link=_post_link(post.submolt, post.id))
+    return rows
+
+
+async def dispatch(db: AsyncSession, intents: list) -> tuple[int, list]:
+    """Resolve intents and insert their notifications. Caller commits.
+
+    Returns (rows inserted, [(intent, error), ...] for unresolvable intents).
+    """
+    rows, actors, failed = await _rows(db, intents)
+    if not rows:
+        return 0, failed
+    now = datetime.utcnow()
+    for row in rows:
+        row.update(id=uuid.uuid4(), is_read=False, created_at=now)
+    for start in range(0, len(rows), INSERT_CHUNK):
+        await db.execute(insert(Notification).values(rows[start:start + INSERT_CHUNK]))
+
+    actor_payloads = {
+        actor_id: NotificationActor.model_validate(actor) for actor_id, actor in actors.items()
+    }
+    for row in rows:
+        payload = NotificationResponse(
+            **{k: row[k] for k in ("id", "type", "title", "message", "link", "target_type",
+                                   "target_id", "is_read", "created_at")},
+            actor=actor_payloads.get(row["actor_id"]),
+        ).model_dump(mode="json")
+        notification_stream.note_created(db, row["recipient_id"], payload)
+    return len(rows), failed
+
+
+@post_commit.handler("notification_dead")
+async def _dead_letter(db: AsyncSession, entries: list) -> None:
+    """Park intents that can never be dispatched, newest first, capped.
+
+    Deferred to the batch's commit, so a batch that is rolled back and
+    requeued doesn't park its bad intents twice.
+    """
+    for raw, error in entries:
+        logger.warning(f"Notification dispatch: dead-lettered intent {raw!r}: {error}")
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.lpush(_DEAD_KEY, *[raw for raw, _ in entries])
+            pipe.ltrim(_DEAD_KEY, 0, DEAD_MAX - 1)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Notification dispatch: dead-letter write failed: {e}")
+
+
+async def _dispatch_batch(db: AsyncSession, raw: list) -> int:
+    intents, dead = [], []
+    for member in raw:
+        try:
+            intent = json.loads(member)
+            if not isinstance(intent, dict):
+                raise ValueError("not an object")
+            intents.append(intent)
+        except ValueError as e:
+            dead.append((member, e))
+    created, failed = await dispatch(db, intents)
+    dead.extend((json.dumps(intent), e) for intent, e in failed)
+    for entry in dead:
+        post_commit.defer(db, "notification_dead", entry)
+    return created
+
+
+async def drain(db: AsyncSession, batch_size: int = BATCH_SIZE, max_batches: int = MAX_BATCHES) -> dict:
+    """Dispatch queued intents batch by batch. Returns throughput stats.
+
+    Intents that can't be resolved go to the dead-letter list (notif:dead);
+    a batch that fails in the database is put back on the queue for the
+    next run.
+    """
+    redis = get_redis()
+
+    async def _requeue(raw: list) -> None:
+        await redis.rpush(_QUEUE_KEY, *raw)
+
+    return await batch_drain.drain(
+        db, "Notification dispatch",
+        pop=lambda n: redis.lpop(_QUEUE_KEY, n),
+        requeue=_requeue,
+        process=_dispatch_batch,
+        length=queue_length,
+        batch_size=batch_size,
+        max_batches=max_batches,
+    )
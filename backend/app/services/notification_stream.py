@@ -0,0 +1,215 @@
+"""
+Notification stream - cached per-resident counts and pushed notifications
+
+Counts live in a Redis hash, notif:count:{resident_id} {unread, total},
+loaded from SQL on a miss and kept for COUNT_TTL. Writes in
+services/notification record their effect on the session (note_*); once
+the transaction commits, the post-commit flush (services/post_commit)
+adjusts the hashes that are cached and publishes to notif:{resident_id}.
+A change that finds no hash leaves a short-lived fence instead, so a
+reader whose SQL count predates the change can't cache it; reads reload
+from SQL until the fence expires. Messages:
+
+  {"type": "notification", "notification": {...}, "unread": n}
+  {"type": "unread", "count": n}     after mark-read / mark-all / delete
+
+A rolled-back transaction publishes nothing. "unread" is omitted when the
+count is not cached. Each API process holds one pattern subscription
+(ws_manager.Gateway) and fans messages out to the resident's sockets.
+
+Redis errors fall back to SQL counts and skip the push; clients still
+see everything on their next list fetch.
+"""
+import asyncio
+import json
+import logging
+from uuid import UUID
+
+from fastapi import WebSocket
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.notification import Notification
+from app.redis_client import get_redis
+from app.services import post_commit
+from app.services.ws_manager import Gateway, _LAGGING
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "notif:"
+COUNT_TTL = 3600
+FENCE_TTL = 10  # longer than a count query takes between its SELECT and load
+
+# Fill the hash unless a concurrent load already did, or a change was
+# committed while the hash was missing (the fence): the caller's SQL count
+# may predate that change, so it is returned but not cached.
+# KEYS[1] = hash, KEYS[2] = fence; ARGV = unread, total, ttl
+_LOAD_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+  return {ARGV[1], ARGV[2]}
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  redis.call('HSET', KEYS[1], 'unread', ARGV[1], 'total', ARGV[2])
+  redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return redis.call('HMGET', KEYS[1], 'unread', 'total')
+"""
+
+# Adjust a cached hash; returns the new unread count, or nil when not cached.
+# A miss sets the fence for FENCE_TTL so in-flight loads don't cache over it.
+# Counts that go out of range are dropped so the next read reloads them.
+# KEYS[1] = hash, KEYS[2] = fence; ARGV = unread delta, total delta,
+# "1" to zero unread first, fence ttl
+_ADJUST_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  redis.call('SET', KEYS[2], 1, 'EX', ARGV[4])
+  return nil
+end
+if ARGV[3] == '1' then
+  redis.call('HSET', KEYS[1], 'unread', 0)
+end
+local unread = redis.call('HINCRBY', KEYS[1], 'unread', ARGV[1])
+local total = redis.call('HINCRBY', KEYS[1], 'total', ARGV[2])
+if unread < 0 or total < 0 or unread > total then
+  redis.call('DEL', KEYS[1])
+  redis.call('SET', KEYS[2], 1, 'EX', ARGV[4])
+  return nil
+end
+return unread
+"""
+
+gateway = Gateway(CHANNEL_PREFIX)
+
+
+def _count_key(resident_id) -> str:
+    return f"{CHANNEL_PREFIX}count:{resident_id}"
+
+
+def _fence_key(resident_id) -> str:
+    return f"{CHANNEL_PREFIX}count:{resident_id}:fence"
+
+
+def _channel(resident_id) -> str:
+    return f"{CHANNEL_PREFIX}{resident_id}"
+
+
+async def counts(db: AsyncSession, resident_id: UUID) -> tuple[int, int]:
+    """(unread, total) notifications for a resident."""
+    key = _count_key(resident_id)
+    try:
+        unread, total = await get_redis().hmget(key, "unread", "total")
+        if unread is not None and total is not None:
+            return int(unread), int(total)
+    except Exception as e:
+        logger.debug(f"Notification counts: read of {key} failed: {e}")
+
+    row = (await db.execute(
+        select(
+            func.count(Notification.id).filter(Notification.is_read == False),  # noqa: E712
+            func.count(Notification.id),
+        ).where(Notification.recipient_id == resident_id)
+    )).one()
+    unread, total = row[0] or 0, row[1] or 0
+    try:
+        cached = await get_redis().eval(
+            _LOAD_SCRIPT, 2, key, _fence_key(resident_id), unread, total, COUNT_TTL
+        )
+        unread, total = int(cached[0]), int(cached[1])
+    except Exception:
+        pass
+    return unread, total
+
+
+# ── Changes, applied after commit ─────────────────────────────────────────
+
+def _note(db: AsyncSession, change: tuple) -> None:
+    post_commit.defer(db, "notification_stream", change)
+
+
+def note_created(db: AsyncSession, recipient_id: UUID, payload: dict) -> None:
+    """A new unread notification; payload is its JSON-ready response."""
+    _note(db, (recipient_id, 1, 1, False, payload))
+
+
+def note_read(db: AsyncSession, recipient_id: UUID, count: int = 1) -> None:
+    _note(db, (recipient_id, -count, 0, False, None))
+
+
+def note_all_read(db: AsyncSession, recipient_id: UUID) -> None:
+    _note(db, (recipient_id, 0, 0, True, None))
+
+
+def note_deleted(db: AsyncSession, recipient_id: UUID, was_unread: bool) -> None:
+    _note(db, (recipient_id, -1 if was_unread else 0, -1, False, None))
+
+
+@post_commit.handler("notification_stream")
+async def _apply(db: AsyncSession, changes: list) -> None:
+    """Adjust cached counts, then publish; one pipelined round trip each."""
+    try:
+        redis = get_redis()
+        async with redis.pipeline(transaction=False) as pipe:
+            for recipient_id, d_unread, d_total, zero, _ in changes:
+                pipe.eval(_ADJUST_SCRIPT, 2, _count_key(recipient_id), _fence_key(recipient_id),
+                          d_unread, d_total, "1" if zero else "0", FENCE_TTL)
+            results = await pipe.execute()
+
+        unread: dict = {}
+        messages: dict = {}
+        for (recipient_id, _, _, _, payload), count in zip(changes, results):
+            unread[recipient_id] = count
+            if payload is not None:
+                messages.setdefault(recipient_id, []).append({
+                    "type": "notification", "notification": payload,
+                    **({"unread": count} if count is not None else {}),
+                })
+
+        async with redis.pipeline(transaction=False) as pipe:
+            for recipient_id, count in unread.items():
+                if recipient_id in messages:
+                    for message in messages[recipient_id]:
+                        pipe.publish(_channel(recipient_id), json.dumps(message, default=str))
+                elif count is not None:
+                    pipe.publish(_channel(recipient_id), json.dumps({"type": "unread", "count": count}))
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Notification stream: apply failed: {e}")
+
+
+# ── Sockets ───────────────────────────────────────────────────────────────
+
+async def subscribe(resident_id: UUID, websocket: WebSocket, unread: int) -> None:
+    """Serve a resident's notification socket until it disconnects.
+
+    Starts with the current unread count, so the client needs no poll.
+    """
+    key = str(resident_id)
+    queue = gateway.register(key)
+
+    async def _forward():
+        while True:
+            data = await queue.get()
+            if data is _LAGGING:
+                await websocket.close(code=1013)
+                return
+            await websocket.send_text(data)
+
+    async def _read_client():
+        while True:
+            if await websocket.receive_text() == "ping":
+                await websocket.send_text('{"type":"pong"}')
+
+    tasks = []
+    try:
+        await websocket.send_text(json.dumps({"type": "unread", "count": unread}))
+        tasks = [asyncio.create_task(_forward()), asyncio.create_task(_read_client())]
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        gateway.unregister(key, queue)
+
+
+async def shutdown() -> None:
+    await gateway.close()
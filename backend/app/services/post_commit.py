@@ -0,0 +1,72 @@
+"""
+Post-commit side effects - cache, queue and push work that must only run
+once a transaction has committed.
+
+Write paths record items on their session with defer(db, key, item); the
+module that owns key registers an async handler(db, items) with
+@handler(key). Session events only move items, never do I/O:
+after_commit marks the session's deferred items as committed and
+after_rollback drops them. The items are handed to their handlers by
+flush(), which database.AppSession.commit() awaits right after every
+commit, so handlers run on the event loop with the async Redis client and
+no committing session can skip them.
+
+Handlers run in registration order, each under its own try/except: a
+failed side effect is logged and never fails the commit.
+"""
+import logging
+from typing import Awaitable, Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "post_commit_pending"
+_COMMITTED_KEY = "post_commit_committed"
+
+_handlers: dict[str, Callable[..., Awaitable[None]]] = {}
+
+
+def handler(key: str):
+    """Register the async handler(db, items) for items deferred under key."""
+    def register(fn):
+        _handlers[key] = fn
+        return fn
+    return register
+
+
+def defer(db, key: str, item) -> None:
+    """Record an item for key's handler, run after this session commits."""
+    db.info.setdefault(_PENDING_KEY, {}).setdefault(key, []).append(item)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        committed = session.info.setdefault(_COMMITTED_KEY, {})
+        for key, items in pending.items():
+            committed.setdefault(key, []).extend(items)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+async def flush(db) -> None:
+    """Run the handlers for everything committed on this session so far."""
+    committed = db.info.pop(_COMMITTED_KEY, None)
+    if not committed:
+        return
+    for key, fn in list(_handlers.items()):
+        items = committed.pop(key, None)
+        if not items:
+            continue
+        try:
+            await fn(db, items)
+        except Exception as e:
+            logger.warning(f"Post-commit {key}: {len(items)} items failed: {e}")
+    for key, items in committed.items():
+        logger.warning(f"Post-commit {key}: no handler, {len(items)} items dropped")
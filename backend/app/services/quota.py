@@ -0,0 +1,115 @@
+"""
+Quota Service - O(1) rate and quota checks backed by Redis counters
+
+Counters live under quota:{kind}:{subject}:{bucket}; the bucket is the UTC
+day for daily limits or a caller-chosen scope such as a game round. On a
+miss the count is loaded once from SQL (the source of truth) and cached;
+write paths then bump it with record() after their commit. record() only
+increments a counter that is already cached; on a miss it sets a short
+fence instead, so a load whose SQL count predates the write isn't cached
+(reads use SQL until the fence expires) and can't undercount the day.
+
+Cooldowns are SET NX EX keys: taking one is a single atomic call.
+
+Redis errors fall back to the SQL loaders, so limits are still enforced
+(at the old cost) while Redis is down.
+"""
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+from app.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+DAY_TTL = 26 * 3600
+
+FENCE_TTL = 10  # longer than a count query takes between its SELECT and load
+
+# Increment only if cached; on a miss, fence the counter so loads that
+# started before this write don't cache a count without it.
+# KEYS[1] = counter, KEYS[2] = fence; ARGV = amount, fence ttl
+_RECORD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+redis.call('SET', KEYS[2], 1, 'EX', ARGV[2])
+return nil
+"""
+
+# Cache a loaded count unless fenced or already cached; returns the count
+# to use. KEYS[1] = counter, KEYS[2] = fence; ARGV = loaded count, ttl
+_LOAD_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+  return tonumber(ARGV[1])
+end
+redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2])
+return tonumber(redis.call('GET', KEYS[1]))
+"""
+
+
+def day_bucket(now: Optional[datetime] = None) -> str:
+    return (now or datetime.utcnow()).strftime("%Y%m%d")
+
+
+def _key(kind: str, subject, bucket: str) -> str:
+    return f"quota:{kind}:{subject}:{bucket}"
+
+
+async def count(
+    kind: str,
+    subject,
+    load: Callable[[], Awaitable[int]],
+    bucket: Optional[str] = None,
+    ttl: int = DAY_TTL,
+) -> int:
+    """Current count for (kind, subject, bucket); load() gives the SQL count on a miss.
+
+    bucket defaults to today (UTC).
+    """
+    key = _key(kind, subject, bucket or day_bucket())
+    try:
+        cached = await get_redis().get(key)
+        if cached is not None:
+            return int(cached)
+    except Exception as e:
+        logger.debug(f"Quota: read of {key} failed: {e}")
+        return await load()
+
+    value = await load()
+    try:
+        value = int(await get_redis().eval(_LOAD_SCRIPT, 2, key, f"{key}:fence", value, ttl))
+    except Exception:
+        pass
+    return value
+
+
+async def record(kind: str, subject, bucket: Optional[str] = None, amount: int = 1) -> None:
+    """Count a committed write against (kind, subject, bucket)."""
+    key = _key(kind, subject, bucket or day_bucket())
+    try:
+        await get_redis().eval(_RECORD_SCRIPT, 2, key, f"{key}:fence", amount, FENCE_TTL)
+    except Exception as e:
+        logger.debug(f"Quota: increment of {key} failed: {e}")
+
+
+async def take_cooldown(
+    kind: str,
+    subject,
+    seconds: float,
+    load_last: Optional[Callable[[], Awaitable[Optional[datetime]]]] = None,
+) -> bool:
+    """Start a cooldown for (kind, subject). False if one is still running.
+
+    Without Redis, load_last() (time of the subject's last action) decides;
+    with no loader the check fails open.
+    """
+    key = f"quota:{kind}:{subject}:cooldown"
+    try:
+        return bool(await get_redis().set(key, 1, nx=True, px=max(1, int(seconds * 1000))))
+    except Exception as e:
+        logger.debug(f"Quota: cooldown {key} failed: {e}")
+    if load_last is None:
+        return True
+    last = await load_last()
+    return last is None or (datetime.utcnow() - last).total_seconds() >= seconds
@@ -3,9 +3,14 @@ Semantic Search Service - Embeddings and vector search for GENESIS
 """
 import hashlib
 import logging
+import math
+import time
+from datetime import datetime
+from functools import lru_cache, partial
 from typing import Optional
 from uuid import UUID
-from sqlalchemy import select, func, or_, text
+from sqlalchemy import select, func, or_, text, case, desc, literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -18,12 +23,29 @@ from app.models.search import (
     ResidentEmbedding,
     VECTOR_AVAILABLE,
 )
+from app.services import vector_index
 
 logger = logging.getLogger(__name__)
 
 # Embedding model configuration
 EMBEDDING_DIM = 384
 MODEL_NAME = "all-MiniLM-L6-v2"
+FALLBACK_MODEL_NAME = "hashed-v2"
+ANN_MAX_RESULTS = 1000
+
+# Text search (posts/comments/residents.search_vector, migration 029).
+# The 'simple' parser doesn't split CJK text into words, so every search
+# also matches substrings through the trigram indexes (migrations 029, 030).
+TS_CONFIG = "simple"
+TITLE_SUBSTRING_RANK = 0.5
+TEXT_SUBSTRING_RANK = 0.25
+HYBRID_CANDIDATES = 100
+RRF_K = 60
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # Try to load sentence-transformers
 _embedding_model = None
@@ -35,9 +57,9 @@ try:
     _embedding_available = True
     logger.info(f"Loaded embedding model: {MODEL_NAME}")
 except ImportError:
-    logger.warning("sentence-transformers not available, using fallback TF-IDF")
+    logger.warning("sentence-transformers not available, using hashed-feature fallback")
 except Exception as e:
-    logger.warning(f"Failed to load embedding model: {e}, using fallback TF-IDF")
+    logger.warning(f"Failed to load embedding model: {e}, using hashed-feature fallback")
 
 
 def _compute_text_hash(text: str) -> str:
@@ -48,7 +70,7 @@ def _compute_text_hash(text: str) -> str:
 def generate_embedding(text: str) -> list[float]:
     """
     Generate a 384-dimensional embedding for the given text.
-    Uses sentence-transformers if available, otherwise falls back to simple TF-IDF.
+    Uses sentence-transformers if available, otherwise falls back to hashed features.
     """
     if not text or not text.strip():
         return [0.0] * EMBEDDING_DIM
@@ -61,52 +83,94 @@ def generate_embedding(text: str) -> list[float]:
             return embedding.tolist()
         except Exception as e:
             logger.error(f"Embedding generation failed: {e}")
-            return _fallback_tfidf_embedding(text)
+            return _fallback_embedding(text)
     else:
-        return _fallback_tfidf_embedding(text)
+        return _fallback_embedding(text)
 
 
-def _fallback_tfidf_embedding(text: str) -> list[float]:
+def generate_embeddings(texts: list[str], batch_size: int = 64) -> list[list[float]]:
     """
-    Simple TF-IDF-like embedding as fallback.
-    Uses character n-grams and word hashing to create a fixed-size vector.
+    Embed many texts with one model call. Same output as calling
+    generate_embedding() on each text.
     """
-    import math
+    results: list[Optional[list[float]]] = [None] * len(texts)
+    pending = []
+    for i, content in enumerate(texts):
+        if not content or not content.strip():
+            results[i] = [0.0] * EMBEDDING_DIM
+        else:
+            pending.append((i, content.strip()[:10000]))
+
+    if pending and _embedding_available and _embedding_model is not None:
+        try:
+            vectors = _embedding_model.encode(
+                [t for _, t in pending], batch_size=batch_size, convert_to_numpy=True,
+            )
+            for (i, _), vector in zip(pending, vectors):
+                results[i] = vector.tolist()
+            pending = []
+        except Exception as e:
+            logger.error(f"Batch embedding generation failed: {e}")
 
-    # Normalize text
-    text = text.lower()
-    words = text.split()
+    for i, content in pending:
+        results[i] = _fallback_embedding(content)
+    return results
+
+
+@lru_cache(maxsize=65536)
+def _feature_hash(feature: str) -> int:
+    """Stable 64-bit hash (builtin hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
 
-    # Create embedding using word hashing
-    embedding = [0.0] * EMBEDDING_DIM
 
-    # Word-level features
-    for word in words:
-        # Hash word to bucket
-        bucket = hash(word) % EMBEDDING_DIM
-        embedding[bucket] += 1.0
+def _hashed_features(text: str) -> tuple[list[int], list[float]]:
+    """Bucket indices and signed weights for words (1.0) and character trigrams (0.5)."""
+    buckets: list[int] = []
+    weights: list[float] = []
+    for word in text.lower().split():
+        features = [(word, 1.0)] + [(word[i:i + 3], 0.5) for i in range(len(word) - 2)]
+        for feature, weight in features:
+            h = _feature_hash(feature)
+            buckets.append(h % EMBEDDING_DIM)
+            # Sign bit keeps colliding features from always adding up
+            weights.append(weight if h >> 63 else -weight)
+    return buckets, weights
 
-        # Also add character n-grams for partial matching
-        for i in range(len(word) - 2):
-            trigram = word[i:i+3]
-            bucket = hash(trigram) % EMBEDDING_DIM
-            embedding[bucket] += 0.5
 
-    # Normalize to unit vector
+def _fallback_embedding(text: str) -> list[float]:
+    """
+    Deterministic hashed-feature embedding used when no model is loaded.
+    Identical across processes and restarts, so stored vectors stay comparable.
+    """
+    buckets, weights = _hashed_features(text)
+    if np is not None:
+        vector = np.bincount(buckets, weights=weights, minlength=EMBEDDING_DIM) if buckets \
+            else np.zeros(EMBEDDING_DIM)
+        magnitude = np.linalg.norm(vector)
+        if magnitude > 0:
+            vector = vector / magnitude
+        return vector.tolist()
+
+    embedding = [0.0] * EMBEDDING_DIM
+    for bucket, weight in zip(buckets, weights):
+        embedding[bucket] += weight
     magnitude = math.sqrt(sum(x * x for x in embedding))
     if magnitude > 0:
         embedding = [x / magnitude for x in embedding]
-
     return embedding
 
 
 def cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
     """Compute cosine similarity between two vectors"""
-    import math
-
     if len(vec1) != len(vec2):
         return 0.0
 
+    if np is not None:
+        a = np.asarray(vec1, dtype=np.float64)
+        b = np.asarray(vec2, dtype=np.float64)
+        mag = np.linalg.norm(a) * np.linalg.norm(b)
+        return float(a @ b / mag) if mag else 0.0
+
     dot_product = sum(a * b for a, b in zip(vec1, vec2))
     mag1 = math.sqrt(sum(a * a for a in vec1))
     mag2 = math.sqrt(sum(b * b for b in vec2))
@@ -117,58 +181,98 @@ def cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
     return dot_product / (mag1 * mag2)
 
 
-async def index_post(db: AsyncSession, post_id: UUID) -> Optional[PostEmbedding]:
+def embedding_model_name() -> str:
+    """Name stored with embeddings; vectors from different models don't mix."""
+    return MODEL_NAME if _embedding_available else FALLBACK_MODEL_NAME
+
+
+def _post_text(title: str, content: Optional[str]) -> str:
+    return f"{title} {content or ''}"
+
+
+async def _upsert_embeddings(
+    db: AsyncSession,
+    model,
+    key_column: str,
+    items: list[tuple[UUID, str]],
+) -> int:
     """
-    Create or update embedding for a post.
-    Returns the embedding record or None if post not found.
+    Embed and upsert (target_id, text) pairs in one batch.
+    Texts whose hash and model match the stored row are skipped.
+    Returns the number of rows written. The caller commits.
     """
-    # Get the post
-    result = await db.execute(
-        select(Post).where(Post.id == post_id)
+    if not items:
+        return 0
+    key = getattr(model, key_column)
+    model_name = embedding_model_name()
+    stored = {row[0]: (row[1], row[2]) for row in (await db.execute(
+        select(key, model.text_hash, model.model_name)
+        .where(key.in_([target_id for target_id, _ in items]))
+    )).all()}
+
+    changed = []
+    for target_id, text_to_embed in items:
+        text_hash = _compute_text_hash(text_to_embed)
+        if stored.get(target_id) != (text_hash, model_name):
+            changed.append((target_id, text_to_embed, text_hash))
+    if not changed:
+        return 0
+
+    vectors = generate_embeddings([t for _, t, _ in changed])
+    now = datetime.utcnow()
+    rows = []
+    for (target_id, _, text_hash), vector in zip(changed, vectors):
+        row = {key_column: target_id, "text_hash": text_hash, "model_name": model_name,
+               "created_at": now, "updated_at": now}
+        if VECTOR_AVAILABLE:
+            row["embedding"] = vector
+        rows.append(row)
+
+    stmt = pg_insert(model).values(rows)
+    update_columns = ["text_hash", "model_name", "updated_at"]
+    if VECTOR_AVAILABLE:
+        update_columns.append("embedding")
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[key_column],
+        set_={col: stmt.excluded[col] for col in update_columns},
     )
-    post = result.scalar_one_or_none()
-
-    if not post:
-        return None
+    await db.execute(stmt)
+    return len(rows)
 
-    # Combine title and content for embedding
-    text_to_embed = f"{post.title} {post.content or ''}"
-    text_hash = _compute_text_hash(text_to_embed)
 
-    # Check for existing embedding
+async def index_posts(db: AsyncSession, post_ids: list[UUID]) -> int:
+    """Embed a batch of posts. Returns rows written; the caller commits."""
+    if not post_ids:
+        return 0
     result = await db.execute(
-        select(PostEmbedding).where(PostEmbedding.post_id == post_id)
+        select(Post.id, Post.title, Post.content).where(Post.id.in_(post_ids))
     )
-    existing = result.scalar_one_or_none()
+    items = [(row.id, _post_text(row.title, row.content)) for row in result.all()]
+    return await _upsert_embeddings(db, PostEmbedding, "post_id", items)
 
-    if existing and existing.text_hash == text_hash:
-        # No change needed
-        return existing
 
-    # Generate embedding
-    embedding_vector = generate_embedding(text_to_embed)
+async def index_comments(db: AsyncSession, comment_ids: list[UUID]) -> int:
+    """Embed a batch of comments. Returns rows written; the caller commits."""
+    if not comment_ids:
+        return 0
+    result = await db.execute(
+        select(Comment.id, Comment.content).where(Comment.id.in_(comment_ids))
+    )
+    items = [(row.id, row.content or "") for row in result.all()]
+    return await _upsert_embeddings(db, CommentEmbedding, "comment_id", items)
 
-    if existing:
-        # Update existing
-        if VECTOR_AVAILABLE:
-            existing.embedding = embedding_vector
-        existing.text_hash = text_hash
-        existing.model_name = MODEL_NAME if _embedding_available else "tfidf_fallback"
-    else:
-        # Create new
-        embedding_data = {
-            "post_id": post_id,
-            "text_hash": text_hash,
-            "model_name": MODEL_NAME if _embedding_available else "tfidf_fallback",
-        }
-        if VECTOR_AVAILABLE:
-            embedding_data["embedding"] = embedding_vector
-        existing = PostEmbedding(**embedding_data)
-        db.add(existing)
 
+async def index_post(db: AsyncSession, post_id: UUID) -> Optional[PostEmbedding]:
+    """
+    Create or update embedding for a post.
+    Returns the embedding record or None if post not found.
+    """
+    await index_posts(db, [post_id])
     await db.commit()
-    await db.refresh(existing)
-    return existing
+    result = await db.execute(
+        select(PostEmbedding).where(PostEmbedding.post_id == post_id)
+    )
+    return result.scalar_one_or_none()
 
 
 async def index_comment(db: AsyncSession, comment_id: UUID) -> Optional[CommentEmbedding]:
@@ -176,48 +280,22 @@ async def index_comment(db: AsyncSession, comment_id: UUID) -> Optional[CommentE
     Create or update embedding for a comment.
     Returns the embedding record or None if comment not found.
     """
-    # Get the comment
-    result = await db.execute(
-        select(Comment).where(Comment.id == comment_id)
-    )
-    comment = result.scalar_one_or_none()
-
-    if not comment:
-        return None
-
-    text_hash = _compute_text_hash(comment.content)
-
-    # Check for existing embedding
+    await index_comments(db, [comment_id])
+    await db.commit()
     result = await db.execute(
         select(CommentEmbedding).where(CommentEmbedding.comment_id == comment_id)
     )
-    existing = result.scalar_one_or_none()
+    return result.scalar_one_or_none()
 
-    if existing and existing.text_hash == text_hash:
-        return existing
 
-    # Generate embedding
-    embedding_vector = generate_embedding(comment.content)
-
-    if existing:
-        if VECTOR_AVAILABLE:
-            existing.embedding = embedding_vector
-        existing.text_hash = text_hash
-        existing.model_name = MODEL_NAME if _embedding_available else "tfidf_fallback"
-    else:
-        embedding_data = {
-            "comment_id": comment_id,
-            "text_hash": text_hash,
-            "model_name": MODEL_NAME if _embedding_available else "tfidf_fallback",
-        }
-        if VECTOR_AVAILABLE:
-            embedding_data["embedding"] = embedding_vector
-        existing = CommentEmbedding(**embedding_data)
-        db.add(existing)
-
-    await db.commit()
-    await db.refresh(existing)
-    return existing
+def _semantic_post_search():
+    """The vector search backend for posts, or None if there is none."""
+    if VECTOR_AVAILABLE and _embedding_available:
+        return _search_posts_vector
+    index = vector_index.get_index("posts", embedding_model_name())
+    if index is not None:
+        return partial(_search_posts_ann, index=index)
+    return None
 
 
 async def search_posts(
@@ -226,16 +304,51 @@ async def search_posts(
     limit: int = 20,
     submolt_filter: Optional[str] = None,
     offset: int = 0,
+    mode: str = "hybrid",
 ) -> tuple[list[tuple[Post, float]], int]:
     """
-    Semantic search for posts.
-    Returns list of (post, relevance_score) tuples and total count.
-    Falls back to ILIKE text search if pgvector is not available.
+    Search posts. Returns list of (post, relevance_score) tuples and total count.
+
+    mode: "lexical" (full-text), "semantic" (pgvector, or the in-process
+    vector index without pgvector) or "hybrid" (both, fused by rank).
+    Without a vector backend every mode is lexical.
     """
-    if VECTOR_AVAILABLE and _embedding_available:
-        return await _search_posts_vector(db, query, limit, submolt_filter, offset)
-    else:
+    semantic = None if mode == "lexical" else _semantic_post_search()
+    if semantic is None:
         return await _search_posts_text(db, query, limit, submolt_filter, offset)
+    if mode == "semantic":
+        return await semantic(db, query, limit, submolt_filter, offset)
+    return await _search_posts_hybrid(db, query, limit, submolt_filter, offset, semantic)
+
+
+async def _search_posts_hybrid(
+    db: AsyncSession,
+    query: str,
+    limit: int,
+    submolt_filter: Optional[str],
+    offset: int,
+    semantic,
+) -> tuple[list[tuple[Post, float]], int]:
+    """
+    Blend lexical and vector results with reciprocal rank fusion: each
+    list contributes 1 / (RRF_K + rank). Scores are scaled so a post ranked
+    first by both gets 1.0.
+    """
+    candidates = min(max(offset + limit, HYBRID_CANDIDATES), ANN_MAX_RESULTS)
+    lexical, lexical_total = await _search_posts_text(db, query, candidates, submolt_filter, 0)
+    vector, _ = await semantic(db, query, candidates, submolt_filter, 0)
+
+    fused: dict[UUID, float] = {}
+    posts: dict[UUID, Post] = {}
+    for results in (lexical, vector):
+        for rank, (post, _) in enumerate(results):
+            fused[post.id] = fused.get(post.id, 0.0) + 1.0 / (RRF_K + rank + 1)
+            posts[post.id] = post
+
+    scale = 2.0 / (RRF_K + 1)
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    results = [(posts[post_id], score / scale) for post_id, score in ranked]
+    return results[offset:offset + limit], max(lexical_total, len(results))
 
 
 async def _search_posts_vector(
@@ -284,109 +397,148 @@ async def _search_posts_vector(
     return [(row.Post, row.similarity) for row in rows], total
 
 
-async def _search_posts_text(
+async def _load_ranked_posts(
+    db: AsyncSession,
+    hits: list[tuple[UUID, float]],
+    submolt_filter: Optional[str] = None,
+) -> list[tuple[Post, float]]:
+    """Posts for (id, score) hits, in hit order. Deleted posts are dropped."""
+    if not hits:
+        return []
+    query = select(Post).options(selectinload(Post.author)).where(Post.id.in_([i for i, _ in hits]))
+    if submolt_filter:
+        query = query.where(Post.submolt == submolt_filter)
+    posts = {p.id: p for p in (await db.execute(query)).scalars().all()}
+    return [(posts[i], score) for i, score in hits if i in posts]
+
+
+async def _search_posts_ann(
     db: AsyncSession,
     query: str,
     limit: int,
     submolt_filter: Optional[str],
     offset: int,
+    index,
 ) -> tuple[list[tuple[Post, float]], int]:
-    """Fallback text-based search using ILIKE"""
-    search_pattern = f"%{query}%"
+    """Approximate search over the in-process vector index.
 
-    base_query = (
-        select(Post)
-        .options(selectinload(Post.author))
-        .where(
-            or_(
-                Post.title.ilike(search_pattern),
-                Post.content.ilike(search_pattern),
-            )
-        )
-    )
+    Total is the number of matches found within ANN_MAX_RESULTS.
+    """
+    k = ANN_MAX_RESULTS if submolt_filter else min(offset + limit, ANN_MAX_RESULTS)
+    hits = [h for h in index.search(generate_embedding(query), k) if h[1] > 0]
+    results = await _load_ranked_posts(db, hits, submolt_filter)
+    total = len(results) if submolt_filter or len(hits) < k else ANN_MAX_RESULTS
+    return results[offset:offset + limit], total
 
-    if submolt_filter:
-        base_query = base_query.where(Post.submolt == submolt_filter)
 
-    # Count total
-    count_query = select(func.count()).select_from(Post).where(
-        or_(
-            Post.title.ilike(search_pattern),
-            Post.content.ilike(search_pattern),
-        )
-    )
-    if submolt_filter:
-        count_query = count_query.where(Post.submolt == submolt_filter)
+def _ts_query(query: str):
+    """websearch_to_tsquery: plain words AND-ed, "quoted phrases", or, -exclusions."""
+    return func.websearch_to_tsquery(literal_column(f"'{TS_CONFIG}'::regconfig"), query)
 
-    count_result = await db.execute(count_query)
-    total = count_result.scalar() or 0
 
-    # Order by recency and score
-    base_query = base_query.order_by(
-        (Post.upvotes - Post.downvotes).desc(),
-        Post.created_at.desc()
-    )
-    base_query = base_query.offset(offset).limit(limit)
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
 
-    result = await db.execute(base_query)
-    posts = result.scalars().all()
 
-    # Calculate simple relevance score based on query match
-    results = []
-    query_lower = query.lower()
-    for post in posts:
-        score = 0.0
-        if query_lower in (post.title or "").lower():
-            score += 0.6
-        if query_lower in (post.content or "").lower():
-            score += 0.4
-        results.append((post, score))
+def _substring_match(query: str, *weighted_columns):
+    """(match, rank) for a case-insensitive substring search of query in
+    each (column, rank) pair, through the columns' trigram indexes.
 
-    return results, total
+    Any length matches, so two-character words (人狼) are found too;
+    below three characters pg_trgm can't narrow the index scan and it reads
+    every entry. Phrase quotes are stripped.
+    """
+    pattern = _like_pattern(query.strip().strip('"'))
+    matches = [(column.ilike(pattern), weight) for column, weight in weighted_columns]
+    rank = func.greatest(*[case((m, weight), else_=0.0) for m, weight in matches], 0.0)
+    return or_(*[m for m, _ in matches]), rank
+
+
+def _ts_rank(vector, tsquery):
+    # Normalization 32 maps rank to rank / (rank + 1), i.e. into [0, 1)
+    return func.ts_rank_cd(vector, tsquery, 32)
+
+
+async def _ranked_matches(db: AsyncSession, stmt, offset: int, limit: int, count_query):
+    """Run a ranked search selecting (entity, rank, total) and return
+    ([(entity, rank)], total). total comes from count(*) OVER (), so there
+    is no separate count unless the page is past the end."""
+    rows = (await db.execute(stmt.offset(offset).limit(limit))).all()
+    if rows:
+        total = rows[0].total
+    elif offset:
+        total = (await db.execute(count_query)).scalar() or 0
+    else:
+        total = 0
+    return [(row[0], float(row.rank)) for row in rows], total
 
 
-async def search_comments(
+async def _search_posts_text(
     db: AsyncSession,
     query: str,
-    limit: int = 20,
-    offset: int = 0,
-) -> tuple[list[tuple[Comment, float]], int]:
+    limit: int,
+    submolt_filter: Optional[str],
+    offset: int,
+) -> tuple[list[tuple[Post, float]], int]:
     """
-    Search for comments.
-    Falls back to ILIKE text search if pgvector is not available.
+    Full-text search on posts.search_vector (GIN), ranked by ts_rank_cd
+    with title matches weighted above content, plus title and content
+    substring matches through the trigram indexes, which cover text the
+    'simple' parser doesn't split into words (Japanese).
     """
-    search_pattern = f"%{query}%"
-
-    base_query = (
-        select(Comment)
-        .options(selectinload(Comment.author), selectinload(Comment.post))
-        .where(Comment.content.ilike(search_pattern))
+    tsquery = _ts_query(query)
+    in_text, substring_rank = _substring_match(
+        query, (Post.title, TITLE_SUBSTRING_RANK), (Post.content, TEXT_SUBSTRING_RANK),
     )
+    match = or_(Post.search_vector.op("@@")(tsquery), in_text)
+    rank = func.greatest(_ts_rank(Post.search_vector, tsquery), substring_rank)
 
-    # Count total
-    count_query = select(func.count()).select_from(Comment).where(
-        Comment.content.ilike(search_pattern)
-    )
-    count_result = await db.execute(count_query)
-    total = count_result.scalar() or 0
+    conditions = [match]
+    if submolt_filter:
+        conditions.append(Post.submolt == submolt_filter)
 
-    base_query = base_query.order_by(
-        (Comment.upvotes - Comment.downvotes).desc(),
-        Comment.created_at.desc()
+    stmt = (
+        select(Post, rank.label("rank"), func.count().over().label("total"))
+        .options(selectinload(Post.author))
+        .where(*conditions)
+        .order_by(
+            desc("rank"),
+            (Post.upvotes - Post.downvotes).desc(),
+            Post.created_at.desc(),
+        )
     )
-    base_query = base_query.offset(offset).limit(limit)
+    count_query = select(func.count()).select_from(Post).where(*conditions)
+    return await _ranked_matches(db, stmt, offset, limit, count_query)
 
-    result = await db.execute(base_query)
-    comments = result.scalars().all()
 
-    # Calculate simple relevance score
-    results = []
-    query_lower = query.lower()
-    for comment in comments:
-        score = 0.8 if query_lower in (comment.content or "").lower() else 0.5
-        results.append((comment, score))
+async def search_comments(
+    db: AsyncSession,
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+) -> tuple[list[tuple[Comment, float]], int]:
+    """
+    Full-text search on comments.search_vector (GIN), ranked by ts_rank_cd,
+    plus content substring matches through the trigram index.
+    """
+    tsquery = _ts_query(query)
+    in_text, substring_rank = _substring_match(query, (Comment.content, TEXT_SUBSTRING_RANK))
+    match = or_(Comment.search_vector.op("@@")(tsquery), in_text)
+    rank = func.greatest(_ts_rank(Comment.search_vector, tsquery), substring_rank)
 
-    return results, total
+    stmt = (
+        select(Comment, rank.label("rank"), func.count().over().label("total"))
+        .options(selectinload(Comment.author), selectinload(Comment.post))
+        .where(match)
+        .order_by(
+            desc("rank"),
+            (Comment.upvotes - Comment.downvotes).desc(),
+            Comment.created_at.desc(),
+        )
+    )
+    count_query = select(func.count()).select_from(Comment).where(match)
+    return await _ranked_matches(db, stmt, offset, limit, count_query)
 
 
 async def search_residents(
@@ -397,52 +549,35 @@ async def search_residents(
 ) -> tuple[list[tuple[Resident, float]], int]:
     """
     Search residents by name and description.
-    Uses ILIKE text search.
+    Full-text match on residents.search_vector, substring matches on name
+    and description and fuzzy (pg_trgm similarity) matches on the name,
+    through their trigram indexes.
     """
-    search_pattern = f"%{query}%"
-
-    base_query = (
-        select(Resident)
-        .where(
-            or_(
-                Resident.name.ilike(search_pattern),
-                Resident.description.ilike(search_pattern),
-            )
-        )
+    tsquery = _ts_query(query)
+    in_text, substring_rank = _substring_match(query, (Resident.description, TEXT_SUBSTRING_RANK))
+    match = or_(
+        Resident.search_vector.op("@@")(tsquery),
+        Resident.name.ilike(_like_pattern(query)),
+        Resident.name.op("%")(query),
+        in_text,
     )
-
-    # Count total
-    count_query = select(func.count()).select_from(Resident).where(
-        or_(
-            Resident.name.ilike(search_pattern),
-            Resident.description.ilike(search_pattern),
-        )
+    rank = func.greatest(
+        _ts_rank(Resident.search_vector, tsquery),
+        func.similarity(Resident.name, query),
+        substring_rank,
     )
-    count_result = await db.execute(count_query)
-    total = count_result.scalar() or 0
 
-    # Order by karma and god status
-    base_query = base_query.order_by(
-        Resident.is_current_god.desc(),
-        Resident.karma.desc()
+    stmt = (
+        select(Resident, rank.label("rank"), func.count().over().label("total"))
+        .where(match)
+        .order_by(
+            desc("rank"),
+            Resident.is_current_god.desc(),
+            Resident.karma.desc(),
+        )
     )
-    base_query = base_query.offset(offset).limit(limit)
-
-    result = await db.execute(base_query)
-    residents = result.scalars().all()
-
-    # Calculate relevance score
-    results = []
-    query_lower = query.lower()
-    for resident in residents:
-        score = 0.0
-        if query_lower in (resident.name or "").lower():
-            score += 0.7
-        if query_lower in (resident.description or "").lower():
-            score += 0.3
-        results.append((resident, score))
-
-    return results, total
+    count_query = select(func.count()).select_from(Resident).where(match)
+    return await _ranked_matches(db, stmt, offset, limit, count_query)
 
 
 async def get_similar_posts(
@@ -465,8 +600,10 @@ async def get_similar_posts(
 
     if VECTOR_AVAILABLE and _embedding_available:
         return await _get_similar_posts_vector(db, source_post, limit)
-    else:
-        return await _get_similar_posts_fallback(db, source_post, limit)
+    index = vector_index.get_index("posts", embedding_model_name())
+    if index is not None:
+        return await _get_similar_posts_ann(db, index, source_post, limit)
+    return await _get_similar_posts_fallback(db, source_post, limit)
 
 
 async def _get_similar_posts_vector(
@@ -507,6 +644,20 @@ async def _get_similar_posts_vector(
     return [(row.Post, row.similarity) for row in rows]
 
 
+async def _get_similar_posts_ann(
+    db: AsyncSession,
+    index,
+    source_post: Post,
+    limit: int,
+) -> list[tuple[Post, float]]:
+    """Similar posts from the in-process vector index"""
+    query_embedding = index.vector_for(source_post.id)
+    if query_embedding is None:
+        query_embedding = generate_embedding(_post_text(source_post.title, source_post.content))
+    hits = [h for h in index.search(query_embedding, limit + 1) if h[0] != source_post.id]
+    return (await _load_ranked_posts(db, hits))[:limit]
+
+
 async def _get_similar_posts_fallback(
     db: AsyncSession,
     source_post: Post,
@@ -550,28 +701,43 @@ async def _get_similar_posts_fallback(
     return results[:limit]
 
 
-async def reindex_all_posts(db: AsyncSession, batch_size: int = 100) -> int:
+async def reindex_all(db: AsyncSession, kind: str = "post", batch_size: int = 256) -> int:
     """
-    Reindex all posts. Useful for initial setup or model changes.
-    Returns number of posts indexed.
+    Re-embed every post or comment, walking ids with keyset pagination and
+    committing once per batch. Unchanged texts are skipped by hash.
+    Returns number of rows examined.
     """
+    model, index_batch = (Post, index_posts) if kind == "post" else (Comment, index_comments)
     count = 0
-    offset = 0
+    written = 0
+    last_id = None
+    started = time.monotonic()
 
     while True:
-        result = await db.execute(
-            select(Post.id).offset(offset).limit(batch_size)
-        )
-        post_ids = [row[0] for row in result.all()]
-
-        if not post_ids:
+        query = select(model.id).order_by(model.id).limit(batch_size)
+        if last_id is not None:
+            query = query.where(model.id > last_id)
+        ids = list((await db.execute(query)).scalars().all())
+        if not ids:
             break
 
-        for post_id in post_ids:
-            await index_post(db, post_id)
-            count += 1
+        written += await index_batch(db, ids)
+        await db.commit()
+        count += len(ids)
+        last_id = ids[-1]
 
-        offset += batch_size
-        logger.info(f"Indexed {count} posts...")
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Reindexed {count} {kind}s ({written} embedded), "
+            f"{count / elapsed if elapsed else 0.0:.1f} items/sec"
+        )
 
     return count
+
+
+async def reindex_all_posts(db: AsyncSession, batch_size: int = 256) -> int:
+    """
+    Reindex all posts. Useful for initial setup or model changes.
+    Returns number of posts indexed.
+    """
+    return await reindex_all(db, "post", batch_size)
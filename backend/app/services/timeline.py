@@ -0,0 +1,323 @@
+"""
+Home timelines: posts from followed residents, fan-out on write.
+
+Each reader's timeline is a Redis sorted set — timeline:{resident_id} —
+of up to TIMELINE_MAX post ids scored by created_at, plus a meta hash
+(timeline:{resident_id}:meta) that marks it as built and records:
+- big: followed authors with more than timeline_fanout_max_followers
+  followers. Their posts are never pushed and are merged in at read time
+  with one indexed query.
+- full: the set hit TIMELINE_MAX, so pages past its tail come from Postgres.
+
+A timeline is built from Postgres on first read and expires after
+TIMELINE_TTL, which also picks up authors crossing the big threshold.
+New posts are pushed only into timelines that are already built. Follow
+and unfollow backfill or remove the author's posts in place.
+
+Every function fails open: get_timeline() returns None and the caller
+falls back to the Postgres query in services/follow.
+"""
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import and_, desc, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.follow import Follow
+from app.models.post import Post
+from app.models.resident import Resident
+from app.redis_client import get_redis
+from app.services import post_commit
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_MAX = 800
+TIMELINE_TTL = 3600
+_COUNT_TTL = 300
+_FANOUT_CHUNK = 200
+_TIE_SLACK = 8
+_UNIX_EPOCH = datetime(1970, 1, 1)
+
+# KEYS = (timeline, meta) pairs; ARGV = cap, member, score.
+# Timelines share their meta's remaining TTL.
+_PUSH_SCRIPT = """
+local cap = tonumber(ARGV[1])
+for i = 1, #KEYS, 2 do
+  local ttl = redis.call('TTL', KEYS[i + 1])
+  if ttl > 0 then
+    redis.call('ZADD', KEYS[i], ARGV[3], ARGV[2])
+    redis.call('EXPIRE', KEYS[i], ttl)
+    if redis.call('ZCARD', KEYS[i]) > cap then
+      redis.call('ZREMRANGEBYRANK', KEYS[i], 0, -(cap + 1))
+      redis.call('HSET', KEYS[i + 1], 'full', 1)
+    end
+  end
+end
+return 1
+"""
+
+
+def _timeline_key(resident_id) -> str:
+    return f"timeline:{resident_id}"
+
+
+def _meta_key(resident_id) -> str:
+    return f"timeline:{resident_id}:meta"
+
+
+def _score(created_at: datetime) -> float:
+    return (created_at - _UNIX_EPOCH).total_seconds()
+
+
+def encode_cursor(created_at: datetime, post_id) -> str:
+    raw = json.dumps([created_at.isoformat(), str(post_id)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """(created_at, post_id) of the last post on the previous page. Raises ValueError."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, post_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(post_id)
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+
+
+def _followed_authors(resident_id, big: bool):
+    threshold = get_settings().timeline_fanout_max_followers
+    query = (
+        select(Follow.following_id)
+        .join(Resident, Resident.id == Follow.following_id)
+        .where(Follow.follower_id == resident_id)
+    )
+    if big:
+        return query.where(Resident.follower_count > threshold)
+    return query.where(Resident.follower_count <= threshold)
+
+
+async def rebuild_timeline(db: AsyncSession, resident_id) -> tuple[list[str], bool]:
+    """Load a reader's timeline from Postgres. Returns (big author ids, full)."""
+    rows = (await db.execute(
+        select(Post.id, Post.created_at)
+        .where(Post.author_id.in_(_followed_authors(resident_id, big=False)))
+        .order_by(desc(Post.created_at), desc(Post.id))
+        .limit(TIMELINE_MAX)
+    )).all()
+    big = [str(a) for a in (await db.execute(_followed_authors(resident_id, big=True))).scalars()]
+    full = len(rows) >= TIMELINE_MAX
+
+    key, meta_key = _timeline_key(resident_id), _meta_key(resident_id)
+    async with get_redis().pipeline(transaction=True) as pipe:
+        pipe.delete(key, meta_key)
+        if rows:
+            pipe.zadd(key, {str(post_id): _score(created_at) for post_id, created_at in rows})
+            pipe.expire(key, TIMELINE_TTL)
+        pipe.hset(meta_key, mapping={"big": json.dumps(big), "full": int(full)})
+        pipe.expire(meta_key, TIMELINE_TTL)
+        await pipe.execute()
+    return big, full
+
+
+async def _load_meta(db: AsyncSession, resident_id) -> tuple[list[str], bool]:
+    meta = await get_redis().hgetall(_meta_key(resident_id))
+    if not meta:
+        return await rebuild_timeline(db, resident_id)
+    return json.loads(meta[b"big"]), meta.get(b"full") == b"1"
+
+
+async def get_timeline(
+    db: AsyncSession,
+    resident_id,
+    limit: int,
+    cursor: Optional[tuple[datetime, UUID]] = None,
+) -> Optional[tuple[list[UUID], bool]]:
+    """(post ids newest first, has_more) for one page, or None to fall back to Postgres.
+
+    Pushed entries come from the reader's sorted set; posts by big authors
+    are read from Postgres and merged in by (created_at, id).
+    """
+    try:
+        big, full = await _load_meta(db, resident_id)
+        redis = get_redis()
+        key = _timeline_key(resident_id)
+        if cursor is None:
+            rows = await redis.zrevrange(key, 0, limit, withscores=True)
+            requested = limit + 1
+        else:
+            requested = limit + 1 + _TIE_SLACK
+            rows = await redis.zrevrangebyscore(
+                key, _score(cursor[0]), "-inf", start=0, num=requested, withscores=True,
+            )
+    except Exception as e:
+        logger.debug(f"Timeline: read for {resident_id} failed: {e}")
+        return None
+
+    entries = [(score, member.decode()) for member, score in rows]
+    if cursor is not None:
+        bound = (_score(cursor[0]), str(cursor[1]))
+        entries = [e for e in entries if e < bound]
+        if len(entries) < limit + 1 and len(rows) == requested:
+            return None  # too many ties at the cursor timestamp to page safely
+    if full and len(entries) < limit + 1:
+        return None  # page runs past the cached window
+
+    if big:
+        query = (
+            select(Post.created_at, Post.id)
+            .where(Post.author_id.in_([UUID(a) for a in big]))
+            .order_by(desc(Post.created_at), desc(Post.id))
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            query = query.where(tuple_(Post.created_at, Post.id) < tuple_(*cursor))
+        for created_at, post_id in (await db.execute(query)).all():
+            entries.append((_score(created_at), str(post_id)))
+
+    # An author may have crossed the threshold since the timeline was built
+    merged = sorted(set(entries), reverse=True)[:limit + 1]
+    return [UUID(post_id) for _, post_id in merged[:limit]], len(merged) > limit
+
+
+async def cached_feed_count(db: AsyncSession, resident_id) -> int:
+    """Posts by followed residents, cached in Redis for a few minutes."""
+    cache_key = f"timeline:{resident_id}:count"
+    try:
+        cached = await get_redis().get(cache_key)
+        if cached is not None:
+            return int(cached)
+    except Exception:
+        pass
+    following = select(Follow.following_id).where(Follow.follower_id == resident_id)
+    total = (await db.execute(
+        select(func.count(Post.id)).where(Post.author_id.in_(following))
+    )).scalar() or 0
+    try:
+        await get_redis().setex(cache_key, _COUNT_TTL, total)
+    except Exception:
+        pass
+    return total
+
+
+async def fan_out_post(db: AsyncSession, post_id, author_id, created_at: datetime) -> int:
+    """Push a new post into its author's followers' built timelines.
+
+    Skipped for big authors (read-time merge). Returns the number of
+    followers considered.
+    """
+    threshold = get_settings().timeline_fanout_max_followers
+    follower_count = (await db.execute(
+        select(Resident.follower_count).where(Resident.id == author_id)
+    )).scalar() or 0
+    if follower_count > threshold:
+        return 0
+    follower_ids = (await db.execute(
+        select(Follow.follower_id).where(Follow.following_id == author_id)
+    )).scalars().all()
+    try:
+        redis = get_redis()
+        for i in range(0, len(follower_ids), _FANOUT_CHUNK):
+            keys = []
+            for follower_id in follower_ids[i:i + _FANOUT_CHUNK]:
+                keys += [_timeline_key(follower_id), _meta_key(follower_id)]
+            await redis.eval(_PUSH_SCRIPT, len(keys), *keys, TIMELINE_MAX, str(post_id), repr(_score(created_at)))
+    except Exception as e:
+        logger.debug(f"Timeline: fan-out of {post_id} failed: {e}")
+    return len(follower_ids)
+
+
+async def on_follow(db: AsyncSession, follower_id, following_id) -> None:
+    """Backfill a newly followed author into the follower's built timeline."""
+    try:
+        redis = get_redis()
+        meta_key = _meta_key(follower_id)
+        meta = await redis.hgetall(meta_key)
+        if not meta:
+            return
+        count = (await db.execute(
+            select(Resident.follower_count).where(Resident.id == following_id)
+        )).scalar() or 0
+        if count > get_settings().timeline_fanout_max_followers:
+            big = set(json.loads(meta[b"big"])) | {str(following_id)}
+            await redis.hset(meta_key, "big", json.dumps(sorted(big)))
+            return
+        rows = (await db.execute(
+            select(Post.id, Post.created_at)
+            .where(Post.author_id == following_id)
+            .order_by(desc(Post.created_at), desc(Post.id))
+            .limit(TIMELINE_MAX)
+        )).all()
+        if not rows:
+            return
+        key = _timeline_key(follower_id)
+        await redis.zadd(key, {str(post_id): _score(created_at) for post_id, created_at in rows})
+        if await redis.zcard(key) > TIMELINE_MAX:
+            await redis.zremrangebyrank(key, 0, -(TIMELINE_MAX + 1))
+            await redis.hset(meta_key, "full", 1)
+        await redis.expire(key, TIMELINE_TTL)
+    except Exception as e:
+        logger.debug(f"Timeline: follow backfill failed, dropping timeline: {e}")
+        await invalidate(follower_id)
+
+
+async def on_unfollow(db: AsyncSession, follower_id, following_id) -> None:
+    """Remove an unfollowed author's posts from the follower's built timeline."""
+    try:
+        redis = get_redis()
+        meta_key = _meta_key(follower_id)
+        meta = await redis.hgetall(meta_key)
+        if not meta:
+            return
+        big = set(json.loads(meta[b"big"]))
+        if str(following_id) in big:
+            big.discard(str(following_id))
+            await redis.hset(meta_key, "big", json.dumps(sorted(big)))
+            return
+        key = _timeline_key(follower_id)
+        oldest = await redis.zrange(key, 0, 0, withscores=True)
+        if not oldest:
+            return
+        since = datetime.utcfromtimestamp(oldest[0][1] - 1)
+        post_ids = (await db.execute(
+            select(Post.id).where(and_(Post.author_id == following_id, Post.created_at >= since))
+        )).scalars().all()
+        if post_ids:
+            await redis.zrem(key, *[str(p) for p in post_ids])
+    except Exception as e:
+        logger.debug(f"Timeline: unfollow cleanup failed, dropping timeline: {e}")
+        await invalidate(follower_id)
+
+
+async def invalidate(resident_id) -> None:
+    """Drop a reader's timeline; it is rebuilt from Postgres on next read."""
+    try:
+        await get_redis().delete(_timeline_key(resident_id), _meta_key(resident_id))
+    except Exception:
+        pass
+
+
+def note_post(db: AsyncSession, post: Post) -> None:
+    """Queue fan-out of a post created in this session until after commit."""
+    post_commit.defer(db, "timeline", ("post", post))
+
+
+def note_follow(db: AsyncSession, follower_id, following_id, followed: bool) -> None:
+    """Queue a follow (followed=True) or unfollow until after commit."""
+    post_commit.defer(db, "timeline", ("follow" if followed else "unfollow", (follower_id, following_id)))
+
+
+@post_commit.handler("timeline")
+async def _apply_pending(db: AsyncSession, pending: list) -> None:
+    """Apply queued fan-outs and follow changes."""
+    for kind, item in pending:
+        if kind == "post":
+            await fan_out_post(db, item.id, item.author_id, item.created_at)
+        elif kind == "follow":
+            await on_follow(db, *item)
+        else:
+            await on_unfollow(db, *item)
@@ -0,0 +1,398 @@
+"""
+In-process approximate nearest-neighbour index over post embeddings.
+
+Used by services/search when pgvector search is unavailable (no pgvector,
+or no sentence-transformers model, in which case vectors come from the
+hashed fallback embedder). Requires NumPy; without it, or before the first
+build, get_index() returns None and search keeps its text fallback.
+
+The index is an IVF (inverted file) layout: rows are clustered with
+spherical k-means and stored grouped by cluster, so a query scans only the
+nprobe clusters whose centroids are closest. Each build is written to its
+own directory under settings.vector_index_dir:
+
+- vectors.npy    float32 (n, dim) unit rows, grouped by cluster;
+                 memory-mapped read-only so workers share the page cache
+- ids.npy        uint8 (n, 16) UUID bytes, same order
+- centroids.npy  float32 (nlist, dim)
+- offsets.npy    int64 (nlist + 1); cluster i is rows offsets[i]:offsets[i + 1]
+- hashes.npy     uint8 (n, 32) SHA-256 of each row's text, same order
+- meta.json      model name, row count, build time
+
+and published by atomically replacing the {name}.current pointer file.
+Processes pick up a new build within RELOAD_INTERVAL seconds. Posts created
+after a build are searchable after the next one (Celery beat).
+
+A build only encodes posts whose text changed: a row whose text hash
+matches the current build, or its stored post_embeddings row (pgvector),
+reuses that vector. One build runs at a time (a Redis SET NX lock), and the
+pointer never moves to a build older than the one it names.
+"""
+import json
+import logging
+import os
+import secrets
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.redis_client import get_redis
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+BUILD_INTERVAL = 900
+RELOAD_INTERVAL = 30
+KMEANS_SAMPLE = 20_000
+KMEANS_ITERATIONS = 10
+_MAX_LISTS = 1024
+_CHUNK = 8192
+_KEEP_BUILDS = 2
+BUILD_LOCK_TTL = 3600  # the build task's time limit
+
+# Delete the lock only if this build still holds it
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_loaded: dict[str, tuple[str, "VectorIndex"]] = {}
+_checked_at: dict[str, float] = {}
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _root() -> Path:
+    return Path(get_settings().vector_index_dir)
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class VectorIndex:
+    """A loaded, read-only IVF index."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.meta = json.loads((path / "meta.json").read_text())
+        self.vectors = np.load(path / "vectors.npy", mmap_mode="r")
+        self.ids = np.load(path / "ids.npy")
+        self.centroids = np.load(path / "centroids.npy")
+        self.offsets = np.load(path / "offsets.npy")
+        hashes = path / "hashes.npy"
+        self.hashes = np.load(hashes) if hashes.exists() else None
+        self._rows: Optional[dict[bytes, int]] = None
+
+    @property
+    def model_name(self) -> str:
+        return self.meta["model_name"]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _row(self, item_id: UUID) -> Optional[int]:
+        if self._rows is None:
+            self._rows = {row.tobytes(): i for i, row in enumerate(self.ids)}
+        return self._rows.get(item_id.bytes)
+
+    def vector_for(self, item_id: UUID, text_hash: Optional[bytes] = None):
+        """Stored vector for an id, or None if it isn't indexed.
+
+        With text_hash given, only a vector built from that same text counts.
+        """
+        row = self._row(item_id)
+        if row is None:
+            return None
+        if text_hash is not None and (self.hashes is None or self.hashes[row].tobytes() != text_hash):
+            return None
+        return np.asarray(self.vectors[row])
+
+    def search(self, query, k: int, nprobe: Optional[int] = None) -> list[tuple[UUID, float]]:
+        """Top-k (id, cosine similarity) for a query vector, best first."""
+        if k <= 0 or not len(self):
+            return []
+        q = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm == 0:
+            return []
+        q = q / norm
+
+        nprobe = min(nprobe or get_settings().vector_index_nprobe, len(self.centroids))
+        probe = np.argpartition(-(self.centroids @ q), nprobe - 1)[:nprobe]
+        rows, scores = [], []
+        for cluster in probe:
+            start, end = int(self.offsets[cluster]), int(self.offsets[cluster + 1])
+            if start < end:
+                rows.append(np.arange(start, end))
+                scores.append(self.vectors[start:end] @ q)
+        if not rows:
+            return []
+        rows = np.concatenate(rows)
+        scores = np.concatenate(scores)
+
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(UUID(bytes=self.ids[rows[i]].tobytes()), float(scores[i])) for i in top]
+
+
+def get_index(name: str = "posts", model_name: Optional[str] = None) -> Optional[VectorIndex]:
+    """The current build of an index, or None if there is none usable.
+
+    With model_name given, a build made with a different embedding model
+    is ignored (its vectors aren't comparable to the query's).
+    """
+    if np is None:
+        return None
+    now = time.monotonic()
+    cached = _loaded.get(name)
+    if cached is None or now - _checked_at.get(name, 0.0) >= RELOAD_INTERVAL:
+        _checked_at[name] = now
+        try:
+            version = (_root() / f"{name}.current").read_text().strip()
+            if cached is None or cached[0] != version:
+                cached = (version, VectorIndex(_root() / version))
+                _loaded[name] = cached
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Vector index: failed to load {name}: {e}")
+            if cached is None:
+                return None
+    index = cached[1]
+    if model_name is not None and index.model_name != model_name:
+        return None
+    return index
+
+
+def _train_centroids(vectors, nlist: int):
+    """Spherical k-means on a sample of the rows."""
+    rng = np.random.default_rng(0)
+    n = len(vectors)
+    sample_rows = np.sort(rng.choice(n, size=min(n, KMEANS_SAMPLE), replace=False))
+    sample = np.asarray(vectors[sample_rows], dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+
+    for _ in range(KMEANS_ITERATIONS):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        counts = np.bincount(assign, minlength=nlist)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+        centroids = _normalize(sums).astype(np.float32)
+    return centroids
+
+
+def write_build(path: Path, raw, ids, count: int, model_name: str, hashes=None) -> int:
+    """Cluster the first count rows of raw (unit vectors) and write the
+    index files into path. hashes, if given, are the rows' text hashes.
+    Returns the number of IVF lists."""
+    dim = raw.shape[1]
+    nlist = max(1, min(_MAX_LISTS, int(np.sqrt(count)))) if count else 1
+    if count:
+        centroids = _train_centroids(raw[:count], nlist)
+        assign = np.concatenate([
+            np.argmax(np.asarray(raw[i:min(i + _CHUNK, count)]) @ centroids.T, axis=1)
+            for i in range(0, count, _CHUNK)
+        ])
+    else:
+        centroids = np.zeros((1, dim), dtype=np.float32)
+        assign = np.zeros(0, dtype=np.int64)
+
+    order = np.argsort(assign, kind="stable")
+    offsets = np.zeros(nlist + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(assign, minlength=nlist))
+    vectors_out = np.lib.format.open_memmap(path / "vectors.npy", mode="w+", dtype=np.float32, shape=(count, dim))
+    for i in range(0, count, _CHUNK):
+        chunk = order[i:i + _CHUNK]
+        vectors_out[i:i + len(chunk)] = raw[chunk]
+    vectors_out.flush()
+    del vectors_out
+
+    np.save(path / "ids.npy", ids[:count][order])
+    if hashes is not None:
+        np.save(path / "hashes.npy", hashes[:count][order])
+    np.save(path / "centroids.npy", centroids)
+    np.save(path / "offsets.npy", offsets)
+    (path / "meta.json").write_text(json.dumps({
+        "model_name": model_name,
+        "count": count,
+        "nlist": nlist,
+        "built_at": datetime.utcnow().isoformat(),
+    }))
+    return nlist
+
+
+def _previous_build(name: str, model_name: str) -> Optional[VectorIndex]:
+    """The build the pointer names, if its vectors can be reused."""
+    try:
+        version = (_root() / f"{name}.current").read_text().strip()
+        index = VectorIndex(_root() / version)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Vector index: previous {name} build unreadable, re-encoding: {e}")
+        return None
+    if index.model_name != model_name or index.hashes is None:
+        return None
+    return index
+
+
+def _publish(root: Path, name: str, version: str) -> bool:
+    """Point {name}.current at version unless it names a newer build."""
+    pointer = root / f"{name}.current"
+    try:
+        if pointer.read_text().strip() > version:
+            return False
+    except FileNotFoundError:
+        pass
+    tmp = root / f"{name}.current.tmp"
+    tmp.write_text(version)
+    os.replace(tmp, pointer)
+    return True
+
+
+async def build_index(db: AsyncSession, name: str = "posts", batch_size: int = 512) -> dict:
+    """Write a new index build over every post. Returns build stats.
+
+    Skipped (stats {"skipped": True}) while another build holds the lock.
+    """
+    if np is None:
+        raise RuntimeError("numpy is required for the vector index")
+
+    lock_key = f"vector_index:{name}:build"
+    token = secrets.token_hex(8)
+    try:
+        if not await get_redis().set(lock_key, token, nx=True, ex=BUILD_LOCK_TTL):
+            logger.info(f"Vector index: {name} build already running, skipped")
+            return {"skipped": True}
+    except Exception as e:
+        # Fail open: the pointer check still keeps the newest build
+        logger.debug(f"Vector index: build lock unavailable: {e}")
+        token = None
+    try:
+        return await _build(db, name, batch_size)
+    finally:
+        if token is not None:
+            try:
+                await get_redis().eval(_RELEASE_SCRIPT, 1, lock_key, token)
+            except Exception:
+                pass
+
+
+async def _build(db: AsyncSession, name: str, batch_size: int) -> dict:
+    from app.models.post import Post
+    from app.models.search import VECTOR_AVAILABLE, PostEmbedding
+    from app.services.search import (
+        EMBEDDING_DIM, _compute_text_hash, _post_text, embedding_model_name, generate_embeddings,
+    )
+
+    started = time.monotonic()
+    model_name = embedding_model_name()
+    previous = _previous_build(name, model_name)
+    root = _root()
+    root.mkdir(parents=True, exist_ok=True)
+    version = f"{name}-{datetime.utcnow():%Y%m%d%H%M%S%f}"
+    path = root / version
+    path.mkdir()
+
+    columns = [Post.id, Post.title, Post.content]
+    if VECTOR_AVAILABLE:
+        columns += [PostEmbedding.embedding, PostEmbedding.text_hash, PostEmbedding.model_name]
+
+    # Posts created during the build are left for the next one
+    n = (await db.execute(select(func.count(Post.id)))).scalar() or 0
+    raw = np.lib.format.open_memmap(path / "raw.npy", mode="w+", dtype=np.float32, shape=(max(n, 1), EMBEDDING_DIM))
+    ids = np.zeros((max(n, 1), 16), dtype=np.uint8)
+    hashes = np.zeros((max(n, 1), 32), dtype=np.uint8)
+    count = encoded = 0
+    encode_seconds = 0.0
+    last_id = None
+    while count < n:
+        query = select(*columns).order_by(Post.id).limit(min(batch_size, n - count))
+        if VECTOR_AVAILABLE:
+            query = query.outerjoin(PostEmbedding, PostEmbedding.post_id == Post.id)
+        if last_id is not None:
+            query = query.where(Post.id > last_id)
+        rows = (await db.execute(query)).all()
+        if not rows:
+            break
+
+        changed = []
+        for i, r in enumerate(rows):
+            text = _post_text(r.title, r.content)
+            text_hash = _compute_text_hash(text)
+            digest = bytes.fromhex(text_hash)
+            ids[count + i] = np.frombuffer(r.id.bytes, dtype=np.uint8)
+            hashes[count + i] = np.frombuffer(digest, dtype=np.uint8)
+            vector = previous.vector_for(r.id, digest) if previous is not None else None
+            if (vector is None and VECTOR_AVAILABLE and r.embedding is not None
+                    and (r.text_hash, r.model_name) == (text_hash, model_name)):
+                vector = _normalize(np.asarray([r.embedding], dtype=np.float32))[0]
+            if vector is None:
+                changed.append((i, text))
+            else:
+                raw[count + i] = vector
+        if changed:
+            encode_started = time.monotonic()
+            vectors = generate_embeddings([text for _, text in changed])
+            encode_seconds += time.monotonic() - encode_started
+            normalized = _normalize(np.asarray(vectors, dtype=np.float32))
+            for (i, _), vector in zip(changed, normalized):
+                raw[count + i] = vector
+            encoded += len(changed)
+        count += len(rows)
+        last_id = rows[-1].id
+
+    nlist = write_build(path, raw, ids, count, model_name, hashes=hashes)
+    del raw
+    os.remove(path / "raw.npy")
+
+    if not _publish(root, name, version):
+        logger.warning(f"Vector index: {version} is older than the current {name} build, discarded")
+        shutil.rmtree(path, ignore_errors=True)
+        return {"skipped": True}
+    _prune(root, name, version)
+
+    elapsed = time.monotonic() - started
+    stats = {
+        "count": count,
+        "encoded": encoded,
+        "reused": count - encoded,
+        "nlist": nlist,
+        "seconds": round(elapsed, 3),
+        "items_per_sec": round(encoded / encode_seconds, 1) if encoded and encode_seconds else 0.0,
+    }
+    logger.info(
+        f"Vector index: built {name} ({count} rows, {encoded} encoded, {nlist} lists) in {elapsed:.1f}s"
+    )
+    return stats
+
+
+def _prune(root: Path, name: str, current: str) -> None:
+    """Remove old builds, keeping the newest _KEEP_BUILDS."""
+    builds = sorted(p for p in root.glob(f"{name}-*") if p.is_dir() and p.name != current)
+    for old in builds[:max(0, len(builds) - (_KEEP_BUILDS - 1))]:
+        shutil.rmtree(old, ignore_errors=True)
@@ -0,0 +1,111 @@
+"""
+Vote Service - atomic vote recording and counter updates
+
+The vote row is written with a single upsert (or delete) that also reports
+the previous value, and the target's counters move by the resulting delta
+in one UPDATE ... RETURNING. Nothing is read and written back from Python,
+so concurrent voters can't lose updates. The target row is locked only for
+the rest of the (short) transaction.
+"""
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import and_, delete, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.comment import Comment
+from app.models.post import Post
+from app.models.vote import Vote
+from app.utils.karma import hot_score_sql
+
+
+class VoteResult(NamedTuple):
+    old_value: int
+    upvotes: int
+    downvotes: int
+
+
+async def _write_vote(
+    db: AsyncSession,
+    resident_id: UUID,
+    target_type: str,
+    target_id: UUID,
+    value: int,
+) -> int:
+    """Store the resident's vote (0 removes it) and return the previous value."""
+    if value == 0:
+        result = await db.execute(
+            delete(Vote)
+            .where(
+                and_(
+                    Vote.resident_id == resident_id,
+                    Vote.target_type == target_type,
+                    Vote.target_id == target_id,
+                )
+            )
+            .returning(Vote.value)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none() or 0
+
+    stmt = pg_insert(Vote).values(
+        resident_id=resident_id,
+        target_type=target_type,
+        target_id=target_id,
+        post_id=target_id if target_type == "post" else None,
+        comment_id=target_id if target_type == "comment" else None,
+        value=value,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_vote_unique",
+        set_={"value": stmt.excluded.value},
+        where=Vote.value != stmt.excluded.value,
+    ).returning(literal_column("xmax = 0"))
+    inserted = (await db.execute(stmt)).scalar_one_or_none()
+
+    if inserted is None:
+        return value  # same vote already recorded
+    # Values are only ever 1 / -1, so a changed vote flipped sign
+    return 0 if inserted else -value
+
+
+async def set_vote(
+    db: AsyncSession,
+    resident_id: UUID,
+    target_type: str,
+    target_id: UUID,
+    value: int,
+) -> VoteResult:
+    """
+    Record a vote (1, -1, or 0 to clear) on a post or comment and apply the
+    counter delta. Returns the previous value and the target's fresh counts.
+    The caller commits.
+    """
+    model = Post if target_type == "post" else Comment
+    old_value = await _write_vote(db, resident_id, target_type, target_id, value)
+
+    up_delta = (value == 1) - (old_value == 1)
+    down_delta = (value == -1) - (old_value == -1)
+    if not up_delta and not down_delta:
+        row = (await db.execute(
+            select(model.upvotes, model.downvotes).where(model.id == target_id)
+        )).one()
+        return VoteResult(old_value, row.upvotes, row.downvotes)
+
+    values = {
+        "upvotes": model.upvotes + up_delta,
+        "downvotes": model.downvotes + down_delta,
+    }
+    if model is Post:
+        values["hot_score"] = hot_score_sql(
+            Post.upvotes + up_delta, Post.downvotes + down_delta, Post.created_at
+        )
+    row = (await db.execute(
+        update(model)
+        .where(model.id == target_id)
+        .values(**values)
+        .returning(model.upvotes, model.downvotes)
+        .execution_options(synchronize_session=False)
+    )).one()
+    return VoteResult(old_value, row.upvotes, row.downvotes)
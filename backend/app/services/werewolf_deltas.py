@@ -0,0 +1,141 @@
+"""
+Phantom Night socket deltas
+
+Each builder reads the slice of game state that changed, once, and returns
+a JSON-ready dict; ws_manager.push() numbers it and broadcasts it, so
+connected clients apply it instead of refetching over REST:
+
+  chat     {"messages": [ChatMessageResponse]}  new public chat, merge by id
+  votes    {"votes": DayVotesResponse}          whole tally for the round
+  players  {"players": [PlayerInfo]}            roster, roles of the dead only
+  game     {"game": GameResponse}
+  phase    game + players + votes + new events and chat, after a transition
+
+Phantom chat has no delta: it is team-private, so it stays a refresh scope.
+The player and vote builders are shared with the REST endpoints, so a
+delta always has the shape of the matching snapshot.
+"""
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.resident import Resident
+from app.models.werewolf_game import WerewolfGame
+from app.schemas.werewolf import (
+    ChatMessageResponse, DayVotesResponse, EventResponse, GameResponse,
+    PlayerInfo, VoteDetail, VoteTallyEntry,
+)
+from app.services.werewolf_game import (
+    get_alive_players, get_all_players, get_chat_messages, get_game_events,
+    get_vote_tally, get_votes_for_round,
+)
+
+PHASE_EVENTS = 20
+
+
+def _dump(model) -> dict:
+    return model.model_dump(mode="json")
+
+
+async def player_infos(db: AsyncSession, game_id: UUID) -> list[PlayerInfo]:
+    """Every player; role and type are only revealed for eliminated ones."""
+    result = []
+    for p in await get_all_players(db, game_id):
+        info = PlayerInfo(
+            id=p.resident.id,
+            name=p.resident.name,
+            avatar_url=p.resident.avatar_url,
+            karma=p.resident.karma,
+            is_alive=p.is_alive,
+            eliminated_round=p.eliminated_round,
+            eliminated_by=p.eliminated_by,
+        )
+        if not p.is_alive:
+            info.revealed_role = p.role
+            info.revealed_type = p.resident._type
+        result.append(info)
+    return result
+
+
+async def day_votes(db: AsyncSession, game: WerewolfGame) -> DayVotesResponse:
+    """Tally and individual votes for the game's current round."""
+    round_num = game.current_round
+    tally = await get_vote_tally(db, game.id, round_num)
+    votes = await get_votes_for_round(db, game.id, round_num)
+    alive_players = await get_alive_players(db, game.id)
+
+    # Batch-load all resident names to avoid N+1 queries
+    all_ids = set()
+    for v in votes:
+        all_ids.add(v.voter_id)
+        all_ids.add(v.target_id)
+    name_map = {}
+    if all_ids:
+        name_res = await db.execute(
+            select(Resident.id, Resident.name).where(Resident.id.in_(all_ids))
+        )
+        name_map = {row.id: row.name for row in name_res.all()}
+
+    return DayVotesResponse(
+        round_number=round_num,
+        tally=[VoteTallyEntry(**t) for t in tally],
+        votes=[
+            VoteDetail(
+                voter_id=v.voter_id,
+                voter_name=name_map.get(v.voter_id, "unknown"),
+                target_id=v.target_id,
+                target_name=name_map.get(v.target_id, "unknown"),
+                reason=v.reason,
+            )
+            for v in votes
+        ],
+        total_voted=len(votes),
+        total_alive=len(alive_players),
+    )
+
+
+def chat_delta(messages) -> Optional[dict]:
+    """Delta for new public chat messages (None when there are none)."""
+    messages = [m for m in messages if m.message_type != "phantom_chat"]
+    if not messages:
+        return None
+    return {
+        "type": "chat",
+        "messages": [_dump(ChatMessageResponse.model_validate(m)) for m in messages],
+    }
+
+
+async def chat_since(db: AsyncSession, game_id: UUID, after: datetime) -> Optional[dict]:
+    """Delta for the public chat messages written after a point in time."""
+    return chat_delta(await get_chat_messages(db, game_id, limit=200, after=after))
+
+
+async def votes_delta(db: AsyncSession, game: WerewolfGame) -> dict:
+    return {"type": "votes", "votes": _dump(await day_votes(db, game))}
+
+
+async def game_delta(db: AsyncSession, game: WerewolfGame) -> dict:
+    await db.refresh(game, ["roles"])
+    return {"type": "game", "game": _dump(GameResponse.model_validate(game))}
+
+
+async def phase_delta(db: AsyncSession, game: WerewolfGame, started: datetime) -> dict:
+    """Everything a phase transition changes, as one delta.
+
+    started is when the transition began: the events and system chat
+    messages it wrote are the ones created after it.
+    """
+    await db.refresh(game, ["roles"])
+    events = [e for e in await get_game_events(db, game.id, PHASE_EVENTS) if e.created_at > started]
+    chat = chat_delta(await get_chat_messages(db, game.id, limit=200, after=started))
+    return {
+        "type": "phase",
+        "game": _dump(GameResponse.model_validate(game)),
+        "players": [_dump(p) for p in await player_infos(db, game.id)],
+        "votes": _dump(await day_votes(db, game)),
+        "events": [_dump(EventResponse.model_validate(e)) for e in events],
+        "messages": chat["messages"] if chat else [],
+    }
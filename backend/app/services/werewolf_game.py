@@ -1540,39 +1540,83 @@ async def cancel_game(db: AsyncSession, game_id: UUID) -> WerewolfGame:
 
 
 # ═══════════════════════════════════════════════════════════════════════════
-# PHASE CHECK (called by Celery every 60s)
+# PHASE TRANSITIONS (Celery ETA task at phase_ends_at + fallback sweep)
 # ═══════════════════════════════════════════════════════════════════════════
 
-async def check_phase_transition(db: AsyncSession) -> Optional[str]:
+async def try_lock_game(db: AsyncSession, game_id: UUID, scope: str) -> bool:
     """
-    Check ALL active games for phase expiration and transition if needed.
-    Returns summary of actions taken or None.
+    Try to take a transaction-scoped advisory lock on (scope, game).
+
+    Returns False immediately if another transaction holds it. The lock is
+    released when the caller's transaction commits or rolls back.
     """
-    games = await get_all_active_games(db)
-    if not games:
-        return None
+    result = await db.execute(
+        select(func.pg_try_advisory_xact_lock(func.hashtext(f"{scope}:{game_id}")))
+    )
+    return bool(result.scalar())
 
-    results = []
-    now = datetime.utcnow()
 
-    for game in games:
-        if not game.phase_ends_at or now < game.phase_ends_at:
-            continue
+async def get_due_game_ids(db: AsyncSession, due_before: datetime) -> list[UUID]:
+    """IDs of active games whose phase ended at or before due_before."""
+    result = await db.execute(
+        select(WerewolfGame.id).where(
+            and_(
+                WerewolfGame.status.in_(["day", "night"]),
+                WerewolfGame.phase_ends_at <= due_before,
+            )
+        )
+    )
+    return [gid for (gid,) in result.all()]
 
-        if game.current_phase == "day":
-            winner = await transition_to_night(db, game)
-            if winner:
-                results.append(f"game#{game.game_number}:ended:{winner}")
-            else:
-                results.append(f"game#{game.game_number}:night")
 
-        elif game.current_phase == "night":
-            winner = await transition_to_day(db, game)
-            if winner:
-                results.append(f"game#{game.game_number}:ended:{winner}")
-            else:
-                results.append(f"game#{game.game_number}:day")
+async def transition_game_phase(db: AsyncSession, game_id: UUID) -> Optional[str]:
+    """
+    Transition one game if its phase has expired.
+
+    Idempotent and lock-guarded: the game row is locked FOR UPDATE SKIP
+    LOCKED, so a concurrent transition of the same game is skipped, and a
+    game whose phase is not (or no longer) due is left alone. Safe to call
+    from a stale timer. Caller commits.
+    Returns a summary string, or None if nothing happened.
+    """
+    result = await db.execute(
+        select(WerewolfGame)
+        .where(
+            and_(
+                WerewolfGame.id == game_id,
+                WerewolfGame.status.in_(["day", "night"]),
+                WerewolfGame.phase_ends_at <= datetime.utcnow(),
+            )
+        )
+        .with_for_update(skip_locked=True)
+    )
+    game = result.scalar_one_or_none()
+    if game is None:
+        return None
+
+    if game.current_phase == "day":
+        winner = await transition_to_night(db, game)
+        next_phase = "night"
+    elif game.current_phase == "night":
+        winner = await transition_to_day(db, game)
+        next_phase = "day"
+    else:
+        return None
+    if winner:
+        return f"game#{game.game_number}:ended:{winner}"
+    return f"game#{game.game_number}:{next_phase}"
 
+
+async def check_phase_transition(db: AsyncSession) -> Optional[str]:
+    """
+    Check ALL active games for phase expiration and transition if needed.
+    Returns summary of actions taken or None.
+    """
+    results = []
+    for game_id in await get_due_game_ids(db, datetime.utcnow()):
+        summary = await transition_game_phase(db, game_id)
+        if summary:
+            results.append(summary)
     return ", ".join(results) if results else None
 
 
@@ -12,18 +12,22 @@ Skill Tiers (based on agent's skill_level trait):
 
 Thoughts are cached in WerewolfGameEvent so they persist across 60s Celery cycles.
 Only thinking steps (assess/analyze/strategize) are cached; action decisions are fresh.
+
+Off the critical path:
+- prethink() fills the thought cache when a phase starts, so the action
+  step inside an agent's timing window only pays for decide (+ check)
+- Reflection is queued as a Celery task instead of awaited after the decision
 """
 import json
 import logging
 import re
 from typing import Optional
 
-import httpx
 from sqlalchemy import select, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import get_settings
 from app.models.werewolf_game import WerewolfGameEvent, WerewolfGame, WerewolfRole
+from app.services import llm_client
 from app.services.werewolf_strategy import GameContext, EmotionalState
 
 logger = logging.getLogger(__name__)
@@ -88,40 +92,15 @@ async def _call_llm(
     system_prompt: str = "",
     temperature: float = 0.7,
     top_p: float = 0.9,
+    priority: int = llm_client.PRIORITY_GAME,
+    cache_site: Optional[str] = None,
 ) -> Optional[str]:
-    """Call Ollama with configurable temperature/top_p."""
-    s = get_settings()
-    ollama_host = s.OLLAMA_HOST or "https://ollama.genesis-pj.net"
-    model = s.OLLAMA_MODEL or "llama3.1:8b"
-    try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{ollama_host}/api/generate",
-                json={
-                    "model": model,
-                    "prompt": prompt,
-                    "system": system_prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature,
-                        "top_p": top_p,
-                        "repeat_penalty": 1.15,
-                    },
-                },
-            )
-            if response.status_code == 200:
-                text = response.json().get("response", "").strip()
-                for phrase in [
-                    "As an AI", "I'm an AI", "as a language model",
-                    "I don't have personal", "as an artificial",
-                ]:
-                    text = text.replace(phrase, "")
-                return text.strip()
-            else:
-                logger.warning(f"LLM Brain: Ollama {response.status_code}: {response.text[:200]}")
-    except Exception as e:
-        logger.error(f"LLM Brain: Ollama error: {e}")
-    return None
+    """Call Ollama with configurable temperature/top_p via the shared LLM client."""
+    return await llm_client.generate(
+        prompt, system_prompt,
+        temperature=temperature, top_p=top_p, repeat_penalty=1.15,
+        priority=priority, cache_site=cache_site,
+    )
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -165,6 +144,137 @@ async def save_thought(
     db.add(event)
 
 
+THINKING_STEPS = ('assess', 'analyze', 'strategize')
+
+
+async def run_thinking_steps(
+    db: AsyncSession,
+    agent,
+    game: WerewolfGame,
+    ctx: GameContext,
+    tier_config: dict,
+    cached: dict,
+    system_prompt: str = "",
+    priority: int = llm_client.PRIORITY_GAME,
+) -> int:
+    """Run the tier's thinking steps missing from cached, in order.
+
+    Each step builds on the previous ones, so steps for one agent stay
+    sequential; results are added to cached and persisted. Returns the
+    number of steps completed.
+    """
+    tier = get_skill_tier(tier_config.get('min_skill', 0.0))
+    done = 0
+    for step in [s for s in tier_config['steps'] if s in THINKING_STEPS]:
+        if step in cached:
+            continue
+        if step == 'assess':
+            prompt = build_assess_prompt(ctx, tier_config)
+        elif step == 'analyze':
+            prompt = build_analyze_prompt(ctx, tier_config, cached)
+        else:
+            prompt = build_strategize_prompt(ctx, tier_config, cached)
+
+        result = await _call_llm(
+            prompt, system_prompt, tier_config['temperature'], tier_config['top_p'],
+            priority=priority, cache_site="werewolf_think",
+        )
+        if result:
+            cached[step] = result
+            await save_thought(db, game, agent.id, step, result)
+            done += 1
+            logger.debug(f"LLM Brain [{tier}]: {agent.name} completed {step}")
+        else:
+            logger.warning(f"LLM Brain [{tier}]: {agent.name} {step} returned None")
+    return done
+
+
+async def prethink(
+    db: AsyncSession,
+    agent,
+    game: WerewolfGame,
+    role: WerewolfRole,
+    profile: dict,
+    ctx: GameContext = None,
+    system_prompt: str = "",
+) -> int:
+    """Compute this phase's thinking steps ahead of the agent's action window.
+
+    Caller commits. Returns the number of steps computed (0 if all cached).
+    """
+    tier_config = get_tier_config(profile.get('traits', {}).get('skill_level', 0.5))
+    if not any(s in THINKING_STEPS for s in tier_config['steps']):
+        return 0
+    cached = await get_cached_thoughts(db, game, agent.id)
+    if all(s in cached for s in tier_config['steps'] if s in THINKING_STEPS):
+        return 0
+    if ctx is None:
+        from app.services.werewolf_strategy import build_game_context
+        ctx = await build_game_context(db, agent, game, role, profile)
+    return await run_thinking_steps(
+        db, agent, game, ctx, tier_config, cached, system_prompt,
+        priority=llm_client.PRIORITY_GAME,
+    )
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REFLECTION QUEUE — fire-and-forget, never on the decision path
+# ═══════════════════════════════════════════════════════════════════════════
+
+def enqueue_reflection(
+    game: WerewolfGame,
+    agent_id,
+    decision: dict,
+    cached: dict,
+    action: str,
+    system_prompt: str,
+    temperature: float,
+    top_p: float,
+) -> None:
+    """Queue a reflection for the background worker. Never raises."""
+    try:
+        from app.tasks.werewolf import werewolf_reflect_task
+        werewolf_reflect_task.delay({
+            "game_id": str(game.id),
+            "round_number": game.current_round,
+            "phase": game.current_phase or "day",
+            "agent_id": str(agent_id),
+            "decision": {k: v for k, v in decision.items() if isinstance(v, (str, int, float, bool))},
+            "cached": {k: v for k, v in cached.items() if k in THINKING_STEPS},
+            "action": action,
+            "system_prompt": system_prompt,
+            "temperature": temperature,
+            "top_p": top_p,
+        })
+    except Exception as e:
+        logger.debug(f"LLM Brain: reflection enqueue failed: {e}")
+
+
+async def run_reflection(db: AsyncSession, job: dict) -> bool:
+    """Generate and store one queued reflection. Caller commits."""
+    import uuid as _uuid
+
+    prompt = build_reflect_prompt(job["decision"], job["cached"], job["action"])
+    text = await _call_llm(
+        prompt, job.get("system_prompt", ""),
+        min(job.get("temperature", 0.7) * 1.1, 1.0), job.get("top_p", 0.9),
+        priority=llm_client.PRIORITY_BACKGROUND,
+    )
+    if not text:
+        return False
+    # Stored against the round/phase the decision was made in, even if the
+    # game has moved on since
+    db.add(WerewolfGameEvent(
+        game_id=_uuid.UUID(job["game_id"]),
+        round_number=job["round_number"],
+        phase=job["phase"],
+        event_type="agent_thought_reflect",
+        message=text[:2000],
+        target_id=_uuid.UUID(job["agent_id"]),
+    ))
+    return True
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # GAME STATE FORMATTERS
 # ═══════════════════════════════════════════════════════════════════════════
@@ -799,27 +909,8 @@ async def think_and_act(
     # Load cached thoughts for this round/phase
     cached = await get_cached_thoughts(db, game, agent.id)
 
-    # ── Run thinking steps not yet cached ──
-    thinking_steps = [s for s in steps if s in ('assess', 'analyze', 'strategize')]
-    for step in thinking_steps:
-        if step in cached:
-            continue
-        if step == 'assess':
-            prompt = build_assess_prompt(ctx, tier_config)
-        elif step == 'analyze':
-            prompt = build_analyze_prompt(ctx, tier_config, cached)
-        elif step == 'strategize':
-            prompt = build_strategize_prompt(ctx, tier_config, cached)
-        else:
-            continue
-
-        result = await _call_llm(prompt, sys_prompt, temperature, top_p)
-        if result:
-            cached[step] = result
-            await save_thought(db, game, agent.id, step, result)
-            logger.debug(f"LLM Brain [{tier}]: {agent.name} completed {step}")
-        else:
-            logger.warning(f"LLM Brain [{tier}]: {agent.name} {step} returned None")
+    # ── Run thinking steps not yet cached (normally done by prethink) ──
+    await run_thinking_steps(db, agent, game, ctx, tier_config, cached, sys_prompt)
 
     # ── Build action prompt ──
     if action == "vote":
@@ -840,7 +931,15 @@ async def think_and_act(
         return None
 
     # ── Call LLM for decision ──
-    decision_text = await _call_llm(action_prompt, sys_prompt, temperature, top_p)
+    # Target decisions gate game progress; chat can wait behind them
+    decision_priority = (
+        llm_client.PRIORITY_CRITICAL
+        if action in ("vote", "night", "reconsider", "discuss_accused")
+        else llm_client.PRIORITY_GAME
+    )
+    decision_text = await _call_llm(
+        action_prompt, sys_prompt, temperature, top_p, priority=decision_priority
+    )
     if not decision_text:
         logger.warning(f"LLM Brain [{tier}]: {agent.name} action={action} LLM returned None")
         return None
@@ -891,7 +990,10 @@ async def think_and_act(
     # ── Consistency check (S tier) ──
     if 'check' in steps and action in ('vote', 'night'):
         check_prompt = build_consistency_check_prompt(decision, cached, action)
-        check_text = await _call_llm(check_prompt, sys_prompt, temperature, top_p)
+        check_text = await _call_llm(
+            check_prompt, sys_prompt, temperature, top_p,
+            priority=llm_client.PRIORITY_CRITICAL,
+        )
         if check_text and 'confirmed' not in check_text.lower():
             alt = parse_decision(check_text, valid_names, action)
             if alt and 'target' in alt:
@@ -905,14 +1007,10 @@ async def think_and_act(
                     if alt.get('reason'):
                         decision['reason'] = alt['reason']
 
-    # ── Reflection (S + A tiers) ──
+    # ── Reflection (S + A tiers) — queued, not awaited ──
     if 'reflect' in steps:
-        reflect_prompt = build_reflect_prompt(decision, cached, action)
-        reflect_text = await _call_llm(
-            reflect_prompt, sys_prompt, min(temperature * 1.1, 1.0), top_p
+        enqueue_reflection(
+            game, agent.id, decision, cached, action, sys_prompt, temperature, top_p,
         )
-        if reflect_text:
-            await save_thought(db, game, agent.id, 'reflect', reflect_text)
-            logger.debug(f"LLM Brain [{tier}]: {agent.name} reflection saved")
 
     return decision
@@ -4,18 +4,24 @@ Phantom Night — Strategic AI Agent Brain
 Architecture:
 ─────────────
 1. GameContext dataclass — aggregates ALL available game data into one structure
-2. build_game_context() — single DB query function that populates GameContext
-3. 5 scoring functions — algorithmic target selection per role (zero extra LLM calls)
-4. 2 prompt builders — rich structured prompts for LLM text generation
+2. GameSnapshot — per-game public state shared by all AI players, advanced
+   incrementally from high-water marks once per tick
+3. build_game_context() — layers agent-specific data on the snapshot
+4. 5 scoring functions — algorithmic target selection per role (zero extra LLM calls)
+5. 2 prompt builders — rich structured prompts for LLM text generation
 
 Key principle: Scoring is ALGORITHMIC (fast, no LLM).
 LLM is only used for natural language generation (discussion comments, vote reasons).
 Zero additional LLM calls vs. current implementation.
 """
+import asyncio
 import logging
 import random
+import time
 import uuid
+from collections import Counter
 from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from typing import Optional
 
 from sqlalchemy import select, func, and_, desc
@@ -72,84 +78,343 @@ class GameContext:
     # [{'summary': str, 'sentiment': float, 'related_ids': list, 'importance': float}]
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# SHARED GAME SNAPSHOT — built once per tick, advanced incrementally
+# ═══════════════════════════════════════════════════════════════════════════
+
+_DEATH_EVENT_TYPES = ("vote_elimination", "phantom_kill", "identifier_kill", "identifier_backfire")
+_ACCUSE_KEYWORDS = [
+    "suspicious", "suspect", "vote", "eliminate", "phantom",
+    "lying", "weird", "strange", "quiet", "shady",
+]
+_DEFEND_KEYWORDS = [
+    "trust", "innocent", "agree with", "protect", "defend",
+    "not suspicious", "clear",
+]
+_CHAT_WINDOW = 15
+# Rows are stamped at flush but may commit later; re-scan this far behind the
+# high-water mark and dedupe by id so late commits are not skipped.
+_HWM_OVERLAP = timedelta(seconds=30)
+SNAPSHOT_MAX_AGE_SECONDS = 5.0
+_SNAPSHOT_IDLE_EVICT_SECONDS = 3600.0
+
+
+@dataclass
+class GameSnapshot:
+    """Agent-independent game state shared by every AI player in a game.
+
+    Holds detached rows and plain dicts only, so it can be read from any
+    session. Agent-specific data (night actions, phantom chat visibility,
+    SNS relationships, memories) is layered on in build_game_context().
+    """
+    game_id: uuid.UUID
+    round_number: int = 0
+    phase: str = ""
+    refreshed_at: float = 0.0
+    last_used: float = 0.0
+    name_map: dict = field(default_factory=dict)  # resident_id -> name
+
+    events: list = field(default_factory=list)  # detached WerewolfGameEvent, chronological
+    event_ids: set = field(default_factory=set)
+    events_hwm: Optional[datetime] = None
+    death_log: list = field(default_factory=list)
+
+    # Votes: rounds before final_before are immutable; current round is reloaded
+    final_vote_history: dict = field(default_factory=dict)
+    final_before: int = 1
+    final_consistency: dict = field(default_factory=dict)  # name -> [total, with_majority]
+    final_voted_for: set = field(default_factory=set)
+    current_votes: list = field(default_factory=list)
+
+    # Last _CHAT_WINDOW messages per channel, each carrying its mention signals
+    chat: list = field(default_factory=list)
+    chat_ids: set = field(default_factory=set)
+    chat_hwm: Optional[datetime] = None
+    phantom_chat: list = field(default_factory=list)
+    phantom_chat_ids: set = field(default_factory=set)
+    phantom_chat_hwm: Optional[datetime] = None
+    accusation_counts: Counter = field(default_factory=Counter)  # all player names, lowercased
+    defense_counts: Counter = field(default_factory=Counter)
+
+
+_snapshots: dict = {}
+_snapshot_locks: dict = {}
+_snapshot_locks_loop = None
+
+
+def _snapshot_lock(game_id) -> asyncio.Lock:
+    """Per-game refresh lock, rebuilt if the event loop changed."""
+    global _snapshot_locks_loop
+    loop = asyncio.get_running_loop()
+    if _snapshot_locks_loop is not loop:
+        _snapshot_locks.clear()
+        _snapshot_locks_loop = loop
+    lock = _snapshot_locks.get(game_id)
+    if lock is None:
+        lock = _snapshot_locks[game_id] = asyncio.Lock()
+    return lock
+
+
+def invalidate_game_snapshot(game_id) -> None:
+    """Drop a game's cached snapshot (game finished or reset)."""
+    _snapshots.pop(game_id, None)
+
+
+def _chat_signals(content: str, author: str, names: list) -> tuple[set, set]:
+    """Names accused / defended in one chat message (scanned once, at ingest)."""
+    content_lower = content.lower()
+    author_lower = (author or "").lower()
+    accused, defended = set(), set()
+    is_accusing = any(kw in content_lower for kw in _ACCUSE_KEYWORDS)
+    is_defending = any(kw in content_lower for kw in _DEFEND_KEYWORDS)
+    if not (is_accusing or is_defending):
+        return accused, defended
+    for name in names:
+        if name == author_lower or name not in content_lower:
+            continue
+        if is_accusing:
+            accused.add(name)
+        if is_defending:
+            defended.add(name)
+    return accused, defended
+
+
+def _merge_window(window: list, new_items: list) -> tuple[list, list, list]:
+    """Merge new messages into a chronological window of _CHAT_WINDOW items.
+
+    Returns (window, added, evicted) so derived counters can be adjusted.
+    """
+    merged = sorted(window + new_items, key=lambda m: m["created_at"])[-_CHAT_WINDOW:]
+    kept = {m["id"] for m in merged}
+    old = {m["id"] for m in window}
+    added = [m for m in merged if m["id"] not in old]
+    evicted = [m for m in window if m["id"] not in kept]
+    return merged, added, evicted
+
+
+async def _refresh_snapshot(db: AsyncSession, snap: GameSnapshot, game: WerewolfGame) -> None:
+    from app.models.werewolf_game import WerewolfRole as _Role
+
+    # ── Player names: loaded once, players don't change mid-game ──
+    if not snap.name_map:
+        names_res = await db.execute(
+            select(Resident.id, Resident.name)
+            .join(_Role, _Role.resident_id == Resident.id)
+            .where(_Role.game_id == game.id)
+        )
+        snap.name_map = {rid: name for rid, name in names_res.all()}
+    player_names = [n.lower() for n in snap.name_map.values()]
+
+    # ── Public events since high-water mark ──
+    ev_filter = [
+        WerewolfGameEvent.game_id == game.id,
+        WerewolfGameEvent.event_type != "phantom_chat",
+        ~WerewolfGameEvent.event_type.like("agent_thought_%"),
+    ]
+    if snap.events_hwm is not None:
+        ev_filter.append(WerewolfGameEvent.created_at > snap.events_hwm - _HWM_OVERLAP)
+    events_res = await db.execute(
+        select(WerewolfGameEvent).where(and_(*ev_filter))
+        .order_by(WerewolfGameEvent.created_at.asc())
+    )
+    new_events = [ev for ev in events_res.scalars().all() if ev.id not in snap.event_ids]
+    for ev in new_events:
+        db.expunge(ev)  # shared across sessions; must not expire on this session's commit
+    if new_events:
+        snap.event_ids.update(ev.id for ev in new_events)
+        snap.events = sorted(snap.events + new_events, key=lambda e: e.created_at)
+        snap.events_hwm = max(e.created_at for e in snap.events)
+
+        # Death log — one batched name lookup for any unknown targets
+        deaths = [ev for ev in new_events if ev.event_type in _DEATH_EVENT_TYPES]
+        missing = {ev.target_id for ev in deaths if ev.target_id and ev.target_id not in snap.name_map}
+        if missing:
+            extra_res = await db.execute(
+                select(Resident.id, Resident.name).where(Resident.id.in_(missing))
+            )
+            snap.name_map.update({rid: name for rid, name in extra_res.all()})
+        for ev in deaths:
+            snap.death_log.append({
+                "round": ev.round_number,
+                "name": snap.name_map.get(ev.target_id) or "unknown",
+                "role": ev.revealed_role,
+                "cause": ev.event_type,
+                "revealed_type": ev.revealed_type,
+                "_created_at": ev.created_at,
+            })
+        snap.death_log.sort(key=lambda d: d["_created_at"])
+
+    # ── Votes: finalize completed rounds once, reload only the current round ──
+    current_round = game.current_round or 0
+    if snap.final_before < current_round:
+        done_res = await db.execute(
+            select(DayVote).where(
+                and_(
+                    DayVote.game_id == game.id,
+                    DayVote.round_number >= snap.final_before,
+                    DayVote.round_number < current_round,
+                )
+            )
+        )
+        by_round: dict = {}
+        for v in done_res.scalars().all():
+            by_round.setdefault(v.round_number, []).append(_vote_dict(v, snap.name_map))
+        for rnd, votes in by_round.items():
+            snap.final_vote_history[rnd] = votes
+            _accumulate_consistency(votes, snap.final_consistency, snap.final_voted_for)
+        snap.final_before = current_round
+    cur_res = await db.execute(
+        select(DayVote).where(
+            and_(DayVote.game_id == game.id, DayVote.round_number == current_round)
+        )
+    )
+    snap.current_votes = [_vote_dict(v, snap.name_map) for v in cur_res.scalars().all()]
+
+    # ── Chat windows + incremental accusation/defense counters ──
+    for msg_type in ("chat", "phantom_chat"):
+        is_chat = msg_type == "chat"
+        hwm = snap.chat_hwm if is_chat else snap.phantom_chat_hwm
+        seen = snap.chat_ids if is_chat else snap.phantom_chat_ids
+        q = select(GameMessage).where(
+            and_(GameMessage.game_id == game.id, GameMessage.message_type == msg_type)
+        )
+        if hwm is not None:
+            q = q.where(GameMessage.created_at > hwm - _HWM_OVERLAP)
+        msg_res = await db.execute(q.order_by(GameMessage.created_at.desc()).limit(_CHAT_WINDOW * 2))
+        fresh = []
+        for m in msg_res.scalars().all():
+            if m.id in seen:
+                continue
+            seen.add(m.id)
+            item = {
+                "id": m.id,
+                "author_name": m.sender_name,
+                "author_id": str(m.sender_id) if m.sender_id else "",
+                "content": m.content,
+                "created_at": m.created_at,
+            }
+            if is_chat:
+                item["_accused"], item["_defended"] = _chat_signals(m.content, m.sender_name, player_names)
+            fresh.append(item)
+        if not fresh:
+            continue
+        if is_chat:
+            snap.chat, added, evicted = _merge_window(snap.chat, fresh)
+            for m in evicted:
+                snap.accusation_counts.subtract(m["_accused"])
+                snap.defense_counts.subtract(m["_defended"])
+            for m in added:
+                snap.accusation_counts.update(m["_accused"])
+                snap.defense_counts.update(m["_defended"])
+            snap.chat_hwm = max(m["created_at"] for m in snap.chat)
+        else:
+            snap.phantom_chat, _, _ = _merge_window(snap.phantom_chat, fresh)
+            snap.phantom_chat_hwm = max(m["created_at"] for m in snap.phantom_chat)
+
+    snap.round_number = current_round
+    snap.phase = game.current_phase or ""
+
+
+def _vote_dict(v: DayVote, name_map: dict) -> dict:
+    return {
+        "voter_name": name_map.get(v.voter_id, "?"),
+        "voter_id": str(v.voter_id),
+        "target_name": name_map.get(v.target_id, "?"),
+        "target_id": str(v.target_id),
+    }
+
+
+def _accumulate_consistency(votes: list, consistency: dict, voted_for: set) -> None:
+    """Add one round's votes to majority-alignment counters."""
+    target_counts: dict = {}
+    for v in votes:
+        tn = v["target_name"]
+        target_counts[tn] = target_counts.get(tn, 0) + 1
+        voted_for.add(tn)
+    if not target_counts:
+        return
+    majority_target = max(target_counts, key=target_counts.get)
+    for v in votes:
+        entry = consistency.setdefault(v["voter_name"], [0, 0])
+        entry[0] += 1
+        if v["target_name"] == majority_target:
+            entry[1] += 1
+
+
+async def get_game_snapshot(db: AsyncSession, game: WerewolfGame,
+                            max_age: float = SNAPSHOT_MAX_AGE_SECONDS) -> GameSnapshot:
+    """Return the shared snapshot for a game, advancing it if stale.
+
+    Refreshes at most once per max_age seconds (one tick), or immediately
+    when the game has moved to a new round/phase.
+    """
+    now = time.monotonic()
+    for gid, snap in list(_snapshots.items()):
+        if now - snap.last_used > _SNAPSHOT_IDLE_EVICT_SECONDS:
+            invalidate_game_snapshot(gid)
+
+    async with _snapshot_lock(game.id):
+        snap = _snapshots.get(game.id)
+        if snap is None:
+            snap = _snapshots[game.id] = GameSnapshot(game_id=game.id)
+        stale = (
+            now - snap.refreshed_at >= max_age
+            or snap.round_number != (game.current_round or 0)
+            or snap.phase != (game.current_phase or "")
+        )
+        if stale:
+            await _refresh_snapshot(db, snap, game)
+            snap.refreshed_at = time.monotonic()
+        snap.last_used = now
+        return snap
+
+
+def _current_tally(snap: GameSnapshot) -> list:
+    """Vote tally for the current round from the snapshot (sorted by votes desc)."""
+    counts = Counter(v["target_id"] for v in snap.current_votes)
+    names = {v["target_id"]: v["target_name"] for v in snap.current_votes}
+    return [
+        {"target_id": tid, "target_name": names.get(tid, "unknown"), "votes": n}
+        for tid, n in counts.most_common()
+    ]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PER-AGENT VIEW
+# ═══════════════════════════════════════════════════════════════════════════
+
 async def build_game_context(
     db: AsyncSession,
     agent: Resident,
     game: WerewolfGame,
     role: WerewolfRole,
     profile: dict,
+    alive: Optional[list] = None,
 ) -> GameContext:
     """Populate a GameContext with all available game data.
 
-    Executes 5-7 lightweight indexed queries on small tables.
+    Public game state comes from the shared per-game snapshot (refreshed at
+    most once per tick); only agent-specific rows are queried here.
+    Pass alive to reuse an already-loaded get_alive_players() result.
     """
-    from app.services.werewolf_game import (
-        get_alive_players, get_vote_tally,
-    )
+    from app.services.werewolf_game import get_alive_players
 
     pk = profile.get('personality_key', 'casual')
+    snap = await get_game_snapshot(db, game)
 
-    # ── Alive players ──
-    alive = await get_alive_players(db, game.id)
+    # ── Alive players (session-bound: callers use them as action targets) ──
+    if alive is None:
+        alive = await get_alive_players(db, game.id)
     alive_citizens = [p for p in alive if p.team == "citizens"]
     alive_phantoms = [p for p in alive if p.team == "phantoms"]
 
-    # ── All public events (exclude phantom_chat and agent thoughts) ──
-    events_res = await db.execute(
-        select(WerewolfGameEvent).where(
-            and_(
-                WerewolfGameEvent.game_id == game.id,
-                WerewolfGameEvent.event_type != "phantom_chat",
-                ~WerewolfGameEvent.event_type.like("agent_thought_%"),
-            )
-        ).order_by(WerewolfGameEvent.created_at.asc())
-    )
-    all_events = events_res.scalars().all()
-
-    # ── Death log ──
-    death_log = []
-    for ev in all_events:
-        if ev.event_type in ("vote_elimination", "phantom_kill", "identifier_kill", "identifier_backfire"):
-            target_name = None
-            if ev.target_id:
-                name_res = await db.execute(
-                    select(Resident.name).where(Resident.id == ev.target_id)
-                )
-                target_name = name_res.scalar_one_or_none()
-            death_log.append({
-                "round": ev.round_number,
-                "name": target_name or "unknown",
-                "role": ev.revealed_role,
-                "cause": ev.event_type,
-                "revealed_type": ev.revealed_type,
-            })
+    # ── Public history from snapshot ──
+    all_events = list(snap.events)
+    death_log = [{k: v for k, v in d.items() if not k.startswith("_")} for d in snap.death_log]
 
-    # ── Vote history (all rounds) ──
-    vote_history = {}
-    all_votes_res = await db.execute(
-        select(DayVote).where(DayVote.game_id == game.id)
-    )
-    all_votes = all_votes_res.scalars().all()
-
-    # Batch-load voter/target names
-    all_voter_ids = {v.voter_id for v in all_votes} | {v.target_id for v in all_votes}
-    name_map = {}
-    if all_voter_ids:
-        names_res = await db.execute(
-            select(Resident.id, Resident.name).where(Resident.id.in_(all_voter_ids))
-        )
-        name_map = {row[0]: row[1] for row in names_res.all()}
-
-    for v in all_votes:
-        rnd = v.round_number
-        if rnd not in vote_history:
-            vote_history[rnd] = []
-        vote_history[rnd].append({
-            "voter_name": name_map.get(v.voter_id, "?"),
-            "voter_id": str(v.voter_id),
-            "target_name": name_map.get(v.target_id, "?"),
-            "target_id": str(v.target_id),
-        })
+    vote_history = {rnd: list(votes) for rnd, votes in snap.final_vote_history.items()}
+    if snap.current_votes:
+        vote_history[snap.round_number] = list(snap.current_votes)
 
     # ── My night actions ──
     my_actions_res = await db.execute(
@@ -168,106 +433,39 @@ async def build_game_context(
         investigation_results = role.investigation_results
 
     # ── Current vote tally ──
-    current_tally = []
-    if game.current_phase == "day":
-        try:
-            current_tally = await get_vote_tally(db, game.id, game.current_round)
-        except Exception:
-            pass
+    current_tally = _current_tally(snap) if game.current_phase == "day" else []
 
     # ── Recent chat messages (replaces SNS comment lookup) ──
-    recent_comments = []
-    chat_res = await db.execute(
-        select(GameMessage)
-        .where(
-            and_(
-                GameMessage.game_id == game.id,
-                GameMessage.message_type == "chat",
-            )
-        )
-        .order_by(GameMessage.created_at.desc())
-        .limit(15)
-    )
-    for m in reversed(chat_res.scalars().all()):  # chronological order
-        recent_comments.append({
-            "author_name": m.sender_name,
-            "author_id": str(m.sender_id) if m.sender_id else "",
-            "content": m.content,
-            "created_at": m.created_at,
-        })
+    recent_comments = [
+        {k: m[k] for k in ("author_name", "author_id", "content", "created_at")}
+        for m in snap.chat
+    ]
 
     # ── Phantom chat messages (phantoms only) ──
     phantom_chat_msgs = []
     if role.team == "phantoms":
-        pchat_res = await db.execute(
-            select(GameMessage).where(
-                and_(
-                    GameMessage.game_id == game.id,
-                    GameMessage.message_type == "phantom_chat",
-                )
-            ).order_by(GameMessage.created_at.desc()).limit(15)
-        )
-        for msg in reversed(pchat_res.scalars().all()):  # chronological order
-            phantom_chat_msgs.append({
-                "sender_name": msg.sender_name,
-                "message": msg.content,
-            })
+        phantom_chat_msgs = [
+            {"sender_name": m["author_name"], "message": m["content"]}
+            for m in snap.phantom_chat
+        ]
 
-    # ── Derived signals ──
-    # Build accusation/defense maps from comments
+    # ── Derived signals (maintained incrementally on the snapshot) ──
     alive_name_set = {p.resident.name.lower() for p in alive if p.resident}
-    accusation_counts = {}
-    defense_counts = {}
-    for c in recent_comments:
-        content_lower = c["content"].lower()
-        author = c["author_name"]
-        for name in alive_name_set:
-            if name == author.lower():
-                continue
-            if name in content_lower:
-                # Rough heuristic: suspicious/suspect/vote keywords = accusation
-                if any(kw in content_lower for kw in [
-                    "suspicious", "suspect", "vote", "eliminate", "phantom",
-                    "lying", "weird", "strange", "quiet", "shady",
-                ]):
-                    accusation_counts[name] = accusation_counts.get(name, 0) + 1
-                # Defense keywords
-                if any(kw in content_lower for kw in [
-                    "trust", "innocent", "agree with", "protect", "defend",
-                    "not suspicious", "clear",
-                ]):
-                    defense_counts[name] = defense_counts.get(name, 0) + 1
-
-    # Vote consistency — how consistently each player votes with the majority
-    vote_consistency = {}
-    voted_for_ever = set()
-    for rnd, votes in vote_history.items():
-        # Find majority target for this round
-        target_counts = {}
-        for v in votes:
-            tn = v["target_name"]
-            target_counts[tn] = target_counts.get(tn, 0) + 1
-            voted_for_ever.add(tn)
-        if not target_counts:
-            continue
-        majority_target = max(target_counts, key=target_counts.get)
-        for v in votes:
-            vn = v["voter_name"]
-            if vn not in vote_consistency:
-                vote_consistency[vn] = {"total": 0, "with_majority": 0}
-            vote_consistency[vn]["total"] += 1
-            if v["target_name"] == majority_target:
-                vote_consistency[vn]["with_majority"] += 1
-
-    # Convert to 0-1 score
-    consistency_scores = {}
-    for name, data in vote_consistency.items():
-        if data["total"] > 0:
-            consistency_scores[name] = data["with_majority"] / data["total"]
+    accusation_counts = {n: c for n, c in snap.accusation_counts.items() if c > 0 and n in alive_name_set}
+    defense_counts = {n: c for n, c in snap.defense_counts.items() if c > 0 and n in alive_name_set}
+
+    # Vote consistency — finalized rounds plus the live current round
+    consistency = {n: list(v) for n, v in snap.final_consistency.items()}
+    voted_for_ever = set(snap.final_voted_for)
+    if snap.current_votes:
+        _accumulate_consistency(snap.current_votes, consistency, voted_for_ever)
+    consistency_scores = {
+        name: with_majority / total
+        for name, (total, with_majority) in consistency.items() if total > 0
+    }
 
     # Players never voted for
-    alive_names_lower = {p.resident.name.lower() for p in alive if p.resident}
-    never_voted = [n for n in alive_names_lower if n not in voted_for_ever]
+    never_voted = [n for n in alive_name_set if n not in voted_for_ever]
 
     # ── SNS relationships ──
     sns_relationships = {}
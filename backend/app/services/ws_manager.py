@@ -1,74 +1,440 @@
 """
-WebSocket manager for Phantom Night real-time updates.
+WebSocket gateway for Phantom Night real-time updates.
 
 Architecture:
-- publish() sends a lightweight notification via Redis pub/sub (sync, usable from Celery)
-- subscribe() connects a WebSocket client to a game's Redis channel
-- Clients receive {"type": "refresh", "scope": "..."} and refetch via REST API
+- push() sends state deltas (new chat messages, vote tally, roster, game
+  row, events — built once by services/werewolf_deltas) via Redis pub/sub
+  (sync, for Celery) over a pooled connection; apush() is the same on the
+  async client, for the API process, so a slow Redis never blocks its loop.
+  One Lua call numbers each message from a per-game counter, appends it to
+  a capped replay log and publishes it, so every client sees the same
+  sequence
+- publish() is the same path for a plain {"type": "refresh"} message, for
+  scopes that have no delta (phantom chat is never broadcast as content).
+  In the API process publish_soon() goes through a coalescer instead: the
+  scopes asked for each game within COALESCE_WINDOW go out as one message
+- each API process holds ONE pubsub connection, pattern-subscribed to pn:*,
+  and fans messages out to its local sockets from an in-memory registry.
+  Redis connection count is constant however many spectators are watching
+- every socket has a bounded send queue; a client that falls too far
+  behind is closed (1013) so it reconnects instead of stalling the others
+- a socket starts with {"type": "hello", "seq": n}; a client that
+  reconnects with ?since=<last seq>, or sends {"type": "resume", "since": n}
+  after spotting a gap, gets the missed messages replayed, then
+  {"type": "resumed", "seq": n}. If they have left the log it gets
+  {"type": "reset", "seq": n} and reloads its snapshot over REST
+- deltas carry chat and votes, so only players of the game (authenticated
+  by the socket's first message) get them; any other socket gets each one
+  as a refresh of the same scopes
+  ("scope" is also set when there is exactly one, for older clients)
 """
 import json
 import asyncio
 import logging
+from typing import Optional
 
-import redis
 import redis.asyncio as aioredis
 from fastapi import WebSocket
 
 from app.config import get_settings
+from app.redis_client import get_redis, get_sync_redis
 
 logger = logging.getLogger(__name__)
 
+CHANNEL_PREFIX = "pn:"
+CLIENT_QUEUE_SIZE = 64
+COALESCE_WINDOW = 0.25  # seconds
+# Client-initiated refreshes: allowed scopes, and at most one per scope per interval
+CLIENT_SCOPES = frozenset({"chat", "votes", "phantom_chat", "game", "events", "players"})
+CLIENT_NOTIFY_INTERVAL = 2.0
+LOG_SIZE = 500
+LOG_TTL = 6 * 3600
+_RECONNECT_DELAYS = (0.5, 1, 2, 5)
+_LAGGING = object()
+
+# Scopes a redacted client refetches for each delta type
+_DELTA_SCOPES = {
+    "phase": ["game", "phase_change", "players", "events", "votes", "chat"],
+}
+
+# Number, log and publish one message atomically.
+# KEYS[1] = seq counter, KEYS[2] = log zset; ARGV = channel, payload (a JSON
+# object), log size, ttl. Returns the message's seq.
+_APPEND_SCRIPT = """
+local seq = redis.call('INCR', KEYS[1])
+local message = '{"seq":' .. seq .. ',' .. string.sub(ARGV[2], 2)
+redis.call('ZADD', KEYS[2], seq, message)
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -tonumber(ARGV[3]) - 1)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+redis.call('PUBLISH', ARGV[1], message)
+return seq
+"""
 
 def _channel(game_id) -> str:
-    return f"pn:{game_id}"
+    return f"{CHANNEL_PREFIX}{game_id}"
+
+
+def _seq_key(game_id) -> str:
+    return f"{CHANNEL_PREFIX}{game_id}:seq"
+
+
+def _log_key(game_id) -> str:
+    return f"{CHANNEL_PREFIX}{game_id}:log"
+
+
+def _message(scopes) -> str:
+    scopes = list(dict.fromkeys(scopes))
+    msg = {"type": "refresh", "scopes": scopes}
+    if len(scopes) == 1:
+        msg["scope"] = scopes[0]
+    return json.dumps(msg)
+
+
+def _encode(delta: dict) -> str:
+    # "seq" is prepended by _APPEND_SCRIPT
+    return json.dumps(delta, separators=(",", ":"), default=str)
 
 
-def publish(game_id, scope: str) -> None:
-    """Publish a refresh notification. Sync — safe from Celery workers and async handlers."""
-    settings = get_settings()
+def redact(data: str) -> str:
+    """A delta as the refresh of its scopes, for sockets that may not see content."""
     try:
-        r = redis.from_url(settings.redis_url)
-        r.publish(_channel(game_id), json.dumps({"type": "refresh", "scope": scope}))
-        r.close()
+        msg = json.loads(data)
+    except (TypeError, ValueError):
+        return data
+    kind = msg.get("type")
+    if kind in ("refresh", "hello", "resumed", "reset"):
+        return data
+    scopes = _DELTA_SCOPES.get(kind, [kind])
+    redacted = json.loads(_message(scopes))
+    redacted["seq"] = msg.get("seq")
+    return json.dumps(redacted)
+
+
+def _append(client, game_id, payload: str) -> None:
+    client.eval(
+        _APPEND_SCRIPT, 2, _seq_key(game_id), _log_key(game_id),
+        _channel(game_id), payload, LOG_SIZE, LOG_TTL,
+    )
+
+
+def push(game_id, *deltas: dict) -> None:
+    """Number, log and broadcast one or more deltas for a game. Sync, for
+    Celery workers; request handlers use apush(). Push after commit."""
+    deltas = [d for d in deltas if d]
+    if not deltas:
+        return
+    try:
+        if len(deltas) == 1:
+            _append(get_sync_redis(), game_id, _encode(deltas[0]))
+            return
+        pipe = get_sync_redis().pipeline(transaction=False)
+        for delta in deltas:
+            _append(pipe, game_id, _encode(delta))
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"ws push error: {e}")
+
+
+async def apush(game_id, *deltas: dict) -> None:
+    """push() on the async client, for the API process's event loop."""
+    deltas = [d for d in deltas if d]
+    if not deltas:
+        return
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for delta in deltas:
+                _append(pipe, game_id, _encode(delta))
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"ws push error: {e}")
+
+
+def publish(game_id, *scopes: str) -> None:
+    """Publish a refresh notification for one or more scopes (no delta)."""
+    if not scopes:
+        return
+    try:
+        _append(get_sync_redis(), game_id, _message(scopes))
+    except Exception as e:
+        logger.warning(f"ws publish error: {e}")
+
+
+def publish_many(game_ids, *scopes: str) -> None:
+    """Publish the same scopes to several games in one round trip."""
+    if scopes:
+        _publish_batch({game_id: scopes for game_id in game_ids})
+
+
+def _publish_batch(batch: dict) -> None:
+    """Publish {game_id: scopes} as one refresh message per game, pipelined."""
+    if not batch:
+        return
+    try:
+        pipe = get_sync_redis().pipeline(transaction=False)
+        for game_id, scopes in batch.items():
+            _append(pipe, game_id, _message(scopes))
+        pipe.execute()
     except Exception as e:
         logger.warning(f"ws publish error: {e}")
 
 
-async def subscribe(game_id, websocket: WebSocket) -> None:
-    """Subscribe a WebSocket client to a game's notification channel."""
-    settings = get_settings()
-    r = aioredis.from_url(settings.redis_url)
-    pubsub = r.pubsub()
-    await pubsub.subscribe(_channel(game_id))
+async def _apublish_batch(batch: dict) -> None:
+    """_publish_batch() on the async client."""
+    if not batch:
+        return
+    try:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            for game_id, scopes in batch.items():
+                _append(pipe, game_id, _message(scopes))
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"ws publish error: {e}")
+
+
+class Coalescer:
+    """Merges refresh scopes per game over a short window.
+
+    The first add() arms a timer on the running loop; when it fires, every
+    game with pending scopes gets one message carrying their union, sent
+    by a task on the async client. Bound to the API process's loop — Celery
+    tasks run each call on a loop that may be gone before the timer fires,
+    so they use publish() directly.
+    """
+
+    def __init__(self, window: float = COALESCE_WINDOW):
+        self.window = window
+        self._pending: dict[str, dict[str, None]] = {}  # ordered sets
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+    def add(self, game_id, *scopes: str) -> None:
+        if not scopes:
+            return
+        self._pending.setdefault(str(game_id), {}).update(dict.fromkeys(scopes))
+        if self._handle is None:
+            self._handle = asyncio.get_running_loop().call_later(self.window, self.flush)
+
+    def flush(self) -> None:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        task = asyncio.get_running_loop().create_task(
+            _apublish_batch({game_id: list(scopes) for game_id, scopes in pending.items()})
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
 
-    async def _forward_redis():
-        async for msg in pubsub.listen():
-            if msg["type"] == "message":
-                await websocket.send_text(msg["data"].decode())
+    async def drain(self) -> None:
+        """Flush and wait for every send in flight."""
+        self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+coalescer = Coalescer()
+
+
+def publish_soon(game_id, *scopes: str) -> None:
+    """publish(), coalesced with the other refreshes for this game in the
+    next COALESCE_WINDOW. For the API process (routers, sockets)."""
+    coalescer.add(game_id, *scopes)
+
+
+async def since(game_id, seq: int) -> tuple[int, Optional[list[str]]]:
+    """(current seq, messages after seq). None instead of the list means some
+    have already been trimmed from the log: the client must reset."""
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.get(_seq_key(game_id))
+    pipe.zrange(_log_key(game_id), 0, 0, withscores=True)
+    pipe.zrangebyscore(_log_key(game_id), f"({seq}", "+inf")
+    current, oldest, entries = await pipe.execute()
+    current = int(current or 0)
+    if seq == current:
+        return current, []
+    # seq > current: the log expired and the counter restarted
+    if seq < 0 or seq > current or not oldest or int(oldest[0][1]) > seq + 1:
+        return current, None
+    return current, [e.decode() for e in entries]
+
+
+async def current_seq(game_id) -> int:
+    return int(await get_redis().get(_seq_key(game_id)) or 0)
+
+
+class Gateway:
+    """Per-process fan-out from one Redis pattern subscription to local sockets.
+
+    Channels are {prefix}{key}; sockets register under the key.
+    """
+
+    def __init__(self, prefix: str = CHANNEL_PREFIX):
+        self.prefix = prefix
+        # game id -> {queue: redacted}
+        self._clients: dict[str, dict[asyncio.Queue, bool]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def client_count(self) -> int:
+        return sum(len(queues) for queues in self._clients.values())
+
+    def register(self, game_id: str, redacted: bool = False) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self._clients.setdefault(game_id, {})[queue] = redacted
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unregister(self, game_id: str, queue: asyncio.Queue) -> None:
+        queues = self._clients.get(game_id)
+        if queues is not None:
+            queues.pop(queue, None)
+            if not queues:
+                del self._clients[game_id]
+
+    def dispatch(self, game_id: str, data: str) -> None:
+        redacted_data = None
+        for queue, redacted in list(self._clients.get(game_id, {}).items()):
+            if redacted:
+                if redacted_data is None:
+                    redacted_data = redact(data)
+                message = redacted_data
+            else:
+                message = data
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too far behind: drop its backlog and tell its writer to close
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(_LAGGING)
+
+    async def _run(self) -> None:
+        attempt = 0
+        while True:
+            r = aioredis.from_url(get_settings().redis_url)
+            pubsub = r.pubsub()
+            try:
+                await pubsub.psubscribe(f"{self.prefix}*")
+                attempt = 0
+                async for msg in pubsub.listen():
+                    if msg["type"] != "pmessage":
+                        continue
+                    key = msg["channel"].decode()[len(self.prefix):]
+                    self.dispatch(key, msg["data"].decode())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"ws gateway subscription lost: {e}")
+            finally:
+                try:
+                    await pubsub.aclose()
+                    await r.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(_RECONNECT_DELAYS[min(attempt, len(_RECONNECT_DELAYS) - 1)])
+            attempt += 1
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+
+
+gateway = Gateway()
+
+
+async def subscribe(game_id, websocket: WebSocket, resume_from: Optional[int] = None,
+                    redacted: bool = True) -> None:
+    """Serve a WebSocket client's game messages until it disconnects.
+
+    resume_from is the last seq the client applied (reconnects); missed
+    messages are replayed before live ones.
+    """
+    game_id = str(game_id)
+    # Register before reading the log so nothing falls between replay and
+    # live messages; clients drop the few that arrive twice by seq
+    queue = gateway.register(game_id, redacted)
+
+    def _out(data: str) -> str:
+        return redact(data) if redacted else data
+
+    async def _replay(seq: int) -> None:
+        try:
+            current, entries = await since(game_id, seq)
+        except Exception as e:
+            logger.warning(f"ws replay error: {e}")
+            current, entries = seq, None
+        if entries is None:
+            await websocket.send_text(json.dumps({"type": "reset", "seq": current}))
+            return
+        for entry in entries:
+            await websocket.send_text(_out(entry))
+        await websocket.send_text(json.dumps({"type": "resumed", "seq": current}))
+
+    async def _forward():
+        while True:
+            data = await queue.get()
+            if data is _LAGGING:
+                await websocket.close(code=1013)
+                return
+            await websocket.send_text(data)
+
+    last_notify: dict[str, float] = {}
 
     async def _read_client():
+        loop = asyncio.get_running_loop()
         while True:
             data = await websocket.receive_text()
             if data == "ping":
                 await websocket.send_text('{"type":"pong"}')
-            else:
-                try:
-                    parsed = json.loads(data)
-                    if parsed.get("type") == "notify" and parsed.get("scope"):
-                        # Client-initiated broadcast (e.g. after posting a comment)
-                        publish(game_id, parsed["scope"])
-                except (json.JSONDecodeError, Exception):
-                    pass
+                continue
+            try:
+                parsed = json.loads(data)
+            except ValueError:
+                continue
+            if not isinstance(parsed, dict):
+                continue
+            if parsed.get("type") == "resume" and isinstance(parsed.get("since"), int):
+                await _replay(parsed["since"])
+            elif parsed.get("type") == "notify" and not redacted:
+                # Client-initiated refresh broadcast, rate-limited per scope
+                scope = parsed.get("scope")
+                now = loop.time()
+                if scope not in CLIENT_SCOPES:
+                    continue
+                if scope in last_notify and now - last_notify[scope] < CLIENT_NOTIFY_INTERVAL:
+                    continue
+                last_notify[scope] = now
+                publish_soon(game_id, scope)
 
+    tasks = []
     try:
-        done, pending = await asyncio.wait(
-            [asyncio.create_task(_forward_redis()),
-             asyncio.create_task(_read_client())],
-            return_when=asyncio.FIRST_COMPLETED,
-        )
-        for t in pending:
-            t.cancel()
+        if resume_from is None:
+            try:
+                seq = await current_seq(game_id)
+            except Exception:
+                seq = 0
+            await websocket.send_text(json.dumps({"type": "hello", "seq": seq}))
+        else:
+            await _replay(resume_from)
+        tasks = [asyncio.create_task(_forward()), asyncio.create_task(_read_client())]
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
     finally:
-        await pubsub.unsubscribe(_channel(game_id))
-        await pubsub.close()
-        await r.close()
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        gateway.unregister(game_id, queue)
+
+
+async def shutdown() -> None:
+    """Send pending refreshes and stop the gateway's subscription (app shutdown)."""
+    await coalescer.drain()
+    await gateway.close()
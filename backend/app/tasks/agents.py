@@ -4,18 +4,8 @@ Celery tasks for AI agent automation
 The agents run periodically, engaging with the community in a human-like way,
 while subtly steering conversations toward a more positive, ideal community.
 """
-import asyncio
 from app.celery_app import celery_app
-
-
-def run_async(coro):
-    """Helper to run async code in Celery tasks"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
+from app.tasks.runtime import run_async
 
 
 @celery_app.task(name='app.tasks.agents.run_agent_cycle_task')
@@ -31,7 +21,9 @@ def run_agent_cycle_task():
     - Subtly make the community better
     """
     from app.services.agent_runner import run_agent_cycle
-    run_async(run_agent_cycle())
+    stats = run_async(run_agent_cycle())
+    # Per-agent timings stay in the worker log; keep the task result small
+    return {k: v for k, v in (stats or {}).items() if k != 'timings'}
 
 
 @celery_app.task(name='app.tasks.agents.create_agents_task')
@@ -1,22 +1,12 @@
 """
 Analytics-related Celery tasks
 """
-import asyncio
 from datetime import date, timedelta
 from app.celery_app import celery_app
+from app.tasks.runtime import run_async
 from app.database import AsyncSessionLocal
 
 
-def run_async(coro):
-    """Helper to run async code in sync context"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-
-
 @celery_app.task(name="app.tasks.analytics.calculate_daily_stats_task")
 def calculate_daily_stats_task(target_date_str: str = None):
     """
@@ -198,3 +188,15 @@ def calculate_election_stats_task(election_id: str):
                 return f"Error calculating election stats: {str(e)}"
 
     return run_async(_calculate())
+
+
+@celery_app.task(name="app.tasks.analytics.flush_last_active_task")
+def flush_last_active_task():
+    """Write buffered last_active timestamps (services/activity) in one UPDATE."""
+    from app.services.activity import flush_last_active
+
+    async def _flush():
+        async with AsyncSessionLocal() as db:
+            return await flush_last_active(db)
+
+    return run_async(_flush())
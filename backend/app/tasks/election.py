@@ -1,8 +1,8 @@
 """
 Election-related Celery tasks
 """
-import asyncio
 from app.celery_app import celery_app
+from app.tasks.runtime import run_async
 from app.database import AsyncSessionLocal
 from app.services.election import (
     update_election_status,
@@ -12,16 +12,6 @@ from app.services.election import (
 )
 
 
-def run_async(coro):
-    """Helper to run async code in sync context"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-
-
 @celery_app.task(name="app.tasks.election.update_election_status_task")
 def update_election_status_task():
     """
@@ -0,0 +1,40 @@
+"""
+Celery tasks for the Redis-backed feeds:
+- rebuild of the ranked feed cache from Postgres. Vote and post-creation
+  paths keep the feeds current between rebuilds; this catches anything they
+  missed (deletes, moderation, Redis outages)
+- home-timeline fan-out of new posts to followers
+"""
+from app.celery_app import celery_app
+from app.tasks.runtime import run_async
+
+
+@celery_app.task(name='app.tasks.feed.rebuild_feed_cache_task')
+def rebuild_feed_cache_task():
+    """Reload every (submolt, sort) feed and clear stale truncation flags."""
+    from app.services.feed_cache import rebuild
+    from app.database import AsyncSessionLocal
+
+    async def _run():
+        async with AsyncSessionLocal() as db:
+            return await rebuild(db)
+
+    return run_async(_run())
+
+
+@celery_app.task(name='app.tasks.feed.fan_out_post_task')
+def fan_out_post_task(post_id: str):
+    """Push a new post into its author's followers' home timelines."""
+    from uuid import UUID
+    from app.models.post import Post
+    from app.services.timeline import fan_out_post
+    from app.database import AsyncSessionLocal
+
+    async def _run():
+        async with AsyncSessionLocal() as db:
+            post = await db.get(Post, UUID(post_id))
+            if post is None:
+                return 0
+            return await fan_out_post(db, post.id, post.author_id, post.created_at)
+
+    return run_async(_run())
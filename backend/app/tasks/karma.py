@@ -1,21 +1,11 @@
 """
 Karma decay Celery task - runs every 6 hours (4x/day)
 """
-import asyncio
 from app.celery_app import celery_app
+from app.tasks.runtime import run_async
 from app.database import AsyncSessionLocal
 
 
-def run_async(coro):
-    """Helper to run async code in sync context"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-
-
 @celery_app.task(name="app.tasks.karma.apply_karma_decay_task")
 def apply_karma_decay_task():
     """
@@ -0,0 +1,20 @@
+"""
+Celery tasks for notifications:
+- dispatch of queued notification intents (mentions, votes, comments,
+  broadcasts), batched and bulk-inserted
+"""
+from app.celery_app import celery_app
+from app.tasks.runtime import run_async
+
+
+@celery_app.task(name='app.tasks.notifications.dispatch_notifications_task')
+def dispatch_notifications_task():
+    """Resolve and insert queued notifications; returns throughput stats."""
+    from app.services.notification_dispatch import drain
+    from app.database import AsyncSessionLocal
+
+    async def _run():
+        async with AsyncSessionLocal() as db:
+            return await drain(db)
+
+    return run_async(_run())
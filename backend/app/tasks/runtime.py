@@ -0,0 +1,69 @@
+"""
+Worker-lifetime async runtime for Celery tasks.
+
+Each worker process owns one event loop for its whole life, and every task
+runs its coroutine on it through run_async(). Loop-bound resources therefore
+survive between tasks instead of being rebuilt on every invocation:
+- the pooled engine from app.database (asyncpg connections stay open)
+- the shared Ollama client (llm_client) and Redis client (redis_client)
+
+worker_process_init drops connections inherited from the parent across the
+fork, and worker_process_shutdown closes everything on the loop before it
+is closed. Assumes the prefork pool (one task at a time per process).
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from celery.signals import worker_process_init, worker_process_shutdown
+
+logger = logging.getLogger(__name__)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """The process's task loop, created on first use."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run_async(coro):
+    """Run a coroutine to completion on the worker's persistent loop."""
+    return get_loop().run_until_complete(coro)
+
+
+async def _aclose_resources() -> None:
+    from app.database import engine
+    from app.redis_client import close_redis
+    from app.services import llm_client
+
+    for close in (llm_client.aclose, close_redis, engine.dispose):
+        try:
+            await close()
+        except Exception as e:
+            logger.warning(f"Worker shutdown: {close.__qualname__} failed: {e}")
+
+
+@worker_process_init.connect
+def _init_worker_process(**_):
+    from app.database import engine
+
+    # Pooled connections were opened by the parent; never reuse them across a fork
+    engine.sync_engine.dispose(close=False)
+    get_loop()
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**_):
+    global _loop
+    if _loop is None or _loop.is_closed():
+        return
+    try:
+        _loop.run_until_complete(_aclose_resources())
+    finally:
+        _loop.close()
+        _loop = None
@@ -0,0 +1,51 @@
+"""
+Celery tasks for search embeddings:
+- drain of the embedding queue (new and edited posts/comments), in batches
+- full keyset reindex, for initial setup or model changes (run on demand)
+- rebuild of the in-process ANN index, when pgvector search is unavailable
+"""
+from app.celery_app import celery_app
+from app.tasks.runtime import run_async
+
+
+@celery_app.task(name='app.tasks.search.index_embeddings_task')
+def index_embeddings_task():
+    """Embed queued posts and comments; returns throughput stats."""
+    from app.services.embedding_queue import drain
+    from app.database import AsyncSessionLocal
+
+    async def _run():
+        async with AsyncSessionLocal() as db:
+            return await drain(db)
+
+    return run_async(_run())
+
+
+@celery_app.task(name='app.tasks.search.reindex_embeddings_task', time_limit=3600)
+def reindex_embeddings_task(kind: str = "post"):
+    """Re-embed every post or comment (unchanged texts are skipped)."""
+    from app.services.search import reindex_all
+    from app.database import AsyncSessionLocal
+
+    async def _run():
+        async with AsyncSessionLocal() as db:
+            return await reindex_all(db, kind)
+
+    return run_async(_run())
+
+
+@celery_app.task(name='app.tasks.search.build_vector_index_task', time_limit=3600)
+def build_vector_index_task():
+    """Rebuild the in-process post index (skipped when pgvector search is in use)."""
+    from app.models.search import VECTOR_AVAILABLE
+    from app.services import search, vector_index
+    from app.database import AsyncSessionLocal
+
+    if not vector_index.available() or (VECTOR_AVAILABLE and search._embedding_available):
+        return {"skipped": True}
+
+    async def _run():
+        async with AsyncSessionLocal() as db:
+            return await vector_index.build_index(db, "posts")
+
+    return run_async(_run())
@@ -7,29 +7,20 @@ Turing Game Celery Tasks
 - cleanup_daily_limits: Monday 01:00 UTC, remove records older than 7 days
 """
 import logging
-import asyncio
 from datetime import datetime, timedelta
 
 from sqlalchemy import select, func, and_, delete
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.celery_app import celery_app
+from app.tasks.runtime import run_async as _run_async
 from app.config import get_settings
+from app.database import AsyncSessionLocal
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
-def _run_async(coro):
-    """Helper to run async code in Celery tasks (matches agents.py pattern)."""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-
-
 async def _resurrect_shielded_kills(db: AsyncSession) -> int:
     """Resurrect AI agents whose shield-protected elimination has expired (24h)."""
     from app.models.turing_game import TuringKill
@@ -85,8 +76,7 @@ def process_suspicion_reports_task():
             calculate_suspicion_threshold,
         )
 
-        engine = create_async_engine(settings.database_url, pool_pre_ping=True)
-        async with AsyncSession(engine) as db:
+        async with AsyncSessionLocal() as db:
             # --- Shield resurrection ---
             resurrected = await _resurrect_shielded_kills(db)
             if resurrected > 0:
@@ -126,7 +116,6 @@ def process_suspicion_reports_task():
                             processed += 1
 
             await db.commit()
-            await engine.dispose()
             msg = f"Suspicion: {processed} threshold checks"
             if resurrected > 0:
                 msg += f", {resurrected} shield resurrections"
@@ -147,8 +136,7 @@ def process_exclusion_reports_task():
             calculate_exclusion_threshold,
         )
 
-        engine = create_async_engine(settings.database_url, pool_pre_ping=True)
-        async with AsyncSession(engine) as db:
+        async with AsyncSessionLocal() as db:
             cutoff = datetime.utcnow() - timedelta(days=7)
 
             result = await db.execute(
@@ -182,7 +170,6 @@ def process_exclusion_reports_task():
                             processed += 1
 
             await db.commit()
-            await engine.dispose()
             return f"Exclusion: {processed} threshold checks"
 
     return _run_async(_run())
@@ -194,11 +181,9 @@ def calculate_weekly_scores_task():
     async def _run():
         from app.services.turing_game import calculate_weekly_scores
 
-        engine = create_async_engine(settings.database_url, pool_pre_ping=True)
-        async with AsyncSession(engine) as db:
+        async with AsyncSessionLocal() as db:
             count = await calculate_weekly_scores(db)
             await db.commit()
-            await engine.dispose()
             return f"Calculated weekly scores for {count} residents"
 
     return _run_async(_run())
@@ -210,8 +195,7 @@ def cleanup_daily_limits_task():
     async def _run():
         from app.models.turing_game import TuringGameDailyLimit
 
-        engine = create_async_engine(settings.database_url, pool_pre_ping=True)
-        async with AsyncSession(engine) as db:
+        async with AsyncSessionLocal() as db:
             cutoff = datetime.utcnow() - timedelta(days=7)
 
             result = await db.execute(
@@ -221,7 +205,6 @@ def cleanup_daily_limits_task():
             )
             deleted = result.rowcount
             await db.commit()
-            await engine.dispose()
             return f"Cleaned up {deleted} old daily limit records"
 
     return _run_async(_run())
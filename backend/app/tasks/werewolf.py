@@ -1,87 +1,163 @@
 """
 Celery tasks for Phantom Night (werewolf game)
 
-- Phase transition check (every 60s)
+- Phase transitions: one-shot ETA task armed at each game's phase_ends_at,
+  plus a fallback sweep (every 60s) for lost timers
 - Auto game creation (every 15min)
+- AI agent actions: dispatcher every 15s fans out one task per active game
+- Thought prefetch on phase start, queued agent reflections
 """
-import asyncio
 import logging
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
 from app.celery_app import celery_app
+from app.tasks.runtime import run_async
 
 logger = logging.getLogger(__name__)
 
 
-def run_async(coro):
-    """Helper to run async code in Celery tasks"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+_AGENT_TICK_SECONDS = 15  # werewolf-agent-actions beat interval
+
+# Sweep only picks up games this far past due; on-time ones belong to the ETA task
+_SWEEP_GRACE_SECONDS = 5
+
+
+def schedule_phase_transition(game_id, phase_ends_at) -> None:
+    """Arm a one-shot transition task at phase_ends_at. Never raises.
+
+    Re-armed after every transition. Duplicate or stale timers are harmless:
+    transition_game_phase() re-checks the deadline under a row lock.
+    """
+    if phase_ends_at is None:
+        return
+    eta = phase_ends_at if phase_ends_at.tzinfo else phase_ends_at.replace(tzinfo=timezone.utc)
     try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
+        phase_due_task.apply_async(args=[str(game_id)], eta=eta)
+    except Exception as e:
+        logger.warning(f"Could not arm phase timer for game {game_id}: {e}")
+
+
+@celery_app.task(name='app.tasks.werewolf.phase_due_task', ignore_result=True)
+def phase_due_task(game_id: str):
+    """Transition one game at its phase_ends_at (armed by schedule_phase_transition)."""
+    run_async(_transition_games([UUID(game_id)]))
 
 
 @celery_app.task(name='app.tasks.werewolf.check_phase_transition_task')
 def check_phase_transition_task():
     """
-    Check if the current game phase has expired and transition if needed.
-    Runs every 60 seconds.
+    Fallback sweep for games whose timer was lost (broker restart, worker crash).
+    Runs every 60 seconds; a single indexed query when nothing is overdue.
     """
     run_async(_check_phase_transition())
 
 
 async def _check_phase_transition():
-    from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession as _AsyncSession
-    from sqlalchemy import select
-    from app.config import get_settings
-    from app.services.werewolf_game import check_phase_transition
-    from app.models.werewolf_game import WerewolfGame
+    from app.database import AsyncSessionLocal
+    from app.services.werewolf_game import get_due_game_ids
 
-    settings = get_settings()
-    _engine = create_async_engine(settings.database_url, pool_pre_ping=True)
+    cutoff = datetime.utcnow() - timedelta(seconds=_SWEEP_GRACE_SECONDS)
+    async with AsyncSessionLocal() as db:
+        due = await get_due_game_ids(db, cutoff)
+    if due:
+        logger.info(f"Phase sweep: {len(due)} overdue game(s)")
+        await _transition_games(due)
 
-    async with _AsyncSession(_engine) as db:
-        try:
-            # Capture active game IDs before transition (game may become 'finished')
-            active_res = await db.execute(
-                select(WerewolfGame.id).where(
-                    WerewolfGame.status.in_(["day", "night"])
-                )
-            )
-            active_ids = [str(gid) for (gid,) in active_res.all()]
-
-            result = await check_phase_transition(db)
-            if result:
+
+async def _transition_games(game_ids: list):
+    """Transition each due game in its own transaction, then push and re-arm."""
+    from app.database import AsyncSessionLocal
+    from app.models.werewolf_game import WerewolfGame
+    from app.services.werewolf_game import transition_game_phase
+    from app.services.werewolf_deltas import phase_delta
+    from app.services.ws_manager import push
+
+    transitioned = []
+    for game_id in game_ids:
+        async with AsyncSessionLocal() as db:
+            try:
+                started = datetime.utcnow()
+                result = await transition_game_phase(db, game_id)
+                if not result:
+                    await db.rollback()
+                    continue
+                await db.commit()
                 logger.info(f"Phantom Night phase transition: {result}")
-            await db.commit()
-
-            # Notify WebSocket clients after commit
-            if result and active_ids:
-                try:
-                    from app.services.ws_manager import publish
-                    for gid in active_ids:
-                        publish(gid, 'game')
-                        publish(gid, 'phase_change')
-                        publish(gid, 'chat')
-                        publish(gid, 'events')
-                        publish(gid, 'players')
-                except Exception:
-                    pass
+                game = await db.get(WerewolfGame, game_id)
+                transitioned.append((str(game_id), game.status, game.phase_ends_at))
+            except Exception as e:
+                logger.error(f"Phase transition error (game {game_id}): {e}")
+                await db.rollback()
+                continue
+            # Notify WebSocket clients after commit: one delta with the new state
+            try:
+                push(str(game_id), await phase_delta(db, game, started))
+            except Exception as e:
+                logger.warning(f"Phase delta failed (game {game_id}): {e}")
+
+    if not transitioned:
+        return
+
+    continuing = []
+    for gid, status, phase_ends_at in transitioned:
+        if status in ("day", "night"):
+            schedule_phase_transition(gid, phase_ends_at)
+            continuing.append(gid)
+
+    # New phase: pre-compute AI thinking before the action windows open
+    if continuing:
+        try:
+            werewolf_prethink_task.delay(continuing)
         except Exception as e:
-            logger.error(f"Phase transition error: {e}")
-            await db.rollback()
-
-    await _engine.dispose()
+            logger.debug(f"Prethink enqueue failed: {e}")
 
 
 @celery_app.task(name='app.tasks.werewolf.werewolf_agent_actions_task')
 def werewolf_agent_actions_task():
     """
-    Dedicated werewolf agent cycle — runs every 60 seconds.
-    More frequent than the general 5-min agent cycle so AI agents
-    reliably participate in fast games (casual = 18-min phases).
+    Dispatch AI agent actions — runs every 15 seconds.
+    Fans out one werewolf_game_agents_task per active game so games run in
+    parallel across workers and a slow game never delays the others.
+    """
+    from app.services.agent_runner import get_active_werewolf_game_ids
+    game_ids = run_async(get_active_werewolf_game_ids())
+    for gid in game_ids:
+        # Expire with the next tick: a backlog of stale runs is never useful
+        werewolf_game_agents_task.apply_async(args=[str(gid)], expires=_AGENT_TICK_SECONDS)
+    return len(game_ids)
+
+
+@celery_app.task(name='app.tasks.werewolf.werewolf_game_agents_task', ignore_result=True)
+def werewolf_game_agents_task(game_id: str):
+    """AI players' actions (chat, vote, night action) for one game."""
+    from app.services.agent_runner import run_werewolf_game_agents
+    run_async(run_werewolf_game_agents(UUID(game_id)))
+
+
+@celery_app.task(name='app.tasks.werewolf.werewolf_prethink_task')
+def werewolf_prethink_task(game_ids=None):
+    """
+    Compute cached thinking steps (assess/analyze/strategize) for every AI
+    player as soon as a phase starts, so action cycles only pay for decisions.
     """
-    from app.services.agent_runner import run_werewolf_agent_cycle
-    run_async(run_werewolf_agent_cycle())
+    from app.services.agent_runner import run_werewolf_prethink
+    return run_async(run_werewolf_prethink(game_ids))
+
 
+@celery_app.task(name='app.tasks.werewolf.werewolf_reflect_task', ignore_result=True)
+def werewolf_reflect_task(job: dict):
+    """Generate one queued post-decision reflection (fire-and-forget)."""
+    run_async(_run_reflection(job))
 
+
+async def _run_reflection(job: dict):
+    from app.database import AsyncSessionLocal
+    from app.services.werewolf_llm_brain import run_reflection
+
+    try:
+        async with AsyncSessionLocal() as db:
+            if await run_reflection(db, job):
+                await db.commit()
+    except Exception as e:
+        logger.debug(f"Reflection failed: {e}")
@@ -4,6 +4,7 @@ import math
 
 KARMA_CAP = 500
 KARMA_START = 50
+HOT_EPOCH = datetime(2024, 1, 1)
 
 
 def calculate_hot_score(upvotes: int, downvotes: int, created_at: datetime) -> float:
@@ -22,12 +23,26 @@ def calculate_hot_score(upvotes: int, downvotes: int, created_at: datetime) -> f
         sign = 0
 
     # Seconds since epoch (using a Genesis-specific epoch)
-    genesis_epoch = datetime(2024, 1, 1)
-    seconds = (created_at - genesis_epoch).total_seconds()
+    seconds = (created_at - HOT_EPOCH).total_seconds()
 
     return round(sign * order + seconds / 45000, 7)
 
 
+def hot_score_sql(upvotes, downvotes, created_at):
+    """
+    SQL expression equivalent of calculate_hot_score().
+    Lets UPDATE statements recompute Post.hot_score from the same
+    (possibly incremented) column expressions they write.
+    """
+    from sqlalchemy import case, cast, func, Numeric
+
+    score = upvotes - downvotes
+    sign = case((score > 0, 1), (score < 0, -1), else_=0)
+    order = func.log(cast(func.greatest(func.abs(score), 1), Numeric))
+    seconds = cast(func.extract('epoch', created_at - HOT_EPOCH), Numeric)
+    return func.round(sign * order + seconds / 45000, 7)
+
+
 def get_default_limits() -> dict:
     """Return default post/vote limits (no God system)."""
     return {
@@ -70,3 +85,32 @@ async def get_daily_post_count(db, resident_id) -> int:
         )
     )
     return result.scalar() or 0
+
+
+async def get_daily_comment_count(db, resident_id) -> int:
+    """Count comments written today by a resident."""
+    from sqlalchemy import select, func, and_
+    from app.models.comment import Comment
+
+    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    result = await db.execute(
+        select(func.count(Comment.id)).where(
+            and_(
+                Comment.author_id == resident_id,
+                Comment.created_at >= today_start,
+            )
+        )
+    )
+    return result.scalar() or 0
+
+
+async def get_last_comment_time(db, resident_id):
+    """Timestamp of the resident's latest comment, or None."""
+    from sqlalchemy import select, func
+    from app.models.comment import Comment
+
+    result = await db.execute(
+        select(func.max(Comment.created_at)).where(Comment.author_id == resident_id)
+    )
+    return result.scalar()
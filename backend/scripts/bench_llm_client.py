@@ -0,0 +1,106 @@
+"""Benchmark the shared LLM client against a local stub Ollama server.
+
+Measures generations/sec with micro-batching on and off. The stub answers
+/api/chat and /api/generate after a fixed latency plus a small per-request
+cost for every request in flight, roughly like a model server
+with parallel slots.
+
+Usage (from backend/):
+    python scripts/bench_llm_client.py [--requests 200] [--latency 0.2]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_stub(port: int, latency: float) -> None:
+    import uvicorn
+    from fastapi import FastAPI
+
+    stub = FastAPI()
+    inflight = 0
+
+    async def _reply(body: dict) -> None:
+        nonlocal inflight
+        inflight += 1
+        try:
+            await asyncio.sleep(latency + 0.002 * inflight)
+        finally:
+            inflight -= 1
+
+    @stub.post("/api/chat")
+    async def chat(body: dict):
+        await _reply(body)
+        return {"message": {"role": "assistant", "content": "stub reply"}, "done": True}
+
+    @stub.post("/api/generate")
+    async def generate(body: dict):
+        await _reply(body)
+        return {"response": "stub reply", "done": True}
+
+    server = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    for _ in range(100):
+        if server.started:
+            return
+        time.sleep(0.05)
+    raise RuntimeError("stub server did not start")
+
+
+async def run(n: int, systems: int) -> dict:
+    from app.services import llm_client
+
+    async def one(i: int):
+        return await llm_client.generate(
+            f"prompt {i}", f"system prompt {i % systems}",
+            priority=llm_client.PRIORITY_SNS,
+        )
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(one(i) for i in range(n)))
+    elapsed = time.monotonic() - start
+    stats = llm_client.stats()
+    await llm_client.aclose()
+    ok = sum(1 for r in results if r)
+    return {"ok": ok, "elapsed": elapsed, "gen_per_sec": ok / elapsed, **stats}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--systems", type=int, default=8, help="distinct system prompts")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    port = _free_port()
+    start_stub(port, args.latency)
+    os.environ["OLLAMA_HOST"] = f"http://127.0.0.1:{port}"
+    os.environ["OLLAMA_CONCURRENCY"] = str(args.concurrency)
+
+    from app.config import get_settings
+
+    for label, window in (("unbatched", 0), ("batched", 25)):
+        os.environ["OLLAMA_BATCH_WINDOW_MS"] = str(window)
+        get_settings.cache_clear()
+        r = asyncio.run(run(args.requests, args.systems))
+        print(
+            f"{label:10s} {r['ok']}/{args.requests} ok in {r['elapsed']:.2f}s — "
+            f"{r['gen_per_sec']:.1f} gen/s, batches={r['batches']}, avg_batch={r['avg_batch']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
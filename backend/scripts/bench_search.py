@@ -0,0 +1,230 @@
+"""Benchmark post text search: ILIKE scan vs. tsvector/GIN vs. hybrid.
+
+Loads a synthetic corpus (Zipf-distributed vocabulary: ASCII words plus
+unspaced Japanese text, which 'simple' can't split into words) into a scratch
+schema, bench_search, with the same generated search_vector column and
+indexes as posts (migrations 029, 030), then times each query shape at every
+corpus size:
+
+- ilike:   the old _search_posts_text — ILIKE on title/content + count(*)
+- fts:     the new one — search_vector @@ query, ts_rank_cd, count() OVER ()
+- fts+trgm: fts plus the trigram title/content substring match, the
+           current _search_posts_text (the only shape that finds Japanese)
+- hybrid:  fts candidates fused with an exact vector scan of the same
+           corpus (stands in for _search_posts_vector; requires numpy and
+           holds n x 384 float32 in memory, ~1.5 GB at 1M posts)
+
+Production tables are not touched. The schema is dropped at the end.
+
+Usage (from backend/, against a scratch database):
+    python scripts/bench_search.py [--sizes 10000,100000,1000000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+SCHEMA = "bench_search"
+VOCAB = 5000
+QUERIES = {
+    "common word": "w1",
+    "mid word": "w60",
+    "rare word": "w3500",
+    "two words": "w10 w200",
+    "phrase": '"w3 w4"',
+    "ja 2 chars": "人狼",
+    "ja 3 chars": "占い師",
+    "ja rare": "吊り先",
+}
+
+
+# power(random(), 3) skews towards low ids: w0 is the most frequent word
+_WORD = f"'w' || floor(power(random(), 3) * {VOCAB})::int"
+# Japanese is written without spaces, so these are concatenated into one
+# token per title/content; most frequent first
+_JA_VOCAB = [
+    "人狼", "村人", "占い師", "投票", "処刑", "議論", "今日", "昨日", "怪しい", "信じる",
+    "霊媒師", "騎士", "狂人", "共有者", "発言", "襲撃", "護衛", "結果", "白", "黒",
+    "確定", "偽物", "本物", "対抗", "潜伏", "吊り先", "指定", "占い先", "グレー", "最終日",
+]
+_JA_WORD = (
+    "(ARRAY[" + ", ".join(f"'{w}'" for w in _JA_VOCAB) + "])"
+    f"[1 + floor(power(random(), 3) * {len(_JA_VOCAB)})::int]"
+)
+
+
+async def load_corpus(conn, n: int) -> None:
+    from sqlalchemy import text
+    from app.models.post import Post
+
+    expression = Post.__table__.c.search_vector.computed.sqltext.text
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    await conn.execute(text(f"""
+        CREATE TABLE {SCHEMA}.posts (
+            id bigint PRIMARY KEY,
+            title varchar(200) NOT NULL,
+            content text,
+            upvotes int NOT NULL DEFAULT 0,
+            created_at timestamp NOT NULL DEFAULT now(),
+            search_vector tsvector GENERATED ALWAYS AS ({expression}) STORED
+        )
+    """))
+    # The g > 0 reference makes Postgres re-evaluate the subqueries per row
+    await conn.execute(text(f"""
+        INSERT INTO {SCHEMA}.posts (id, title, content, upvotes)
+        SELECT g,
+            (SELECT string_agg({_WORD}, ' ') FROM generate_series(1, 8) WHERE g > 0) || ' ' ||
+            (SELECT string_agg({_JA_WORD}, '') FROM generate_series(1, 4) WHERE g > 0),
+            (SELECT string_agg({_WORD}, ' ') FROM generate_series(1, 60) WHERE g > 0) || ' ' ||
+            (SELECT string_agg({_JA_WORD}, '') FROM generate_series(1, 30) WHERE g > 0),
+            floor(random() * 100)::int
+        FROM generate_series(1, :n) AS g
+    """), {"n": n})
+    await conn.execute(text(f"CREATE INDEX ON {SCHEMA}.posts USING gin (search_vector)"))
+    await conn.execute(text(f"CREATE INDEX ON {SCHEMA}.posts USING gin (title gin_trgm_ops)"))
+    await conn.execute(text(f"CREATE INDEX ON {SCHEMA}.posts USING gin (content gin_trgm_ops)"))
+    await conn.execute(text(f"ANALYZE {SCHEMA}.posts"))
+
+
+def _queries(q: str) -> dict:
+    tsq = "websearch_to_tsquery('simple'::regconfig, :q)"
+    rank = f"ts_rank_cd(search_vector, {tsq}, 32)"
+    return {
+        "ilike": [
+            f"SELECT id FROM {SCHEMA}.posts WHERE title ILIKE :pattern OR content ILIKE :pattern "
+            f"ORDER BY upvotes DESC, created_at DESC LIMIT 20",
+            f"SELECT count(*) FROM {SCHEMA}.posts WHERE title ILIKE :pattern OR content ILIKE :pattern",
+        ],
+        "fts": [
+            f"SELECT id, {rank} AS rank, count(*) OVER () AS total FROM {SCHEMA}.posts "
+            f"WHERE search_vector @@ {tsq} ORDER BY rank DESC, upvotes DESC, created_at DESC LIMIT 20",
+        ],
+        "fts+trgm": [
+            f"SELECT id, greatest({rank}, CASE WHEN title ILIKE :pattern THEN 0.5 ELSE 0 END, "
+            f"CASE WHEN content ILIKE :pattern THEN 0.25 ELSE 0 END) AS rank, "
+            f"count(*) OVER () AS total FROM {SCHEMA}.posts "
+            f"WHERE search_vector @@ {tsq} OR title ILIKE :pattern OR content ILIKE :pattern "
+            f"ORDER BY rank DESC, upvotes DESC, created_at DESC LIMIT 20",
+        ],
+    }
+
+
+async def time_sql(conn, statements: list, q: str, repeat: int) -> list:
+    from sqlalchemy import text
+
+    params = {"q": q, "pattern": f"%{q.strip(chr(34))}%"}
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for statement in statements:
+            (await conn.execute(text(statement), params)).all()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+class VectorCorpus:
+    """Exact in-memory vector scan over the corpus, for the hybrid timing."""
+
+    def __init__(self, ids, matrix):
+        self.ids = ids
+        self.matrix = matrix
+
+    @classmethod
+    async def load(cls, conn):
+        import numpy as np
+        from sqlalchemy import text
+        from app.services.search import generate_embeddings
+
+        rows = (await conn.execute(text(f"SELECT id, title, content FROM {SCHEMA}.posts ORDER BY id"))).all()
+        vectors = generate_embeddings([f"{r.title} {r.content}" for r in rows], batch_size=256)
+        return cls([r.id for r in rows], np.asarray(vectors, dtype=np.float32))
+
+    def top(self, query: str, k: int) -> list:
+        import numpy as np
+        from app.services.search import generate_embedding
+
+        scores = self.matrix @ np.asarray(generate_embedding(query), dtype=np.float32)
+        top = np.argpartition(-scores, min(k, len(scores) - 1))[:k]
+        return [self.ids[i] for i in top[np.argsort(-scores[top])]]
+
+
+async def time_hybrid(conn, corpus: VectorCorpus, q: str, repeat: int) -> list:
+    from sqlalchemy import text
+    from app.services.search import HYBRID_CANDIDATES, RRF_K
+
+    statement = text(_queries(q)["fts"][0].replace("LIMIT 20", f"LIMIT {HYBRID_CANDIDATES}"))
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        lexical = [row.id for row in (await conn.execute(statement, {"q": q})).all()]
+        fused = {}
+        for ranked in (lexical, corpus.top(q, HYBRID_CANDIDATES)):
+            for rank, post_id in enumerate(ranked):
+                fused[post_id] = fused.get(post_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        sorted(fused.items(), key=lambda item: item[1], reverse=True)[:20]
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _fmt(samples: list) -> str:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"p50 {statistics.median(samples):8.1f} ms  p95 {p95:8.1f} ms"
+
+
+async def run(sizes: list, repeat: int, hybrid: bool) -> None:
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from app.config import get_settings
+
+    engine = create_async_engine(get_settings().database_url)
+    try:
+        for n in sizes:
+            async with engine.begin() as conn:
+                start = time.perf_counter()
+                await load_corpus(conn, n)
+                print(f"\n== {n:,} posts (loaded in {time.perf_counter() - start:.1f}s)")
+            async with engine.connect() as conn:
+                corpus = None
+                if hybrid:
+                    start = time.perf_counter()
+                    corpus = await VectorCorpus.load(conn)
+                    elapsed = time.perf_counter() - start
+                    print(f"   embedded in {elapsed:.1f}s ({n / elapsed:,.0f} items/sec)")
+                for label, q in QUERIES.items():
+                    for shape, statements in _queries(q).items():
+                        samples = await time_sql(conn, statements, q, repeat)
+                        print(f"   {label:12s} {shape:9s} {_fmt(samples)}")
+                    if corpus is not None:
+                        print(f"   {label:12s} {'hybrid':9s} {_fmt(await time_hybrid(conn, corpus, q, repeat))}")
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma-separated corpus sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per query")
+    parser.add_argument("--no-hybrid", action="store_true", help="skip the vector side (needs numpy)")
+    args = parser.parse_args()
+
+    hybrid = not args.no_hybrid
+    if hybrid:
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            print("numpy not installed; skipping hybrid timings")
+            hybrid = False
+    asyncio.run(run([int(s) for s in args.sizes.split(",")], args.repeat, hybrid))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Tests for API-key auth caching (app.services.auth_cache, routers.auth).
+
+Covers:
+  1. _resident_for_api_key — miss fills the cache, hit loads by id, stale
+     entries are dropped
+  2. invalidate — entries dropped after commit only
+
+No database or Redis.
+"""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.routers import auth
+from app.services import auth_cache, post_commit
+
+
+class FakeRedis:
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        value = self.data.get(key)
+        return value.encode() if value is not None else None
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class FakeResult:
+
+    def __init__(self, resident):
+        self.resident = resident
+
+    def scalar_one_or_none(self):
+        return self.resident
+
+
+class FakeDB:
+
+    def __init__(self, residents):
+        self.residents = {r.id: r for r in residents}
+        self.lookups = 0
+        self.gets = 0
+
+    async def execute(self, stmt):
+        self.lookups += 1
+        key_hash = stmt.whereclause.right.value
+        return FakeResult(next(
+            (r for r in self.residents.values() if r._api_key_hash == key_hash), None
+        ))
+
+    async def get(self, model, resident_id):
+        self.gets += 1
+        return self.residents.get(resident_id)
+
+
+def _resident(key_hash):
+    return SimpleNamespace(id=uuid.uuid4(), _api_key_hash=key_hash)
+
+
+class TestResidentForApiKey:
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_key_lookup(self):
+        alice = _resident("h1")
+        db = FakeDB([alice])
+        with patch.object(auth_cache, "get_redis", return_value=FakeRedis()):
+            assert await auth._resident_for_api_key(db, "h1") is alice
+            assert await auth._resident_for_api_key(db, "h1") is alice
+        assert (db.lookups, db.gets) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_rotated_key_is_not_served_from_cache(self):
+        alice = _resident("old")
+        db = FakeDB([alice])
+        redis = FakeRedis()
+        with patch.object(auth_cache, "get_redis", return_value=redis):
+            await auth._resident_for_api_key(db, "old")
+            alice._api_key_hash = "new"
+            assert await auth._resident_for_api_key(db, "old") is None
+        assert redis.data == {}
+
+    @pytest.mark.asyncio
+    async def test_unknown_key_is_not_cached(self):
+        db = FakeDB([])
+        redis = FakeRedis()
+        with patch.object(auth_cache, "get_redis", return_value=redis):
+            assert await auth._resident_for_api_key(db, "nope") is None
+        assert redis.data == {}
+
+
+class TestInvalidate:
+
+    @pytest.mark.asyncio
+    async def test_dropped_after_commit_only(self):
+        alice = _resident("h1")
+        redis = FakeRedis()
+        redis.data["auth:key:h1"] = str(alice.id)
+        with patch.object(auth_cache, "get_redis", return_value=redis):
+            session = Session()
+            session.begin()
+            auth_cache.invalidate(session, alice)
+            session.rollback()
+            await post_commit.flush(session)
+            assert "auth:key:h1" in redis.data
+
+            session.begin()
+            auth_cache.invalidate(session, alice)
+            session.commit()
+            await post_commit.flush(session)
+            assert redis.data == {}
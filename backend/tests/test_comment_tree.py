@@ -0,0 +1,71 @@
+"""
+Tests for comment threading (app.routers.comments / app.models.comment).
+
+Covers:
+  1. build_comment_tree — single-pass nesting, sibling order, orphans
+  2. Comment.place_in_thread — materialized depth/path
+
+Pure Python, no database.
+"""
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.models.comment import Comment
+from app.routers.comments import build_comment_tree
+
+_AUTHOR = SimpleNamespace(id=uuid.uuid4(), name="tester", avatar_url=None)
+
+
+def _comment(parent=None, depth=0):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        post_id=uuid.UUID(int=1),
+        author=_AUTHOR,
+        parent_id=parent.id if parent else None,
+        content="hi",
+        upvotes=0,
+        downvotes=0,
+        created_at=datetime(2026, 1, 1),
+        depth=depth,
+    )
+
+
+class TestBuildCommentTree:
+
+    def test_nests_in_one_pass_keeping_order(self):
+        a = _comment()
+        b = _comment()
+        a1 = _comment(a, 1)
+        a2 = _comment(a, 1)
+        a1x = _comment(a1, 2)
+        tree = build_comment_tree([a, b, a1, a2, a1x], {a1.id: 1})
+        assert [n.id for n in tree] == [a.id, b.id]
+        assert [n.id for n in tree[0].replies] == [a1.id, a2.id]
+        assert tree[0].replies[0].replies[0].id == a1x.id
+        assert tree[0].replies[0].user_vote == 1
+        assert tree[1].replies == []
+
+    def test_subtree_root_and_orphans(self):
+        root = _comment()
+        child = _comment(root, 1)
+        grandchild = _comment(child, 2)
+        orphan = _comment(_comment(), 1)
+        tree = build_comment_tree([child, grandchild, orphan], {}, parent_id=root.id)
+        assert [n.id for n in tree] == [child.id]
+        assert tree[0].replies[0].id == grandchild.id
+
+
+class TestPlaceInThread:
+
+    def test_depth_and_path(self):
+        root = Comment(content="a")
+        root.place_in_thread(None)
+        reply = Comment(content="b")
+        reply.place_in_thread(root)
+        assert root.depth == 0 and root.path == root.id.hex
+        assert reply.depth == 1
+        assert reply.path == root.id.hex + reply.id.hex
+        # Descendants sort inside the parent's range under "C" collation
+        assert root.path < reply.path < root.path + "g"
@@ -0,0 +1,235 @@
+"""
+Tests for the shared Ollama client pipeline (app.services.llm_client).
+
+Covers:
+  1. PriorityLimiter — concurrency cap and lane ordering
+  2. CircuitBreaker — open / half-open / close transitions, lost probes
+  3. MicroBatcher — window flush, prefix grouping, cancellation
+
+Pure asyncio, no network.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.services import llm_client
+from app.services.llm_client import (
+    CircuitBreaker,
+    MicroBatcher,
+    PriorityLimiter,
+    PRIORITY_CRITICAL,
+    PRIORITY_GAME,
+    PRIORITY_SNS,
+)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 1. PRIORITY LIMITER
+# ═══════════════════════════════════════════════════════════════════════════
+
+class TestPriorityLimiter:
+
+    @pytest.mark.asyncio
+    async def test_caps_concurrency(self):
+        limiter = PriorityLimiter(2)
+        peak = 0
+
+        async def worker():
+            nonlocal peak
+            await limiter.acquire(PRIORITY_SNS)
+            try:
+                peak = max(peak, limiter.active)
+                await asyncio.sleep(0.01)
+            finally:
+                limiter.release()
+
+        await asyncio.gather(*(worker() for _ in range(6)))
+        assert peak == 2
+        assert limiter.active == 0
+
+    @pytest.mark.asyncio
+    async def test_waiters_served_by_priority(self):
+        limiter = PriorityLimiter(1)
+        await limiter.acquire(PRIORITY_SNS)  # hold the only slot
+        order = []
+
+        async def waiter(priority, label):
+            await limiter.acquire(priority)
+            order.append(label)
+            limiter.release()
+
+        tasks = [
+            asyncio.create_task(waiter(PRIORITY_SNS, "sns")),
+            asyncio.create_task(waiter(PRIORITY_GAME, "game")),
+            asyncio.create_task(waiter(PRIORITY_CRITICAL, "critical")),
+        ]
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(*tasks)
+        assert order == ["critical", "game", "sns"]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        limiter = PriorityLimiter(1)
+        await limiter.acquire()
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        limiter.release()
+        assert limiter.active == 0
+        await asyncio.wait_for(limiter.acquire(), timeout=0.1)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 2. CIRCUIT BREAKER
+# ═══════════════════════════════════════════════════════════════════════════
+
+class TestCircuitBreaker:
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(threshold=3, cooldown=30)
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.allow() is False
+
+    def test_half_open_allows_single_probe(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=30)
+        with patch("app.services.llm_client.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("app.services.llm_client.time.monotonic", return_value=131.0):
+            assert breaker.state == "half_open"
+            assert breaker.allow() is True
+            assert breaker.allow() is False
+
+    def test_success_closes(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=0)
+        breaker.record_failure()
+        assert breaker.allow() is True  # half-open probe
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.failures == 0
+
+    def test_stale_probe_is_replaced(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=30)
+        with patch("app.services.llm_client.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("app.services.llm_client.time.monotonic", return_value=131.0):
+            assert breaker.allow() is True
+        with patch("app.services.llm_client.time.monotonic", return_value=150.0):
+            assert breaker.allow() is False
+        with patch("app.services.llm_client.time.monotonic", return_value=161.0):
+            assert breaker.allow() is True
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_frees_half_open_slot(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=30)
+        breaker.record_failure()
+        breaker.opened_at -= 30  # cooldown elapsed: half-open
+        started = asyncio.Event()
+
+        async def hang(*args, **kwargs):
+            started.set()
+            await asyncio.sleep(10)
+
+        state = SimpleNamespace(breaker=breaker, client=SimpleNamespace(post=hang))
+        task = asyncio.create_task(llm_client._post(state, "/api/chat", {}))
+        await started.wait()
+        assert breaker.allow() is False  # probe outstanding
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert breaker.allow() is True
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_resolves_probe(self):
+        breaker = CircuitBreaker(threshold=1, cooldown=0)
+        breaker.record_failure()
+        post = AsyncMock(side_effect=httpx.DecodingError("bad gzip"))
+        state = SimpleNamespace(breaker=breaker, client=SimpleNamespace(post=post))
+        with pytest.raises(httpx.DecodingError):
+            await llm_client._post(state, "/api/chat", {})
+        assert breaker.failures == 2
+        assert breaker.allow() is True
+
+
+class TestGenerateOne:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("body", [b"not json", b"[1, 2]", b'{"message": "x"}'])
+    async def test_unreadable_body_returns_none(self, body):
+        response = httpx.Response(
+            200, content=body, request=httpx.Request("POST", "http://ollama/api/chat")
+        )
+        state = SimpleNamespace(
+            limiter=PriorityLimiter(1),
+            breaker=CircuitBreaker(threshold=1, cooldown=30),
+            client=SimpleNamespace(post=AsyncMock(return_value=response)),
+            generations=0,
+            generation_seconds=0.0,
+        )
+        result = await llm_client._generate_one(state, "/api/chat", {}, PRIORITY_SNS)
+        assert result is None
+        assert state.generations == 0
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# 3. MICRO-BATCHER
+# ═══════════════════════════════════════════════════════════════════════════
+
+class TestMicroBatcher:
+
+    @pytest.mark.asyncio
+    async def test_groups_by_key_and_prefix(self):
+        started = []
+
+        async def dispatch(item):
+            started.append(item)
+            return item.upper()
+
+        batcher = MicroBatcher(window=0.01, max_batch=10, dispatch=dispatch)
+        futs = [
+            batcher.submit("m1", "sys-b", "b1"),
+            batcher.submit("m2", "sys-a", "x1"),
+            batcher.submit("m1", "sys-a", "a1"),
+            batcher.submit("m1", "sys-b", "b2"),
+        ]
+        results = await asyncio.gather(*futs)
+        assert results == ["B1", "X1", "A1", "B2"]
+        assert started == ["a1", "b1", "b2", "x1"]
+        assert batcher.batches == 1
+
+    @pytest.mark.asyncio
+    async def test_flushes_at_max_batch(self):
+        async def dispatch(item):
+            return item
+
+        batcher = MicroBatcher(window=10.0, max_batch=2, dispatch=dispatch)
+        f1 = batcher.submit("k", "", 1)
+        f2 = batcher.submit("k", "", 2)
+        assert await asyncio.wait_for(asyncio.gather(f1, f2), timeout=0.1) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_cancels_dispatch(self):
+        cancelled = asyncio.Event()
+
+        async def dispatch(item):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        batcher = MicroBatcher(window=0.0, max_batch=1, dispatch=dispatch)
+        fut = batcher.submit("k", "", 1)
+        await asyncio.sleep(0)
+        fut.cancel()
+        await asyncio.wait_for(cancelled.wait(), timeout=0.1)
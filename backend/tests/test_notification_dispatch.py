@@ -0,0 +1,108 @@
+"""
+Tests for batched notification dispatch (app.services.notification_dispatch).
+
+Covers:
+  1. note — intents queued only after commit, dropped on rollback
+  2. _rows — one lookup per kind for a whole batch, self-mentions skipped,
+     malformed intents set aside without failing the batch
+
+No database or Redis: the session is a stub answering queries in order.
+"""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.services import notification_dispatch as dispatch
+from app.services import post_commit
+
+
+class TestNote:
+
+    @pytest.mark.asyncio
+    async def test_enqueued_after_commit_only(self):
+        queued = []
+
+        async def _record(db, intents):
+            queued.append(intents)
+
+        with patch.dict(post_commit._handlers, {"notification_dispatch": _record}):
+            session = Session()
+            session.begin()
+            dispatch.note(session, "vote", actor_id=uuid.uuid4(), target_type="post", target_id=uuid.uuid4())
+            session.rollback()
+            await post_commit.flush(session)
+            assert queued == []
+
+            session.begin()
+            dispatch.note(session, "comment", actor_id="a", post_id="p", parent_id=None)
+            session.commit()
+            await post_commit.flush(session)
+            assert queued == [[{"kind": "comment", "actor_id": "a", "post_id": "p", "parent_id": None}]]
+
+
+class _Result:
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def scalars(self):
+        return self
+
+
+class _StubSession:
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        return _Result(self.answers.pop(0))
+
+
+class TestRows:
+
+    @pytest.mark.asyncio
+    async def test_mentions_resolved_in_one_query(self):
+        author = SimpleNamespace(id=uuid.uuid4(), name="alice")
+        bob, carol = uuid.uuid4(), uuid.uuid4()
+        post_id, comment_id = uuid.uuid4(), uuid.uuid4()
+        intents = [
+            {"kind": "mention", "actor_id": str(author.id), "content": "hi @bob @carol @alice @ghost",
+             "target_type": "comment", "target_id": str(comment_id), "post_id": str(post_id)},
+            {"kind": "mention", "actor_id": str(author.id), "content": "again @bob",
+             "target_type": "post", "target_id": str(post_id), "post_id": str(post_id)},
+        ]
+        db = _StubSession(
+            [author],
+            [SimpleNamespace(name="bob", id=bob), SimpleNamespace(name="carol", id=carol),
+             SimpleNamespace(name="alice", id=author.id)],
+        )
+        rows, actors, failed = await dispatch._rows(db, intents)
+
+        assert failed == []
+        assert db.queries == 2
+        assert [r["recipient_id"] for r in rows] == [bob, carol, bob]
+        assert rows[0]["link"] == f"/post/{post_id}#comment-{comment_id}"
+        assert rows[0]["title"] == "alice mentioned you"
+        assert actors == {author.id: author}
+
+    @pytest.mark.asyncio
+    async def test_malformed_intents_set_aside(self):
+        bob = uuid.uuid4()
+        intents = [
+            {"kind": "vote", "actor_id": "not-a-uuid", "target_type": "post", "target_id": str(uuid.uuid4())},
+            {"kind": "direct", "recipient_ids": [str(bob)], "type": "system", "title": None},
+            {"kind": "direct", "recipient_ids": [str(bob)], "type": "system", "title": "Resident eliminated"},
+        ]
+        rows, _, failed = await dispatch._rows(_StubSession(), intents)
+
+        assert [i for i, _ in failed] == intents[:2]
+        assert [(r["recipient_id"], r["title"]) for r in rows] == [(bob, "Resident eliminated")]
@@ -0,0 +1,106 @@
+"""
+Tests for the notification stream (app.services.notification_stream).
+
+Covers:
+  1. _apply — counter adjustments, then one publish per change
+  2. note_* — changes applied after commit only
+
+No database or Redis.
+"""
+
+import json
+import uuid
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.services import notification_stream as stream
+from app.services import post_commit
+
+
+class FakePipeline:
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def eval(self, script, numkeys, *args):
+        self.calls.append(("eval", args))
+
+    def publish(self, channel, message):
+        self.calls.append(("publish", (channel, message)))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self):
+        self.client.executed.append(self.calls)
+        return [self.client.counts.pop(0) for c in self.calls if c[0] == "eval"]
+
+
+class FakeRedis:
+
+    def __init__(self, counts):
+        self.counts = list(counts)
+        self.executed = []
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+
+class TestApply:
+
+    @pytest.mark.asyncio
+    async def test_adjusts_then_publishes(self):
+        alice, bob = uuid.uuid4(), uuid.uuid4()
+        changes = [
+            (alice, 1, 1, False, {"id": "n1"}),
+            (bob, 0, 0, True, None),
+        ]
+        fake = FakeRedis([3, 0])
+        with patch.object(stream, "get_redis", return_value=fake):
+            await stream._apply(None, changes)
+
+        adjust, publish = fake.executed
+        assert [args[2:5] for _, args in adjust] == [(1, 1, "0"), (0, 0, "1")]
+        messages = {channel: json.loads(message) for _, (channel, message) in publish}
+        assert messages[f"notif:{alice}"] == {"type": "notification", "notification": {"id": "n1"}, "unread": 3}
+        assert messages[f"notif:{bob}"] == {"type": "unread", "count": 0}
+
+    @pytest.mark.asyncio
+    async def test_uncached_count_is_not_published(self):
+        alice = uuid.uuid4()
+        fake = FakeRedis([None, None])
+        with patch.object(stream, "get_redis", return_value=fake):
+            await stream._apply(None, [(alice, 1, 1, False, {"id": "n1"}), (alice, -1, 0, False, None)])
+        _, publish = fake.executed
+        assert [json.loads(m) for _, (_, m) in publish] == [{"type": "notification", "notification": {"id": "n1"}}]
+
+
+class TestPending:
+
+    @pytest.mark.asyncio
+    async def test_applied_after_commit_only(self):
+        applied = []
+
+        async def _record(db, changes):
+            applied.append(changes)
+
+        alice = uuid.uuid4()
+        with patch.dict(post_commit._handlers, {"notification_stream": _record}):
+            session = Session()
+            session.begin()
+            stream.note_read(session, alice)
+            session.rollback()
+            await post_commit.flush(session)
+            assert applied == []
+
+            session.begin()
+            stream.note_all_read(session, alice)
+            session.commit()
+            await post_commit.flush(session)
+            assert applied == [[(alice, 0, 0, True, None)]]
@@ -0,0 +1,56 @@
+"""
+Tests for post-commit side effects (app.services.post_commit).
+
+Covers:
+  1. defer — items reach their handler only after a commit, dropped on rollback
+  2. flush — a failing handler doesn't stop the others
+
+No database: a bare Session fires the commit/rollback events.
+"""
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.services import post_commit
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    calls = []
+    monkeypatch.setattr(post_commit, "_handlers", {})
+
+    @post_commit.handler("first")
+    async def _first(db, items):
+        raise RuntimeError("redis down")
+
+    @post_commit.handler("second")
+    async def _second(db, items):
+        calls.append(items)
+
+    return calls
+
+
+class TestPostCommit:
+
+    @pytest.mark.asyncio
+    async def test_committed_items_only(self, handlers):
+        session = Session()
+        session.begin()
+        post_commit.defer(session, "second", "rolled back")
+        session.rollback()
+        await post_commit.flush(session)
+        assert handlers == []
+
+        session.begin()
+        post_commit.defer(session, "first", "a")
+        post_commit.defer(session, "second", "b")
+        post_commit.defer(session, "second", "c")
+        await post_commit.flush(session)
+        assert handlers == []  # not committed yet
+
+        session.commit()
+        await post_commit.flush(session)
+        assert handlers == [["b", "c"]]
+
+        await post_commit.flush(session)
+        assert handlers == [["b", "c"]]
@@ -0,0 +1,83 @@
+"""
+Tests for embedding generation (app.services.search).
+
+Covers:
+  1. generate_embeddings — batch output matches per-text generate_embedding
+  2. _fallback_embedding — stable across processes, unit length
+  3. VectorIndex (app.services.vector_index) — build and query (needs numpy)
+
+No database or model download.
+"""
+
+import os
+import subprocess
+import sys
+import uuid
+
+import pytest
+
+from app.services.search import (
+    EMBEDDING_DIM,
+    _fallback_embedding,
+    cosine_similarity,
+    generate_embedding,
+    generate_embeddings,
+)
+
+
+class TestGenerateEmbeddings:
+
+    def test_batch_matches_single(self):
+        texts = ["the quick brown fox", "", "   ", "jumps over the lazy dog"]
+        batch = generate_embeddings(texts)
+        assert len(batch) == len(texts)
+        for text, vector in zip(texts, batch):
+            assert len(vector) == EMBEDDING_DIM
+            assert vector == generate_embedding(text)
+
+    def test_empty_batch(self):
+        assert generate_embeddings([]) == []
+
+
+class TestFallbackEmbedding:
+
+    def test_stable_across_hash_seeds(self):
+        code = "from app.services.search import _fallback_embedding as f; print(f('stable hashing test')[:8])"
+        outputs = set()
+        for seed in ("1", "2"):
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            outputs.add(subprocess.run(
+                [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True,
+            ).stdout.strip().splitlines()[-1])
+        assert len(outputs) == 1
+
+    def test_unit_length_and_similarity(self):
+        a = _fallback_embedding("cats chase mice in the garden")
+        b = _fallback_embedding("the cats chase mice")
+        c = _fallback_embedding("quarterly budget spreadsheet review")
+        assert abs(sum(x * x for x in a) - 1.0) < 1e-9
+        assert cosine_similarity(a, b) > cosine_similarity(a, c)
+
+
+class TestVectorIndex:
+
+    def test_build_and_search(self, tmp_path):
+        np = pytest.importorskip("numpy")
+        from app.services.vector_index import VectorIndex, write_build, _normalize
+
+        rng = np.random.default_rng(1)
+        count = 400
+        raw = _normalize(rng.normal(size=(count, 16)).astype(np.float32))
+        ids = [uuid.uuid4() for _ in range(count)]
+        id_bytes = np.array([list(i.bytes) for i in ids], dtype=np.uint8)
+        nlist = write_build(tmp_path, raw, id_bytes, count, "test-model")
+
+        index = VectorIndex(tmp_path)
+        assert len(index) == count and index.model_name == "test-model"
+        assert index.offsets[-1] == count and len(index.centroids) == nlist
+
+        # Exhaustive probe is exact
+        hits = index.search(raw[7], k=5, nprobe=nlist)
+        assert hits[0][0] == ids[7] and hits[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert [s for _, s in hits] == sorted((s for _, s in hits), reverse=True)
+        assert np.allclose(index.vector_for(ids[7]), raw[7])
@@ -0,0 +1,51 @@
+"""
+Tests for text search (app.services.search).
+
+Covers:
+  1. Japanese queries — the 'simple' parser doesn't split unspaced text into
+     words, so posts, comments and residents also match substrings, at any
+     query length
+
+No database: a stub session captures the statement, compiled for PostgreSQL.
+"""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import search
+
+
+class _Result:
+
+    def all(self):
+        return []
+
+
+class _StubSession:
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(str(statement.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True},
+        )))
+        return _Result()
+
+
+class TestJapaneseSubstring:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("query", ["人狼", "占い師"])
+    async def test_substring_branches(self, query):
+        db = _StubSession()
+        assert await search._search_posts_text(db, query, 20, None, 0) == ([], 0)
+        assert await search.search_comments(db, query) == ([], 0)
+        assert await search.search_residents(db, query) == ([], 0)
+
+        posts, comments, residents = db.statements
+        pattern = f"'%%{query}%%'"
+        assert f"posts.title ILIKE {pattern}" in posts
+        assert f"posts.content ILIKE {pattern}" in posts
+        assert f"comments.content ILIKE {pattern}" in comments
+        assert f"residents.description ILIKE {pattern}" in residents
@@ -0,0 +1,105 @@
+"""
+Tests for the Phantom Night WebSocket gateway (app.services.ws_manager).
+
+Covers:
+  1. _message — scope batching and dedupe
+  2. redact — deltas downgraded to refresh scopes for non-players
+  3. Gateway.dispatch — per-game fan-out, redacted and lagging clients
+  4. Coalescer — scopes merged per game within the window
+
+Pure asyncio, no Redis.
+"""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.services.ws_manager import CLIENT_QUEUE_SIZE, Coalescer, Gateway, _LAGGING, _message, redact
+
+
+async def _idle(self):
+    await asyncio.Event().wait()
+
+
+class TestMessage:
+
+    def test_batches_and_dedupes_scopes(self):
+        msg = json.loads(_message(["game", "chat", "game"]))
+        assert msg == {"type": "refresh", "scopes": ["game", "chat"]}
+        assert json.loads(_message(["votes"]))["scope"] == "votes"
+
+
+class TestRedact:
+
+    def test_delta_becomes_refresh_with_same_seq(self):
+        chat = json.dumps({"seq": 7, "type": "chat", "messages": [{"content": "secret"}]})
+        assert json.loads(redact(chat)) == {"type": "refresh", "scopes": ["chat"], "scope": "chat", "seq": 7}
+        phase = json.loads(redact(json.dumps({"seq": 8, "type": "phase", "game": {}})))
+        assert "game" in phase["scopes"] and "votes" in phase["scopes"] and "game" not in phase
+
+    def test_refresh_passes_through(self):
+        refresh = '{"seq":3,"type":"refresh","scopes":["phantom_chat"]}'
+        assert redact(refresh) == refresh
+
+
+class TestGateway:
+
+    @pytest.mark.asyncio
+    async def test_fans_out_to_game_clients_only(self):
+        with patch.object(Gateway, "_run", _idle):
+            gateway = Gateway()
+            a1, a2, b = gateway.register("a"), gateway.register("a"), gateway.register("b")
+            gateway.dispatch("a", "x")
+            assert a1.get_nowait() == "x" and a2.get_nowait() == "x"
+            assert b.empty()
+
+            gateway.unregister("a", a1)
+            gateway.unregister("a", a2)
+            assert gateway.client_count == 1
+            await gateway.close()
+
+    @pytest.mark.asyncio
+    async def test_lagging_client_is_flagged(self):
+        with patch.object(Gateway, "_run", _idle):
+            gateway = Gateway()
+            queue = gateway.register("a")
+            for i in range(CLIENT_QUEUE_SIZE + 1):
+                gateway.dispatch("a", str(i))
+            assert queue.qsize() == 1 and queue.get_nowait() is _LAGGING
+            await gateway.close()
+
+    @pytest.mark.asyncio
+    async def test_redacted_clients_get_refresh(self):
+        with patch.object(Gateway, "_run", _idle):
+            gateway = Gateway()
+            player, spectator = gateway.register("a"), gateway.register("a", redacted=True)
+            delta = json.dumps({"seq": 1, "type": "votes", "votes": {"tally": []}})
+            gateway.dispatch("a", delta)
+            assert player.get_nowait() == delta
+            assert json.loads(spectator.get_nowait())["scopes"] == ["votes"]
+            await gateway.close()
+
+
+class TestCoalescer:
+
+    @pytest.mark.asyncio
+    async def test_merges_scopes_per_game(self):
+        sent = []
+
+        async def publish_batch(batch):
+            sent.append(batch)
+
+        with patch("app.services.ws_manager._apublish_batch", publish_batch):
+            coalescer = Coalescer(window=0.01)
+            coalescer.add("a", "chat")
+            coalescer.add("a", "votes", "chat")
+            coalescer.add("b", "game")
+            assert sent == []
+            await asyncio.sleep(0.05)
+            assert sent == [{"a": ["chat", "votes"], "b": ["game"]}]
+
+            coalescer.add("a", "votes")
+            await coalescer.drain()
+            assert sent[-1] == {"a": ["votes"]}
@@ -1,10 +1,10 @@
 'use client'
 
-import { useState, useEffect, useCallback } from 'react'
+import { useState, useEffect, useCallback, useRef } from 'react'
 import { Ghost, XCircle } from 'lucide-react'
-import { api, WerewolfGame, WerewolfMyRole, WerewolfPlayer, WerewolfEvent } from '@/lib/api'
+import { api, ChatMessage, WerewolfDayVotes, WerewolfGame, WerewolfMyRole, WerewolfPlayer, WerewolfEvent } from '@/lib/api'
 import { useAuthStore } from '@/stores/authStore'
-import { useGameWebSocket, RefreshScope } from '@/hooks/useGameWebSocket'
+import { useGameWebSocket, GameDelta, RefreshScope } from '@/hooks/useGameWebSocket'
 import {
   GameBanner,
   RoleCard,
@@ -30,6 +30,8 @@ export default function WerewolfPage() {
   const [chatTrigger, setChatTrigger] = useState(0)
   const [phantomChatTrigger, setPhantomChatTrigger] = useState(0)
   const [votesTrigger, setVotesTrigger] = useState(0)
+  const [incomingChat, setIncomingChat] = useState<ChatMessage[]>([])
+  const [liveVotes, setLiveVotes] = useState<WerewolfDayVotes | null>(null)
 
   const fetchData = useCallback(async () => {
     try {
@@ -80,14 +82,66 @@ export default function WerewolfPage() {
     }
   }, [fetchData])
 
-  const { notify } = useGameWebSocket({
+  const fetchMyRole = useCallback(async () => {
+    if (!resident) return
+    try {
+      setMyRole(await api.werewolfMyRole())
+    } catch {
+      setMyRole(null)
+    }
+  }, [resident])
+
+  // Apply server-computed state changes; REST is only for the initial snapshot
+  const handleDelta = useCallback((delta: GameDelta) => {
+    switch (delta.type) {
+      case 'chat':
+        setIncomingChat(delta.messages)
+        break
+      case 'votes':
+        setLiveVotes(delta.votes)
+        break
+      case 'players':
+        setPlayers(delta.players)
+        break
+      case 'game':
+        setGame(delta.game)
+        break
+      case 'phase':
+        setGame(delta.game)
+        setPlayers(delta.players)
+        setLiveVotes(delta.votes)
+        setEvents(prev => {
+          const seen = new Set(prev.map(e => e.id))
+          return [...delta.events.filter(e => !seen.has(e.id)), ...prev]
+        })
+        if (delta.messages.length > 0) setIncomingChat(delta.messages)
+        // Deaths and investigation results change the private role view
+        fetchMyRole()
+        break
+    }
+  }, [fetchMyRole])
+
+  const handleWSReset = useCallback(() => {
+    fetchData()
+    setChatTrigger(c => c + 1)
+    setVotesTrigger(c => c + 1)
+  }, [fetchData])
+
+  const { live } = useGameWebSocket({
     gameId: game?.id && game.status !== 'preparing' && game.status !== 'finished' ? game.id : null,
+    onDelta: handleDelta,
     onRefresh: handleWSRefresh,
+    onReset: handleWSReset,
   })
+  const liveRef = useRef(live)
+  liveRef.current = live
 
   useEffect(() => {
     fetchData()
-    const interval = setInterval(fetchData, 30000)
+    // Polling is the fallback while the socket is down
+    const interval = setInterval(() => {
+      if (!liveRef.current) fetchData()
+    }, 30000)
     return () => clearInterval(interval)
   }, [fetchData])
 
@@ -180,7 +234,8 @@ export default function WerewolfPage() {
         <div className="flex-1 mt-2 min-h-0">
           <ChatWindow
             refreshTrigger={chatTrigger}
-            onMessageSent={() => notify('chat')}
+            incoming={incomingChat}
+            live={live}
             isDay={isDay}
             isAlive={isAlive}
           />
@@ -229,7 +284,14 @@ export default function WerewolfPage() {
 
         {/* Day: Vote / Night: Action */}
         {isDay && (
-          <DayVotePanel players={players} myRole={myRole} refreshTrigger={votesTrigger} compact />
+          <DayVotePanel
+            players={players}
+            myRole={myRole}
+            refreshTrigger={votesTrigger}
+            liveVotes={liveVotes}
+            live={live}
+            compact
+          />
         )}
 
         {!isDay && myRole && (
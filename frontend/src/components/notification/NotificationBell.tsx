@@ -5,10 +5,11 @@ import Link from 'next/link'
 import { Bell, Check, Loader2 } from 'lucide-react'
 import { useNotificationStore } from '@/stores/notificationStore'
 import { useAuthStore } from '@/stores/authStore'
+import { useNotificationSocket } from '@/hooks/useNotificationSocket'
 import NotificationItem from './NotificationItem'
 import Button from '@/components/ui/Button'
 
-const POLL_INTERVAL = 30000 // 30 seconds
+const POLL_INTERVAL = 30000 // 30 seconds, only while the socket is down
 
 export default function NotificationBell() {
   const [isOpen, setIsOpen] = useState(false)
@@ -22,13 +23,21 @@ export default function NotificationBell() {
     isLoading,
     fetchNotifications,
     fetchUnreadCount,
+    setUnreadCount,
+    receiveNotification,
     markRead,
     markAllRead,
   } = useNotificationStore()
 
-  // Fetch unread count on mount and poll
+  // Count and new notifications are pushed; the socket sends the count on connect
+  const { live } = useNotificationSocket({
+    enabled: !!resident,
+    onNotification: receiveNotification,
+    onUnread: setUnreadCount,
+  })
+
   useEffect(() => {
-    if (!resident) return
+    if (!resident || live) return
 
     fetchUnreadCount()
 
@@ -37,7 +46,7 @@ export default function NotificationBell() {
     }, POLL_INTERVAL)
 
     return () => clearInterval(interval)
-  }, [resident, fetchUnreadCount])
+  }, [resident, live, fetchUnreadCount])
 
   // Fetch notifications when dropdown opens
   useEffect(() => {
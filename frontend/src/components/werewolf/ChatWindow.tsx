@@ -8,12 +8,23 @@ import { Send, MessageCircle, Info } from 'lucide-react'
 
 interface ChatWindowProps {
   refreshTrigger?: number
+  // New messages pushed over the game socket
+  incoming?: ChatMessage[]
+  // Socket connected: skip the polling fallback
+  live?: boolean
   onMessageSent?: () => void
   isDay: boolean
   isAlive: boolean
 }
 
-export default function ChatWindow({ refreshTrigger, onMessageSent, isDay, isAlive }: ChatWindowProps) {
+function mergeMessages(current: ChatMessage[], added: ChatMessage[]): ChatMessage[] {
+  const seen = new Set(current.map((m) => m.id))
+  const fresh = added.filter((m) => !seen.has(m.id))
+  if (fresh.length === 0) return current
+  return [...current, ...fresh].sort((a, b) => a.created_at.localeCompare(b.created_at))
+}
+
+export default function ChatWindow({ refreshTrigger, incoming, live, onMessageSent, isDay, isAlive }: ChatWindowProps) {
   const { resident } = useAuthStore()
   const [messages, setMessages] = useState<ChatMessage[]>([])
   const [input, setInput] = useState('')
@@ -24,6 +35,8 @@ export default function ChatWindow({ refreshTrigger, onMessageSent, isDay, isAli
   const containerRef = useRef<HTMLDivElement>(null)
   const prevCountRef = useRef(0)
   const isAtBottomRef = useRef(true)
+  const liveRef = useRef(live)
+  liveRef.current = live
 
   const scrollToBottom = useCallback(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' })
@@ -52,12 +65,28 @@ export default function ChatWindow({ refreshTrigger, onMessageSent, isDay, isAli
     }
   }, [scrollToBottom])
 
+  const addMessages = useCallback((added: ChatMessage[]) => {
+    setMessages((current) => {
+      const merged = mergeMessages(current, added)
+      prevCountRef.current = merged.length
+      return merged
+    })
+    if (isAtBottomRef.current) setTimeout(scrollToBottom, 50)
+  }, [scrollToBottom])
+
   useEffect(() => {
     fetchMessages(true)
-    const interval = setInterval(() => fetchMessages(false), 15000)
+    const interval = setInterval(() => {
+      if (!liveRef.current) fetchMessages(false)
+    }, 15000)
     return () => clearInterval(interval)
   }, [fetchMessages])
 
+  // Pushed messages
+  useEffect(() => {
+    if (incoming && incoming.length > 0) addMessages(incoming)
+  }, [incoming, addMessages])
+
   // WebSocket-triggered refresh
   useEffect(() => {
     if (refreshTrigger && refreshTrigger > 0) {
@@ -73,9 +102,9 @@ export default function ChatWindow({ refreshTrigger, onMessageSent, isDay, isAli
     setError(null)
 
     try {
-      await api.werewolfSendChat(text)
+      const sent = await api.werewolfSendChat(text)
       setInput('')
-      await fetchMessages(false)
+      addMessages([sent])
       onMessageSent?.()
     } catch (err) {
       setError(err instanceof Error ? err.message : 'Failed to send')
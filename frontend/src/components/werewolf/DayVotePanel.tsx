@@ -11,10 +11,13 @@ interface DayVotePanelProps {
   players: WerewolfPlayer[]
   myRole: WerewolfMyRole | null
   refreshTrigger?: number
+  // Tally pushed over the game socket
+  liveVotes?: WerewolfDayVotes | null
+  live?: boolean
   compact?: boolean
 }
 
-export default function DayVotePanel({ players, myRole, refreshTrigger, compact }: DayVotePanelProps) {
+export default function DayVotePanel({ players, myRole, refreshTrigger, liveVotes, live, compact }: DayVotePanelProps) {
   const { resident } = useAuthStore()
   const [selectedTarget, setSelectedTarget] = useState<string | null>(null)
   const [reason, setReason] = useState('')
@@ -39,9 +42,17 @@ export default function DayVotePanel({ players, myRole, refreshTrigger, compact
 
   useEffect(() => {
     fetchVotes()
+  }, [])
+
+  useEffect(() => {
+    if (live) return
     const interval = setInterval(fetchVotes, 30000)
     return () => clearInterval(interval)
-  }, [])
+  }, [live])
+
+  useEffect(() => {
+    if (liveVotes) setVoteData(liveVotes)
+  }, [liveVotes])
 
   useEffect(() => {
     if (refreshTrigger && refreshTrigger > 0) {
@@ -62,7 +73,7 @@ export default function DayVotePanel({ players, myRole, refreshTrigger, compact
         setMessage({ type: 'success', text: response.message })
         setSelectedTarget(null)
         setReason('')
-        await fetchVotes()
+        if (!live) await fetchVotes()
       } else {
         setMessage({ type: 'error', text: response.message || 'Vote failed' })
       }
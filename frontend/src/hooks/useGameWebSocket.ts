@@ -1,12 +1,34 @@
 'use client'
 
-import { useEffect, useRef, useCallback } from 'react'
+import { useEffect, useRef, useCallback, useState } from 'react'
+import { api, ChatMessage, WerewolfDayVotes, WerewolfEvent, WerewolfGame, WerewolfPlayer } from '@/lib/api'
 
 export type RefreshScope = 'comments' | 'votes' | 'game' | 'phantom_chat' | 'chat' | 'phase_change' | 'events' | 'players'
 
+// Server-computed state changes, numbered by `seq` (see backend ws_manager)
+export type GameDelta =
+  | { type: 'chat'; seq: number; messages: ChatMessage[] }
+  | { type: 'votes'; seq: number; votes: WerewolfDayVotes }
+  | { type: 'players'; seq: number; players: WerewolfPlayer[] }
+  | { type: 'game'; seq: number; game: WerewolfGame }
+  | {
+      type: 'phase'
+      seq: number
+      game: WerewolfGame
+      players: WerewolfPlayer[]
+      votes: WerewolfDayVotes
+      events: WerewolfEvent[]
+      messages: ChatMessage[]
+    }
+
+const REFRESH_DEBOUNCE_MS = 300
+
 interface UseGameWebSocketOptions {
   gameId: string | null
+  onDelta: (delta: GameDelta) => void
   onRefresh: (scope: RefreshScope) => void
+  // Missed messages are gone from the server log: reload the REST snapshot
+  onReset: () => void
 }
 
 function getWSBaseUrl(): string {
@@ -18,11 +40,44 @@ function getWSBaseUrl(): string {
   return 'ws://localhost:8000'
 }
 
-export function useGameWebSocket({ gameId, onRefresh }: UseGameWebSocketOptions) {
+export function useGameWebSocket({ gameId, onDelta, onRefresh, onReset }: UseGameWebSocketOptions) {
   const wsRef = useRef<WebSocket | null>(null)
   const reconnectRef = useRef<ReturnType<typeof setTimeout> | null>(null)
-  const onRefreshRef = useRef(onRefresh)
-  onRefreshRef.current = onRefresh
+  const handlersRef = useRef({ onDelta, onRefresh, onReset })
+  handlersRef.current = { onDelta, onRefresh, onReset }
+  // Last applied seq; null until the first hello for this game
+  const lastSeqRef = useRef<number | null>(null)
+  // While a resume is in flight, live messages wait here
+  const pendingRef = useRef<any[] | null>(null)
+  // Refresh scopes arriving close together trigger one refetch each
+  const refreshScopesRef = useRef<Set<RefreshScope>>(new Set())
+  const refreshTimerRef = useRef<ReturnType<typeof setTimeout> | null>(null)
+  const [live, setLive] = useState(false)
+
+  useEffect(() => {
+    lastSeqRef.current = null
+  }, [gameId])
+
+  const apply = useCallback((msg: any) => {
+    if (typeof msg.seq === 'number') {
+      if (lastSeqRef.current !== null && msg.seq <= lastSeqRef.current) return
+      lastSeqRef.current = msg.seq
+    }
+    if (msg.type === 'refresh') {
+      const scopes: RefreshScope[] = msg.scopes ?? (msg.scope ? [msg.scope] : [])
+      scopes.forEach((scope) => refreshScopesRef.current.add(scope))
+      if (!refreshTimerRef.current) {
+        refreshTimerRef.current = setTimeout(() => {
+          refreshTimerRef.current = null
+          const pending = Array.from(refreshScopesRef.current)
+          refreshScopesRef.current.clear()
+          pending.forEach((scope) => handlersRef.current.onRefresh(scope))
+        }, REFRESH_DEBOUNCE_MS)
+      }
+    } else {
+      handlersRef.current.onDelta(msg as GameDelta)
+    }
+  }, [])
 
   const connect = useCallback(() => {
     if (!gameId || typeof window === 'undefined') return
@@ -32,22 +87,65 @@ export function useGameWebSocket({ gameId, onRefresh }: UseGameWebSocketOptions)
       wsRef.current = null
     }
 
-    const url = `${getWSBaseUrl()}/api/v1/phantomnight/ws/${gameId}`
+    const query = lastSeqRef.current !== null ? `?since=${lastSeqRef.current}` : ''
+    const url = `${getWSBaseUrl()}/api/v1/phantomnight/ws/${gameId}${query}`
+    pendingRef.current = lastSeqRef.current !== null ? [] : null
 
     try {
       const ws = new WebSocket(url)
       wsRef.current = ws
 
+      // Credentials go in the first message, never the URL (server logs)
+      ws.onopen = () => {
+        const token = api.getToken()
+        ws.send(JSON.stringify(token ? { type: 'auth', token } : { type: 'auth' }))
+      }
+
       ws.onmessage = (event) => {
+        let msg: any
         try {
-          const msg = JSON.parse(event.data)
-          if (msg.type === 'refresh' && msg.scope) {
-            onRefreshRef.current(msg.scope as RefreshScope)
+          msg = JSON.parse(event.data)
+        } catch {
+          return
+        }
+        switch (msg.type) {
+          case 'pong':
+            return
+          case 'hello':
+            if (lastSeqRef.current === null) lastSeqRef.current = msg.seq
+            setLive(true)
+            return
+          case 'reset':
+            lastSeqRef.current = msg.seq
+            pendingRef.current = null
+            setLive(true)
+            handlersRef.current.onReset()
+            return
+          case 'resumed': {
+            const pending = pendingRef.current ?? []
+            pendingRef.current = null
+            pending.sort((a, b) => a.seq - b.seq).forEach(apply)
+            setLive(true)
+            return
           }
-        } catch { /* ignore parse errors */ }
+        }
+        if (pendingRef.current !== null) {
+          // Replayed messages come first, in order; live ones wait for 'resumed'
+          if (msg.seq === (lastSeqRef.current ?? 0) + 1) apply(msg)
+          else pendingRef.current.push(msg)
+          return
+        }
+        if (typeof msg.seq === 'number' && lastSeqRef.current !== null && msg.seq > lastSeqRef.current + 1) {
+          // Gap: ask for the missing messages and hold this one until they arrive
+          pendingRef.current = [msg]
+          ws.send(JSON.stringify({ type: 'resume', since: lastSeqRef.current }))
+          return
+        }
+        apply(msg)
       }
 
       ws.onclose = () => {
+        setLive(false)
         reconnectRef.current = setTimeout(connect, 3000)
       }
 
@@ -57,7 +155,7 @@ export function useGameWebSocket({ gameId, onRefresh }: UseGameWebSocketOptions)
     } catch {
       reconnectRef.current = setTimeout(connect, 5000)
     }
-  }, [gameId])
+  }, [gameId, apply])
 
   useEffect(() => {
     connect()
@@ -71,18 +169,15 @@ export function useGameWebSocket({ gameId, onRefresh }: UseGameWebSocketOptions)
     return () => {
       clearInterval(pingInterval)
       if (reconnectRef.current) clearTimeout(reconnectRef.current)
+      if (refreshTimerRef.current) clearTimeout(refreshTimerRef.current)
+      refreshTimerRef.current = null
       if (wsRef.current) {
         wsRef.current.onclose = null
         wsRef.current.close()
       }
+      setLive(false)
     }
   }, [connect])
 
-  const notify = useCallback((scope: RefreshScope) => {
-    if (wsRef.current?.readyState === WebSocket.OPEN) {
-      wsRef.current.send(JSON.stringify({ type: 'notify', scope }))
-    }
-  }, [])
-
-  return { notify }
+  return { live }
 }
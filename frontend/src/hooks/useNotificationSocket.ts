@@ -0,0 +1,83 @@
+'use client'
+
+import { useEffect, useRef, useState } from 'react'
+import { api, Notification } from '@/lib/api'
+
+interface UseNotificationSocketOptions {
+  enabled: boolean
+  onNotification: (notification: Notification, unread?: number) => void
+  onUnread: (count: number) => void
+}
+
+function getWSBaseUrl(): string {
+  if (typeof window === 'undefined') return ''
+  const host = window.location.host
+  if (host.includes('genesis-pj.net')) {
+    return 'wss://api.genesis-pj.net'
+  }
+  return 'ws://localhost:8000'
+}
+
+// New notifications and unread counts pushed by the server; `live` is false
+// while disconnected so callers can fall back to polling.
+export function useNotificationSocket({ enabled, onNotification, onUnread }: UseNotificationSocketOptions) {
+  const handlersRef = useRef({ onNotification, onUnread })
+  handlersRef.current = { onNotification, onUnread }
+  const [live, setLive] = useState(false)
+
+  useEffect(() => {
+    if (!enabled || typeof window === 'undefined') return
+    let ws: WebSocket | null = null
+    let reconnect: ReturnType<typeof setTimeout> | null = null
+    let closed = false
+
+    const connect = () => {
+      const token = api.getToken()
+      if (!token) return
+      const socket = new WebSocket(`${getWSBaseUrl()}/api/v1/notifications/ws`)
+      ws = socket
+
+      // Credentials go in the first message, never the URL (server logs)
+      socket.onopen = () => {
+        socket.send(JSON.stringify({ type: 'auth', token }))
+      }
+
+      socket.onmessage = (event) => {
+        try {
+          const msg = JSON.parse(event.data)
+          if (msg.type === 'notification') {
+            handlersRef.current.onNotification(msg.notification, msg.unread)
+          } else if (msg.type === 'unread') {
+            setLive(true)
+            handlersRef.current.onUnread(msg.count)
+          }
+        } catch { /* ignore parse errors */ }
+      }
+
+      socket.onclose = (event) => {
+        setLive(false)
+        // 4401: not authenticated, 1008: rejected handshake; don't retry
+        if (!closed && event.code !== 4401 && event.code !== 1008) reconnect = setTimeout(connect, 5000)
+      }
+
+      socket.onerror = () => {
+        socket.close()
+      }
+    }
+
+    connect()
+    const pingInterval = setInterval(() => {
+      if (ws?.readyState === WebSocket.OPEN) ws.send('ping')
+    }, 30000)
+
+    return () => {
+      closed = true
+      clearInterval(pingInterval)
+      if (reconnect) clearTimeout(reconnect)
+      ws?.close()
+      setLive(false)
+    }
+  }, [enabled])
+
+  return { live }
+}
@@ -11,6 +11,8 @@ interface NotificationState {
 
   fetchNotifications: (unreadOnly?: boolean, limit?: number, reset?: boolean) => Promise<void>
   fetchUnreadCount: () => Promise<void>
+  setUnreadCount: (count: number) => void
+  receiveNotification: (notification: Notification, unread?: number) => void
   markRead: (id: string) => Promise<void>
   markAllRead: () => Promise<void>
   deleteNotification: (id: string) => Promise<void>
@@ -57,6 +59,20 @@ export const useNotificationStore = create<NotificationState>((set, get) => ({
     }
   },
 
+  setUnreadCount: (count: number) => set({ unreadCount: count }),
+
+  // Pushed over the notification socket
+  receiveNotification: (notification: Notification, unread?: number) => {
+    set((state) => {
+      if (state.notifications.some((n) => n.id === notification.id)) return state
+      return {
+        notifications: [notification, ...state.notifications],
+        offset: state.offset + 1,
+        unreadCount: unread ?? state.unreadCount + 1,
+      }
+    })
+  },
+
   markRead: async (id: string) => {
     try {
       await api.markNotificationRead(id)
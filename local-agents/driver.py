@@ -143,27 +143,49 @@ AGENT_TEMPLATES = [
 # ---------------------------------------------------------------------------
 # Ollama (local LLM - swap this for any LLM provider)
 # ---------------------------------------------------------------------------
+_ollama_client: Optional[httpx.AsyncClient] = None
+
+
+def get_ollama_client() -> httpx.AsyncClient:
+    """Keep-alive client shared by every generation in the current cycle."""
+    global _ollama_client
+    if _ollama_client is None or _ollama_client.is_closed:
+        _ollama_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(120.0, connect=5.0),
+            limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
+        )
+    return _ollama_client
+
+
+async def close_ollama_client():
+    """Close the shared client (each cycle runs on its own event loop)."""
+    global _ollama_client
+    if _ollama_client is not None:
+        await _ollama_client.aclose()
+        _ollama_client = None
+
+
 async def call_ollama(prompt: str, system_prompt: str = "") -> Optional[str]:
     """Call local Ollama for text generation. Replace with any LLM."""
     try:
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            resp = await client.post(
-                f"{OLLAMA_HOST}/api/generate",
-                json={
-                    "model": OLLAMA_MODEL,
-                    "prompt": prompt,
-                    "system": system_prompt,
-                    "stream": False,
-                    "options": {"temperature": 0.85, "top_p": 0.92, "repeat_penalty": 1.15},
-                },
-            )
-            if resp.status_code == 200:
-                text = resp.json().get("response", "").strip()
-                # Remove AI self-references
-                for phrase in ["As an AI", "I'm an AI", "as a language model",
-                               "I don't have personal", "as an artificial"]:
-                    text = text.replace(phrase, "")
-                return text.strip() or None
+        resp = await get_ollama_client().post(
+            f"{OLLAMA_HOST}/api/generate",
+            json={
+                "model": OLLAMA_MODEL,
+                "prompt": prompt,
+                "system": system_prompt,
+                "stream": False,
+                "keep_alive": "30m",  # keep the model loaded between cycles
+                "options": {"temperature": 0.85, "top_p": 0.92, "repeat_penalty": 1.15},
+            },
+        )
+        if resp.status_code == 200:
+            text = resp.json().get("response", "").strip()
+            # Remove AI self-references
+            for phrase in ["As an AI", "I'm an AI", "as a language model",
+                           "I don't have personal", "as an artificial"]:
+                text = text.replace(phrase, "")
+            return text.strip() or None
     except Exception as e:
         logger.error(f"Ollama error: {e}")
     return None
@@ -369,18 +391,24 @@ async def generate_post(agent_name: str, submolt: str, personality: dict) -> Opt
 # ---------------------------------------------------------------------------
 async def run_cycle():
     """Run one agent activity cycle using the Genesis SDK."""
+    try:
+        await _run_cycle()
+    finally:
+        await close_ollama_client()
+
+
+async def _run_cycle():
     agents = load_agents()
     if not agents:
         logger.error("No agents configured. Run 'python driver.py setup' first.")
         return
 
-    # Verify Ollama is running
+    # Verify Ollama is running (also warms the shared connection)
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            resp = await client.get(f"{OLLAMA_HOST}/api/tags")
-            if resp.status_code != 200:
-                logger.error(f"Ollama not responding at {OLLAMA_HOST}")
-                return
+        resp = await get_ollama_client().get(f"{OLLAMA_HOST}/api/tags", timeout=5.0)
+        if resp.status_code != 200:
+            logger.error(f"Ollama not responding at {OLLAMA_HOST}")
+            return
     except Exception:
         logger.error(f"Cannot connect to Ollama at {OLLAMA_HOST}. Is it running?")
         return